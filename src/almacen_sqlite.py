@@ -0,0 +1,234 @@
+"""
+Módulo: almacen_sqlite.py
+Descripción: Almacén SQLite para los nodos y conexiones personalizados,
+             pensado para capas grandes compartidas por varios usuarios
+             (lecturas parciales por zona, escritores concurrentes y
+             transacciones), con migración desde el archivo JSON.
+Autor: CityNavigator
+Fecha: Enero 2026
+"""
+
+import argparse
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+from persistencia import AlmacenDatos, Caja, GestorPersistencia
+
+# Milisegundos que un escritor espera a que otro libere la base
+ESPERA_BLOQUEO_MS = 5000
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS nodos (
+    id TEXT PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    lon REAL NOT NULL,
+    lat REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS nodos_posicion ON nodos (lon, lat);
+CREATE TABLE IF NOT EXISTS conexiones (
+    origen TEXT NOT NULL,
+    destino TEXT NOT NULL,
+    distancia REAL NOT NULL,
+    tiempo REAL NOT NULL,
+    PRIMARY KEY (origen, destino)
+);
+CREATE INDEX IF NOT EXISTS conexiones_destino ON conexiones (destino);
+"""
+
+# Altas y ediciones: el rowid de una fila actualizada no cambia, así que
+# ordenar por rowid conserva el orden de alta
+INSERTAR_NODO = """
+INSERT INTO nodos (id, nombre, lon, lat) VALUES (?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET nombre = excluded.nombre, lon = excluded.lon, lat = excluded.lat
+"""
+INSERTAR_CONEXION = """
+INSERT INTO conexiones (origen, destino, distancia, tiempo) VALUES (?, ?, ?, ?)
+ON CONFLICT (origen, destino) DO UPDATE SET distancia = excluded.distancia, tiempo = excluded.tiempo
+"""
+
+EN_CAJA = "lon BETWEEN ? AND ? AND lat BETWEEN ? AND ?"
+
+
+def _fila_nodo(nodo: Dict) -> tuple:
+    return (nodo["id"], nodo["nombre"], nodo["coordenadas"][0], nodo["coordenadas"][1])
+
+
+def _fila_conexion(conexion: Dict) -> tuple:
+    return (conexion["origen"], conexion["destino"], conexion["distancia"], conexion["tiempo"])
+
+
+class AlmacenSQLite(AlmacenDatos):
+    """
+    Nodos y conexiones personalizados en una base SQLite.
+
+    La base usa el modo WAL: los lectores no bloquean al escritor y varios
+    procesos pueden compartir el archivo (los escritores esperan su turno
+    hasta ESPERA_BLOQUEO_MS). Cada operación es una transacción; las cargas
+    masivas (guardar()) insertan todo en una sola. Los nodos están indexados
+    por id y por posición, y las conexiones por sus dos extremos, de modo
+    que se puede leer solo una zona y eliminar un nodo con sus conexiones
+    sin recorrer la tabla.
+    """
+
+    def __init__(self, archivo: str):
+        """
+        Inicializa el almacén (la base se abre al primer uso).
+
+        Args:
+            archivo: Archivo de la base (se crea si no existe)
+        """
+        self.archivo = archivo
+        self._conexion: Optional[sqlite3.Connection] = None
+
+    def _abrir(self) -> sqlite3.Connection:
+        """Abre la base, activa WAL y crea las tablas si faltan."""
+        if self._conexion is None:
+            conexion = sqlite3.connect(self.archivo, timeout=ESPERA_BLOQUEO_MS / 1000)
+            conexion.execute("PRAGMA journal_mode=WAL")
+            # En WAL basta con NORMAL: un corte puede perder las últimas
+            # transacciones, pero nunca deja la base inconsistente
+            conexion.execute("PRAGMA synchronous=NORMAL")
+            conexion.executescript(ESQUEMA)
+            self._conexion = conexion
+        return self._conexion
+
+    def cargar(self, caja: Optional[Caja] = None) -> Tuple[Dict, List[Dict]]:
+        """
+        Lee los nodos y conexiones, todos o solo los de una zona.
+
+        Args:
+            caja: (min_lon, min_lat, max_lon, max_lat); si se indica, se leen
+                  los nodos dentro de la caja y las conexiones que tocan
+                  alguno de ellos
+
+        Returns:
+            Tuple[Dict, List[Dict]]: Datos en el formato del JSON, sin
+                operaciones pendientes
+        """
+        conexion = self._abrir()
+        if caja is None:
+            filas_nodos = conexion.execute(
+                "SELECT id, nombre, lon, lat FROM nodos ORDER BY rowid")
+            filas_conexiones = conexion.execute(
+                "SELECT origen, destino, distancia, tiempo FROM conexiones ORDER BY rowid")
+        else:
+            min_lon, min_lat, max_lon, max_lat = caja
+            parametros = (min_lon, max_lon, min_lat, max_lat)
+            filas_nodos = conexion.execute(
+                f"SELECT id, nombre, lon, lat FROM nodos WHERE {EN_CAJA} ORDER BY rowid",
+                parametros)
+            filas_conexiones = conexion.execute(
+                f"""SELECT origen, destino, distancia, tiempo FROM conexiones
+                    WHERE origen IN (SELECT id FROM nodos WHERE {EN_CAJA})
+                       OR destino IN (SELECT id FROM nodos WHERE {EN_CAJA})
+                    ORDER BY rowid""",
+                parametros * 2)
+
+        datos = {
+            "nodos": [{"id": id_nodo, "nombre": nombre, "coordenadas": [lon, lat]}
+                      for id_nodo, nombre, lon, lat in filas_nodos],
+            "conexiones": [{"origen": origen, "destino": destino,
+                            "distancia": distancia, "tiempo": tiempo}
+                           for origen, destino, distancia, tiempo in filas_conexiones],
+        }
+        return datos, []
+
+    def registrar(self, operacion: Dict) -> bool:
+        """Aplica una operación en su propia transacción."""
+        try:
+            conexion = self._abrir()
+            with conexion:
+                tipo = operacion["op"]
+                if tipo == "nodo":
+                    conexion.execute(INSERTAR_NODO, _fila_nodo(operacion))
+                elif tipo == "conexion":
+                    conexion.execute(INSERTAR_CONEXION, _fila_conexion(operacion))
+                elif tipo == "eliminar_nodo":
+                    conexion.execute("DELETE FROM nodos WHERE id = ?", (operacion["id"],))
+                    conexion.execute("DELETE FROM conexiones WHERE origen = ? OR destino = ?",
+                                     (operacion["id"], operacion["id"]))
+                elif tipo == "eliminar_conexion":
+                    conexion.execute("DELETE FROM conexiones WHERE origen = ? AND destino = ?",
+                                     (operacion["origen"], operacion["destino"]))
+                elif tipo == "limpiar":
+                    conexion.execute("DELETE FROM nodos")
+                    conexion.execute("DELETE FROM conexiones")
+            return True
+        except sqlite3.Error as e:
+            print(f"Error al guardar datos personalizados: {e}")
+            return False
+
+    def guardar(self, datos: Dict, reemplazar: bool = False) -> bool:
+        """
+        Inserta o actualiza todos los registros de `datos` en una transacción.
+
+        Sin `reemplazar` no borra filas: con una carga parcial (por zona) solo
+        se reescriben los registros leídos, y sirve también para importaciones
+        masivas. Con `reemplazar` se vacían antes las tablas, en la misma
+        transacción, así que la base queda igual que `datos`.
+        """
+        try:
+            conexion = self._abrir()
+            with conexion:
+                if reemplazar:
+                    conexion.execute("DELETE FROM nodos")
+                    conexion.execute("DELETE FROM conexiones")
+                conexion.executemany(INSERTAR_NODO, map(_fila_nodo, datos["nodos"]))
+                conexion.executemany(INSERTAR_CONEXION, map(_fila_conexion, datos["conexiones"]))
+            return True
+        except sqlite3.Error as e:
+            print(f"Error al guardar datos personalizados: {e}")
+            return False
+
+    def archivos(self) -> List[str]:
+        """Retorna la base y su archivo WAL."""
+        return [self.archivo, self.archivo + '-wal']
+
+    def sincronizar(self):
+        """Vuelca el WAL en la base (checkpoint), lo que fuerza todo a disco."""
+        if self._conexion is not None:
+            self._conexion.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def cerrar(self):
+        """Cierra la conexión con la base."""
+        if self._conexion is not None:
+            self._conexion.close()
+            self._conexion = None
+
+
+def migrar_json_a_sqlite(archivo_json: str, archivo_sqlite: str) -> Tuple[int, int]:
+    """
+    Copia los datos personalizados de un archivo JSON (con su diario) a SQLite.
+
+    Los registros que ya estén en la base se actualizan; el JSON no se toca.
+
+    Args:
+        archivo_json: Archivo JSON de origen
+        archivo_sqlite: Base de destino (se crea si no existe)
+
+    Returns:
+        Tuple[int, int]: Nodos y conexiones copiados
+    """
+    datos = GestorPersistencia(archivo_json).datos
+    almacen = AlmacenSQLite(archivo_sqlite)
+    try:
+        if not almacen.guardar(datos):
+            raise RuntimeError(f"No se pudo migrar a {archivo_sqlite}")
+    finally:
+        almacen.cerrar()
+    return len(datos["nodos"]), len(datos["conexiones"])
+
+
+def main():
+    """Migra un archivo JSON de datos personalizados a una base SQLite."""
+    parser = argparse.ArgumentParser(description="Migra los datos personalizados de JSON a SQLite")
+    parser.add_argument('json', help="Archivo JSON de origen (p. ej. datos_personalizados.json)")
+    parser.add_argument('sqlite', help="Base de destino (p. ej. datos_personalizados.db)")
+    argumentos = parser.parse_args()
+
+    nodos, conexiones = migrar_json_a_sqlite(argumentos.json, argumentos.sqlite)
+    print(f"Migrados {nodos} nodos y {conexiones} conexiones a {argumentos.sqlite}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+"""
+Módulo: almacenamiento_csr.py
+Descripción: Almacenamiento compacto de aristas en formato CSR (Compressed
+             Sparse Row) para grafos urbanos de gran tamaño.
+Autor: CityNavigator
+Fecha: Enero 2026
+"""
+
+from array import array
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+class AlmacenamientoCSR:
+    """
+    Representación compacta de las aristas de un grafo dirigido.
+
+    Los identificadores de los vértices se internan en enteros densos
+    (0..n-1) y las aristas se guardan en arreglos contiguos:
+    las aristas salientes del vértice i ocupan las posiciones
+    desplazamientos[i] .. desplazamientos[i + 1] - 1 de los arreglos
+    destinos, distancias y tiempos.
+
+    Las aristas agregadas después de construir el CSR se guardan en
+    `pendientes` hasta la siguiente llamada a `compactar()`.
+
+    Los arreglos también pueden ser vistas (memoryview) sobre un archivo
+    mapeado en memoria (ver instantanea.py); se copian a arreglos propios
+    solo cuando hace falta hacerlos crecer.
+
+    Atributos:
+        ids (list): Identificador (str) de cada índice entero
+        indice (dict): Mapeo inverso {id: índice}
+        desplazamientos (array): Inicio de las aristas de cada vértice (n + 1 valores)
+        destinos (array): Índice del vértice destino de cada arista
+        distancias (array): Distancia en metros de cada arista
+        tiempos (array): Tiempo en minutos de cada arista
+        pendientes (dict): Aristas aún no compactadas {i: [(j, distancia, tiempo), ...]}
+        pendientes_inversas (dict): Las mismas aristas indexadas por destino
+                                    {j: [(i, distancia, tiempo), ...]}
+    """
+
+    def __init__(self):
+        """Inicializa un almacenamiento vacío."""
+        self.ids: List[str] = []
+        self.indice: Dict[str, int] = {}
+        self.desplazamientos = array('q', [0])
+        self.destinos = array('q')
+        self.distancias = array('d')
+        self.tiempos = array('d')
+        self.pendientes = defaultdict(list)
+        self.pendientes_inversas = defaultdict(list)
+        self.num_pendientes = 0
+        self._inversa = None  # CSR de aristas entrantes (ver construir_inversa())
+
+    @classmethod
+    def desde_adyacencias(cls, vertices: Iterable[str],
+                          adyacencias: Dict[str, List[Tuple[str, float, float]]]) -> 'AlmacenamientoCSR':
+        """
+        Construye el CSR a partir de listas de adyacencia.
+
+        Args:
+            vertices: Vértices del grafo
+            adyacencias: Diccionario {origen: [(destino, distancia, tiempo), ...]}
+
+        Returns:
+            AlmacenamientoCSR: Almacenamiento con todas las aristas compactadas
+        """
+        csr = cls()
+        for vertice in sorted(vertices):
+            csr.internar(vertice)
+
+        # Los vértices que solo aparecen en aristas también se internan
+        for origen, vecinos in adyacencias.items():
+            csr.internar(origen)
+            for destino, _, _ in vecinos:
+                csr.internar(destino)
+
+        desplazamientos = array('q', [0])
+        for i, vertice in enumerate(csr.ids):
+            for destino, distancia, tiempo in adyacencias.get(vertice, ()):
+                csr.destinos.append(csr.indice[destino])
+                csr.distancias.append(distancia)
+                csr.tiempos.append(tiempo)
+            desplazamientos.append(len(csr.destinos))
+        csr.desplazamientos = desplazamientos
+
+        return csr
+
+    def internar(self, vertice: str) -> int:
+        """
+        Obtiene el índice entero de un vértice, creándolo si no existe.
+
+        Args:
+            vertice: Identificador del vértice
+
+        Returns:
+            int: Índice denso del vértice
+        """
+        i = self.indice.get(vertice)
+        if i is None:
+            i = len(self.ids)
+            self.ids.append(vertice)
+            self.indice[vertice] = i
+            if not isinstance(self.desplazamientos, array):
+                self.desplazamientos = array('q', self.desplazamientos)
+            # El nuevo vértice no tiene aristas compactadas
+            self.desplazamientos.append(self.desplazamientos[-1])
+        return i
+
+    def agregar_arista(self, i: int, j: int, distancia: float, tiempo: float):
+        """
+        Agrega una arista entre dos índices ya internados.
+
+        La arista queda en `pendientes` hasta la siguiente compactación.
+        """
+        self.pendientes[i].append((j, distancia, tiempo))
+        self.pendientes_inversas[j].append((i, distancia, tiempo))
+        self.num_pendientes += 1
+
+    def actualizar_peso(self, i: int, j: int, distancia: float,
+                        tiempo: float) -> List[Tuple[float, float]]:
+        """
+        Cambia los pesos de todas las aristas i -> j en su posición actual.
+
+        Se actualizan los arreglos compactados, las aristas pendientes y, si
+        ya se construyó, el CSR inverso, sin mover ninguna arista.
+
+        Returns:
+            List[Tuple[float, float]]: (distancia, tiempo) anteriores de cada
+                                       arista actualizada
+        """
+        anteriores = []
+        for k in range(self.desplazamientos[i], self.desplazamientos[i + 1]):
+            if self.destinos[k] == j:
+                anteriores.append((self.distancias[k], self.tiempos[k]))
+                self.distancias[k] = distancia
+                self.tiempos[k] = tiempo
+
+        if self.num_pendientes:
+            salientes = self.pendientes.get(i, [])
+            for posicion, (destino, anterior_distancia, anterior_tiempo) in enumerate(salientes):
+                if destino == j:
+                    anteriores.append((anterior_distancia, anterior_tiempo))
+                    salientes[posicion] = (j, distancia, tiempo)
+            entrantes = self.pendientes_inversas.get(j, [])
+            for posicion, arista in enumerate(entrantes):
+                if arista[0] == i:
+                    entrantes[posicion] = (i, distancia, tiempo)
+
+        if self._inversa is not None:
+            desplazamientos, origenes, distancias, tiempos = self._inversa
+            if j + 1 < len(desplazamientos):
+                for k in range(desplazamientos[j], desplazamientos[j + 1]):
+                    if origenes[k] == i:
+                        distancias[k] = distancia
+                        tiempos[k] = tiempo
+
+        return anteriores
+
+    def vecinos(self, i: int) -> Iterator[Tuple[int, float, float]]:
+        """
+        Itera las aristas salientes de un índice.
+
+        Yields:
+            Tuple[int, float, float]: (indice_destino, distancia, tiempo)
+        """
+        for k in range(self.desplazamientos[i], self.desplazamientos[i + 1]):
+            yield self.destinos[k], self.distancias[k], self.tiempos[k]
+        if self.num_pendientes:
+            yield from self.pendientes.get(i, ())
+
+    def construir_inversa(self) -> Tuple[array, array, array, array]:
+        """
+        Construye (una sola vez) el CSR de aristas entrantes.
+
+        Returns:
+            Tuple: (desplazamientos, origenes, distancias, tiempos) indexados por destino
+        """
+        if self._inversa is not None:
+            return self._inversa
+
+        n = len(self.ids)
+        conteo = [0] * (n + 1)
+        for j in self.destinos:
+            conteo[j + 1] += 1
+        for i in range(n):
+            conteo[i + 1] += conteo[i]
+
+        m = len(self.destinos)
+        desplazamientos = array('q', conteo)
+        origenes = array('q', bytes(8 * m))
+        distancias = array('d', bytes(8 * m))
+        tiempos = array('d', bytes(8 * m))
+        siguiente = conteo[:-1]
+        for i in range(n):
+            for k in range(self.desplazamientos[i], self.desplazamientos[i + 1]):
+                j = self.destinos[k]
+                posicion = siguiente[j]
+                siguiente[j] += 1
+                origenes[posicion] = i
+                distancias[posicion] = self.distancias[k]
+                tiempos[posicion] = self.tiempos[k]
+
+        self._inversa = (desplazamientos, origenes, distancias, tiempos)
+        return self._inversa
+
+    def entrantes(self, j: int) -> Iterator[Tuple[int, float, float]]:
+        """
+        Itera las aristas entrantes de un índice.
+
+        Yields:
+            Tuple[int, float, float]: (indice_origen, distancia, tiempo)
+        """
+        desplazamientos, origenes, distancias, tiempos = self.construir_inversa()
+        # Los vértices internados después de construir la inversa no tienen entradas en ella
+        if j + 1 < len(desplazamientos):
+            for k in range(desplazamientos[j], desplazamientos[j + 1]):
+                yield origenes[k], distancias[k], tiempos[k]
+        if self.num_pendientes:
+            yield from self.pendientes_inversas.get(j, ())
+
+    def grado_salida(self, i: int) -> int:
+        """Retorna el número de aristas salientes de un índice."""
+        grado = self.desplazamientos[i + 1] - self.desplazamientos[i]
+        if self.num_pendientes:
+            grado += len(self.pendientes.get(i, ()))
+        return grado
+
+    def num_vertices(self) -> int:
+        """Retorna el número de vértices internados."""
+        return len(self.ids)
+
+    def num_aristas(self) -> int:
+        """Retorna el número total de aristas (compactadas y pendientes)."""
+        return len(self.destinos) + self.num_pendientes
+
+    def compactar(self):
+        """Incorpora las aristas pendientes a los arreglos CSR."""
+        if not self.num_pendientes:
+            return
+
+        destinos = array('q')
+        distancias = array('d')
+        tiempos = array('d')
+        desplazamientos = array('q', [0])
+
+        for i in range(len(self.ids)):
+            inicio, fin = self.desplazamientos[i], self.desplazamientos[i + 1]
+            destinos.extend(self.destinos[inicio:fin])
+            distancias.extend(self.distancias[inicio:fin])
+            tiempos.extend(self.tiempos[inicio:fin])
+            for j, distancia, tiempo in self.pendientes.get(i, ()):
+                destinos.append(j)
+                distancias.append(distancia)
+                tiempos.append(tiempo)
+            desplazamientos.append(len(destinos))
+
+        self.destinos = destinos
+        self.distancias = distancias
+        self.tiempos = tiempos
+        self.desplazamientos = desplazamientos
+        self.pendientes = defaultdict(list)
+        self.pendientes_inversas = defaultdict(list)
+        self.num_pendientes = 0
+        self._inversa = None
+
+    def memoria_bytes(self) -> int:
+        """
+        Estima la memoria ocupada por los arreglos de aristas.
+
+        Returns:
+            int: Bytes usados por desplazamientos, destinos y pesos
+        """
+        return sum(a.itemsize * len(a) for a in (self.desplazamientos, self.destinos,
+                                                  self.distancias, self.tiempos))
+
+
+class EstadoBusqueda:
+    """
+    Arreglos preasignados para las búsquedas sobre el CSR.
+
+    En lugar de reiniciar los arreglos (O(V)) en cada consulta, cada
+    búsqueda usa un número de generación nuevo: una posición solo es válida
+    si su sello coincide con la generación actual. Así el coste de una
+    consulta depende del área explorada y no del tamaño del grafo.
+
+    Atributos:
+        costes (array): Coste tentativo de cada índice
+        predecesores (array): Predecesor de cada índice (-1 en el origen)
+        sellos (array): Generación en la que se escribió el coste
+        asentados (array): Generación en la que se asentó el índice
+        generacion (int): Generación de la búsqueda en curso
+    """
+
+    def __init__(self):
+        """Inicializa el estado sin posiciones reservadas."""
+        self.costes = array('d')
+        self.predecesores = array('q')
+        self.sellos = array('q')
+        self.asentados = array('q')
+        self.generacion = 0
+
+    def nueva_busqueda(self, n: int) -> int:
+        """
+        Prepara el estado para una búsqueda sobre n índices.
+
+        Los arreglos solo crecen (por duplicación) cuando el grafo tiene más
+        vértices que en búsquedas anteriores.
+
+        Returns:
+            int: Generación de la nueva búsqueda
+        """
+        faltan = n - len(self.costes)
+        if faltan > 0:
+            faltan = max(faltan, len(self.costes))
+            self.costes.extend(array('d', bytes(8 * faltan)))
+            self.predecesores.extend(array('q', bytes(8 * faltan)))
+            self.sellos.extend(array('q', bytes(8 * faltan)))
+            self.asentados.extend(array('q', bytes(8 * faltan)))
+        self.generacion += 1
+        return self.generacion
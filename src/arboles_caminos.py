@@ -0,0 +1,185 @@
+"""
+Módulo: arboles_caminos.py
+Descripción: Árboles de caminos mínimos reutilizables por origen. Guardan el
+             estado de Dijkstra (costes, predecesores y cola) para responder
+             nuevas consultas desde el mismo origen sin empezar de cero.
+Autor: CityNavigator
+Fecha: Enero 2026
+"""
+
+from collections import OrderedDict
+import heapq
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Árboles guardados por criterio (0 desactiva el modo)
+MAX_ARBOLES = 0
+
+
+class ArbolCaminos:
+    """
+    Árbol de caminos mínimos desde un origen, construido de forma incremental.
+
+    Atributos:
+        origen (str): Raíz del árbol
+        criterio (str): 'distancia' o 'tiempo'
+        version (int): Versión del grafo con la que se construyó
+        costes (dict): Coste definitivo de cada vértice asentado
+        predecesores (dict): Predecesor de cada vértice alcanzado (None en la raíz)
+        cola (list): Cola de prioridad pendiente (frontera de la búsqueda)
+    """
+
+    def __init__(self, origen: str, criterio: str, version: int):
+        """Inicializa el árbol con solo el origen en la frontera."""
+        self.origen = origen
+        self.criterio = criterio
+        self.version = version
+        self.costes: Dict[str, float] = {}
+        self.tentativos: Dict[str, float] = {origen: 0}
+        self.predecesores: Dict[str, Optional[str]] = {origen: None}
+        self.cola: List[Tuple[float, str]] = [(0, origen)]
+
+    def avanzar_hasta(self, destino: str,
+                      obtener_vecinos: Callable[[str], List[Tuple[str, float, float]]]) -> int:
+        """
+        Continúa la búsqueda desde la frontera guardada hasta asentar `destino`.
+
+        Si el destino ya está asentado no se hace ningún trabajo. Si no es
+        alcanzable la búsqueda agota la frontera.
+
+        Args:
+            destino (str): Vértice que se quiere asentar
+            obtener_vecinos: Función vertice -> [(vecino, distancia, tiempo), ...]
+
+        Returns:
+            int: Vértices asentados en este avance
+        """
+        if destino in self.costes:
+            return 0
+
+        indice_peso = 1 if self.criterio == 'distancia' else 2
+        costes = self.costes
+        tentativos = self.tentativos
+        asentados = 0
+
+        while self.cola:
+            coste_actual, vertice_actual = heapq.heappop(self.cola)
+            if vertice_actual in costes:
+                continue
+            costes[vertice_actual] = coste_actual
+            asentados += 1
+
+            # Se relajan las aristas antes de parar para poder reanudar después
+            for arista in obtener_vecinos(vertice_actual):
+                vecino = arista[0]
+                if vecino in costes:
+                    continue
+                nuevo_coste = coste_actual + arista[indice_peso]
+                if nuevo_coste < tentativos.get(vecino, float('inf')):
+                    tentativos[vecino] = nuevo_coste
+                    self.predecesores[vecino] = vertice_actual
+                    heapq.heappush(self.cola, (nuevo_coste, vecino))
+
+            if vertice_actual == destino:
+                break
+
+        return asentados
+
+    def camino(self, destino: str) -> Tuple[List[str], float]:
+        """
+        Reconstruye el camino hasta un vértice asentado en O(longitud del camino).
+
+        Returns:
+            Tuple[List[str], float]: (camino, coste) o ([], inf) si no está asentado
+        """
+        if destino not in self.costes:
+            return [], float('inf')
+        camino = []
+        vertice_actual = destino
+        while vertice_actual is not None:
+            camino.append(vertice_actual)
+            vertice_actual = self.predecesores[vertice_actual]
+        camino.reverse()
+        return camino, self.costes[destino]
+
+
+class ArbolesCaminos:
+    """
+    Conjunto LRU de árboles de caminos: los `max_arboles` orígenes más
+    recientes de cada criterio.
+
+    Atributos:
+        max_arboles (int): Árboles por criterio (0 desactiva el modo)
+        reutilizados (int): Consultas atendidas con un árbol existente
+        creados (int): Árboles nuevos
+        desalojados (int): Árboles eliminados por LRU u obsolescencia
+    """
+
+    def __init__(self, max_arboles: int = MAX_ARBOLES):
+        """
+        Inicializa el conjunto vacío.
+
+        Args:
+            max_arboles: Número de árboles guardados por criterio
+        """
+        self.max_arboles = max_arboles
+        self._arboles: Dict[str, "OrderedDict[str, ArbolCaminos]"] = {}
+        self.reutilizados = 0
+        self.creados = 0
+        self.desalojados = 0
+
+    @property
+    def activo(self) -> bool:
+        """Indica si el modo de árboles reutilizables está activado."""
+        return self.max_arboles > 0
+
+    def configurar(self, max_arboles: int):
+        """Cambia el número de árboles por criterio, desalojando los sobrantes."""
+        self.max_arboles = max_arboles
+        for arboles in self._arboles.values():
+            while len(arboles) > max(max_arboles, 0):
+                arboles.popitem(last=False)
+                self.desalojados += 1
+
+    def obtener(self, origen: str, criterio: str, version: int) -> ArbolCaminos:
+        """
+        Retorna el árbol de un origen, creándolo si no existe o es obsoleto.
+
+        Args:
+            origen (str): Raíz del árbol
+            criterio (str): 'distancia' o 'tiempo'
+            version (int): Versión actual del grafo
+
+        Returns:
+            ArbolCaminos: Árbol (posiblemente parcial) del origen
+        """
+        arboles = self._arboles.setdefault(criterio, OrderedDict())
+        arbol = arboles.get(origen)
+        if arbol is not None and arbol.version == version:
+            arboles.move_to_end(origen)
+            self.reutilizados += 1
+            return arbol
+
+        if arbol is not None:
+            del arboles[origen]
+            self.desalojados += 1
+
+        arbol = ArbolCaminos(origen, criterio, version)
+        arboles[origen] = arbol
+        self.creados += 1
+        while len(arboles) > self.max_arboles:
+            arboles.popitem(last=False)
+            self.desalojados += 1
+        return arbol
+
+    def limpiar(self):
+        """Elimina todos los árboles guardados."""
+        self._arboles.clear()
+
+    def estadisticas(self) -> Dict:
+        """Retorna los contadores de uso de los árboles."""
+        return {
+            'arboles': sum(len(arboles) for arboles in self._arboles.values()),
+            'reutilizados': self.reutilizados,
+            'creados': self.creados,
+            'desalojados': self.desalojados,
+        }
@@ -0,0 +1,126 @@
+"""
+Módulo: benchmark_consultas.py
+Descripción: Mide la latencia de consultas de ruta cortas y largas en mallas
+             de tamaño creciente, comparando el Dijkstra actual (estado
+             asignado por consulta) con una referencia que inicializa el
+             estado sobre todos los vértices.
+Autor: CityNavigator
+Fecha: Enero 2026
+"""
+
+import heapq
+import sys
+import io
+import time
+
+# Configurar salida UTF-8 para evitar problemas con emojis en Windows
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+from grafo import Grafo
+
+# Lados de las mallas medidas (lado x lado intersecciones)
+LADOS = (30, 60, 120)
+
+# Repeticiones de cada consulta
+REPETICIONES = 20
+
+
+def crear_malla(lado: int) -> Grafo:
+    """Crea una malla de calles bidireccionales de 100 m entre intersecciones."""
+    grafo = Grafo()
+    for fila in range(lado):
+        for columna in range(lado):
+            grafo.agregar_vertice(f"N{fila}_{columna}", coordenadas=(-62.0 + columna * 0.0009,
+                                                                     8.0 + fila * 0.0009))
+    for fila in range(lado):
+        for columna in range(lado):
+            actual = f"N{fila}_{columna}"
+            if columna + 1 < lado:
+                derecha = f"N{fila}_{columna + 1}"
+                grafo.agregar_arista(actual, derecha, 100, 0.5)
+                grafo.agregar_arista(derecha, actual, 100, 0.5)
+            if fila + 1 < lado:
+                abajo = f"N{fila + 1}_{columna}"
+                grafo.agregar_arista(actual, abajo, 100, 0.5)
+                grafo.agregar_arista(abajo, actual, 100, 0.5)
+    # Sin caché: se mide el cálculo, no la búsqueda en la caché
+    grafo.cache_rutas.configurar(max_entradas=0)
+    return grafo
+
+
+def dijkstra_referencia(grafo: Grafo, origen: str, destino: str) -> float:
+    """Dijkstra con la inicialización O(V) de estado que se usaba antes."""
+    distancias = {v: float('inf') for v in grafo.vertices}
+    distancias[origen] = 0
+    predecesores = {v: None for v in grafo.vertices}
+    visitados = set()
+    cola_prioridad = [(0, origen)]
+
+    while cola_prioridad:
+        distancia_actual, vertice_actual = heapq.heappop(cola_prioridad)
+        if vertice_actual in visitados:
+            continue
+        visitados.add(vertice_actual)
+        if vertice_actual == destino:
+            break
+        for vecino, distancia, _ in grafo.obtener_vecinos(vertice_actual):
+            nueva_distancia = distancia_actual + distancia
+            if nueva_distancia < distancias[vecino]:
+                distancias[vecino] = nueva_distancia
+                predecesores[vecino] = vertice_actual
+                heapq.heappush(cola_prioridad, (nueva_distancia, vecino))
+
+    return distancias[destino]
+
+
+def medir(funcion, *args) -> float:
+    """Retorna el tiempo medio en milisegundos de REPETICIONES llamadas."""
+    inicio = time.perf_counter()
+    for _ in range(REPETICIONES):
+        funcion(*args)
+    return (time.perf_counter() - inicio) * 1000 / REPETICIONES
+
+
+def main():
+    """Ejecuta las mediciones e imprime una tabla por modo de almacenamiento."""
+    print("=" * 78)
+    print("BENCHMARK: LATENCIA DE CONSULTAS CORTAS VS. LARGAS")
+    print("=" * 78)
+    print("Corta: 3 cuadras desde el centro. Larga: de esquina a esquina.")
+    print(f"Tiempos medios de {REPETICIONES} consultas, en milisegundos.\n")
+
+    for compacto in (False, True):
+        print(f"--- Modo {'compacto (CSR)' if compacto else 'listas de adyacencia'} ---")
+        print(f"{'Vértices':>9} | {'Corta ref.':>10} | {'Corta':>8} | "
+              f"{'Larga ref.':>10} | {'Larga':>8} | {'Asentados corta':>15}")
+        for lado in LADOS:
+            grafo = crear_malla(lado)
+            if compacto:
+                grafo.compactar()
+            centro = lado // 2
+            consultas = {
+                'corta': (f"N{centro}_{centro}", f"N{centro}_{centro + 3}"),
+                'larga': ("N0_0", f"N{lado - 1}_{lado - 1}"),
+            }
+
+            tiempos = {}
+            for nombre, (origen, destino) in consultas.items():
+                _, coste = grafo.dijkstra(origen, destino, 'distancia')
+                if coste != dijkstra_referencia(grafo, origen, destino):
+                    print(f"❌ Resultado distinto a la referencia ({origen} -> {destino})")
+                    return
+                tiempos[nombre] = medir(grafo.dijkstra, origen, destino, 'distancia')
+                tiempos[nombre + '_ref'] = medir(dijkstra_referencia, grafo, origen, destino)
+
+            grafo.dijkstra(*consultas['corta'], 'distancia')
+            print(f"{len(grafo.vertices):>9} | {tiempos['corta_ref']:>10.3f} | "
+                  f"{tiempos['corta']:>8.3f} | {tiempos['larga_ref']:>10.3f} | "
+                  f"{tiempos['larga']:>8.3f} | {grafo.nodos_asentados:>15}")
+        print()
+
+    print("La consulta corta debe mantenerse casi constante al crecer el grafo;")
+    print("la referencia crece con el número de vértices.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Módulo: cache_rutas.py
+Descripción: Caché LRU acotada para resultados de consultas de ruta,
+             invalidada por la versión de mutación del grafo.
+Autor: CityNavigator
+Fecha: Enero 2026
+"""
+
+from collections import OrderedDict
+import sys
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+# Límites por defecto
+MAX_ENTRADAS = 1024
+MAX_BYTES = 8 * 1024 * 1024
+
+
+class CacheRutas:
+    """
+    Caché LRU de rutas calculadas.
+
+    Cada entrada guarda la versión del grafo con la que se calculó; si el
+    grafo cambió desde entonces, la entrada se descarta al consultarla.
+
+    Atributos:
+        max_entradas (int): Número máximo de entradas (0 desactiva la caché)
+        max_bytes (int): Memoria máxima estimada de las entradas
+        aciertos (int): Consultas respondidas desde la caché
+        fallos (int): Consultas que no estaban en la caché (o estaban obsoletas)
+        desalojos (int): Entradas eliminadas por superar los límites
+    """
+
+    def __init__(self, max_entradas: int = MAX_ENTRADAS, max_bytes: int = MAX_BYTES):
+        """
+        Inicializa una caché vacía.
+
+        Args:
+            max_entradas: Número máximo de entradas
+            max_bytes: Memoria máxima estimada en bytes
+        """
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._entradas: "OrderedDict[Hashable, Tuple[int, List[str], float, int]]" = OrderedDict()
+        self.bytes_usados = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def configurar(self, max_entradas: Optional[int] = None, max_bytes: Optional[int] = None):
+        """
+        Cambia los límites de la caché, desalojando entradas si es necesario.
+
+        Args:
+            max_entradas: Nuevo número máximo de entradas
+            max_bytes: Nueva memoria máxima en bytes
+        """
+        if max_entradas is not None:
+            self.max_entradas = max_entradas
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+        self._desalojar()
+
+    def obtener(self, clave: Hashable, version: int) -> Optional[Tuple[List[str], float]]:
+        """
+        Busca una ruta en la caché.
+
+        Args:
+            clave: Identificador de la consulta, p. ej. (origen, destino, criterio)
+            version: Versión actual del grafo
+
+        Returns:
+            Tuple[List[str], float]: (camino, coste) o None si no está o es obsoleta
+        """
+        if self.max_entradas <= 0:
+            # Caché desactivada: la consulta no cuenta como fallo
+            return None
+
+        entrada = self._entradas.get(clave)
+        if entrada is None:
+            self.fallos += 1
+            return None
+
+        version_entrada, camino, coste, tamano = entrada
+        if version_entrada != version:
+            del self._entradas[clave]
+            self.bytes_usados -= tamano
+            self.fallos += 1
+            return None
+
+        self._entradas.move_to_end(clave)
+        self.aciertos += 1
+        return list(camino), coste
+
+    def guardar(self, clave: Hashable, version: int, camino: List[str], coste: float):
+        """
+        Guarda una ruta calculada con la versión actual del grafo.
+
+        Args:
+            clave: Identificador de la consulta
+            version: Versión del grafo con la que se calculó
+            camino: Secuencia de vértices
+            coste: Coste total
+        """
+        if self.max_entradas <= 0:
+            return
+
+        anterior = self._entradas.pop(clave, None)
+        if anterior is not None:
+            self.bytes_usados -= anterior[3]
+
+        # Los identificadores se comparten con el grafo; solo cuentan las listas y tuplas
+        tamano = sys.getsizeof(camino) + sys.getsizeof(clave) + 64
+        if tamano > self.max_bytes:
+            return
+
+        self._entradas[clave] = (version, list(camino), coste, tamano)
+        self.bytes_usados += tamano
+        self._desalojar()
+
+    def revalidar(self, version_anterior: int, version_nueva: int,
+                  afectada: Callable[[Hashable, List[str]], bool]) -> int:
+        """
+        Conserva tras un cambio del grafo las entradas que no se ven afectadas.
+
+        Las entradas calculadas con `version_anterior` para las que
+        `afectada(clave, camino)` es False pasan a `version_nueva`; las demás
+        se eliminan.
+
+        Args:
+            version_anterior: Versión del grafo antes del cambio
+            version_nueva: Versión del grafo después del cambio
+            afectada: Función (clave, camino) -> True si la ruta pudo cambiar
+
+        Returns:
+            int: Entradas eliminadas
+        """
+        eliminadas = 0
+        for clave, (version, camino, coste, tamano) in list(self._entradas.items()):
+            if version == version_anterior and not afectada(clave, camino):
+                self._entradas[clave] = (version_nueva, camino, coste, tamano)
+            else:
+                del self._entradas[clave]
+                self.bytes_usados -= tamano
+                eliminadas += 1
+        return eliminadas
+
+    def _desalojar(self):
+        """Elimina las entradas menos usadas hasta cumplir los límites."""
+        while self._entradas and (len(self._entradas) > self.max_entradas
+                                  or self.bytes_usados > self.max_bytes):
+            _, entrada = self._entradas.popitem(last=False)
+            self.bytes_usados -= entrada[3]
+            self.desalojos += 1
+
+    def limpiar(self):
+        """Vacía la caché (los contadores se conservan)."""
+        self._entradas.clear()
+        self.bytes_usados = 0
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def estadisticas(self) -> Dict:
+        """
+        Retorna los contadores de la caché.
+
+        Returns:
+            Dict: Entradas, memoria, aciertos, fallos, desalojos y tasa de aciertos
+        """
+        consultas = self.aciertos + self.fallos
+        return {
+            'entradas': len(self._entradas),
+            'bytes_usados': self.bytes_usados,
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'desalojos': self.desalojos,
+            'tasa_aciertos': self.aciertos / consultas if consultas else 0.0,
+        }
@@ -0,0 +1,294 @@
+"""
+Módulo: componentes_fuertes.py
+Descripción: Componentes fuertemente conexas (Tarjan iterativo), su grafo
+             condensado (DAG) y consultas de alcanzabilidad, mantenidas de
+             forma incremental al agregar vértices y aristas.
+Autor: CityNavigator
+Fecha: Enero 2026
+"""
+
+from typing import Dict, List, Optional, Set
+
+
+class ComponentesFuertes:
+    """
+    Componentes fuertemente conexas del grafo y su condensación.
+
+    Dentro de una componente todo vértice llega a todos los demás. Entre
+    componentes las aristas forman un DAG, y cada componente tiene una
+    posición en un orden topológico de ese DAG: si la posición de la
+    componente del origen es mayor que la del destino, no hay ruta, y se
+    sabe en O(1) sin buscar. Opcionalmente se guardan conjuntos de bits con
+    las componentes alcanzables desde cada una, que responden exactamente
+    cualquier consulta en O(1).
+
+    Al agregar aristas, las componentes que quedan en un ciclo se fusionan
+    y el orden topológico se repara solo en la zona afectada (algoritmo de
+    Pearce y Kelly).
+
+    Atributos:
+        componente (dict): Componente de cada vértice
+        miembros (dict): Vértices de cada componente viva
+        sucesores (dict): Aristas del DAG {componente: {componente, ...}}
+        predecesores (dict): Aristas inversas del DAG
+        orden (dict): Posición topológica de cada componente
+        con_alcance (bool): Si se mantienen los conjuntos de bits
+    """
+
+    def __init__(self, con_alcance: bool = False):
+        """Inicializa una estructura vacía (ver construir())."""
+        self.componente: Dict[str, int] = {}
+        self.miembros: Dict[int, List[str]] = {}
+        self.sucesores: Dict[int, Set[int]] = {}
+        self.predecesores: Dict[int, Set[int]] = {}
+        self.orden: Dict[int, int] = {}
+        self.con_alcance = con_alcance
+        self._alcance: Optional[Dict[int, int]] = None
+        self._siguiente_id = 0
+        self._siguiente_orden = 0
+        self.tamano_mayor = 0
+        self.num_triviales = 0  # Componentes de un solo vértice
+
+    @classmethod
+    def construir(cls, grafo, con_alcance: bool = False) -> 'ComponentesFuertes':
+        """
+        Calcula las componentes con el algoritmo de Tarjan sin recursión.
+
+        Args:
+            grafo: Instancia de la clase Grafo
+            con_alcance (bool): Si es True también prepara los conjuntos de bits
+
+        Returns:
+            ComponentesFuertes: Estructura lista para consultar
+        """
+        componentes = cls(con_alcance)
+        indices: Dict[str, int] = {}
+        bajos: Dict[str, int] = {}
+        en_pila: Set[str] = set()
+        pila_tarjan: List[str] = []
+        terminadas: List[List[str]] = []
+
+        for raiz in grafo.vertices:
+            if raiz in indices:
+                continue
+            indices[raiz] = bajos[raiz] = len(indices)
+            pila_tarjan.append(raiz)
+            en_pila.add(raiz)
+            llamadas = [(raiz, iter(grafo.obtener_vecinos(raiz)))]
+
+            while llamadas:
+                vertice, vecinos = llamadas[-1]
+                for arista in vecinos:
+                    vecino = arista[0]
+                    if vecino not in indices:
+                        indices[vecino] = bajos[vecino] = len(indices)
+                        pila_tarjan.append(vecino)
+                        en_pila.add(vecino)
+                        llamadas.append((vecino, iter(grafo.obtener_vecinos(vecino))))
+                        break
+                    if vecino in en_pila and indices[vecino] < bajos[vertice]:
+                        bajos[vertice] = indices[vecino]
+                else:
+                    # Todos los vecinos procesados: "retorno" de la llamada
+                    llamadas.pop()
+                    if llamadas:
+                        padre = llamadas[-1][0]
+                        if bajos[vertice] < bajos[padre]:
+                            bajos[padre] = bajos[vertice]
+                    if bajos[vertice] == indices[vertice]:
+                        miembros = []
+                        while True:
+                            miembro = pila_tarjan.pop()
+                            en_pila.discard(miembro)
+                            miembros.append(miembro)
+                            if miembro == vertice:
+                                break
+                        terminadas.append(miembros)
+
+        # Tarjan termina cada componente después de todas las que alcanza:
+        # el orden inverso de terminación es topológico
+        for miembros in reversed(terminadas):
+            c = componentes._nueva_componente(miembros)
+            for miembro in miembros:
+                componentes.componente[miembro] = c
+
+        for vertice in grafo.vertices:
+            c = componentes.componente[vertice]
+            for arista in grafo.obtener_vecinos(vertice):
+                d = componentes.componente[arista[0]]
+                if c != d:
+                    componentes.sucesores[c].add(d)
+                    componentes.predecesores[d].add(c)
+
+        return componentes
+
+    def _nueva_componente(self, miembros: List[str]) -> int:
+        """Registra una componente al final del orden topológico."""
+        c = self._siguiente_id
+        self._siguiente_id += 1
+        self.miembros[c] = miembros
+        self.sucesores[c] = set()
+        self.predecesores[c] = set()
+        self.orden[c] = self._siguiente_orden
+        self._siguiente_orden += 1
+        self.tamano_mayor = max(self.tamano_mayor, len(miembros))
+        if len(miembros) == 1:
+            self.num_triviales += 1
+        if self._alcance is not None:
+            self._alcance[c] = 1 << c
+        return c
+
+    def agregar_vertice(self, vertice: str):
+        """Agrega un vértice nuevo como componente aislada."""
+        if vertice not in self.componente:
+            self.componente[vertice] = self._nueva_componente([vertice])
+
+    def agregar_arista(self, origen: str, destino: str):
+        """
+        Actualiza las componentes tras agregar la arista origen -> destino.
+
+        Si la arista respeta el orden topológico basta con agregarla al DAG.
+        Si no, se buscan las componentes entre ambas posiciones: las que
+        alcanzan al origen y a la vez son alcanzables desde el destino forman
+        un ciclo y se fusionan; el resto se reordena en las posiciones que ya
+        ocupaban.
+        """
+        self.agregar_vertice(origen)
+        self.agregar_vertice(destino)
+        cu, cv = self.componente[origen], self.componente[destino]
+        if cu == cv or cv in self.sucesores[cu]:
+            return
+
+        orden = self.orden
+        if orden[cu] < orden[cv]:
+            self._enlazar(cu, cv)
+            return
+
+        # Alcanzables desde cv sin pasar de la posición de cu, y
+        # componentes que alcanzan cu sin bajar de la posición de cv
+        adelante = self._explorar(cv, self.sucesores, lambda c: orden[c] <= orden[cu])
+        atras = self._explorar(cu, self.predecesores, lambda c: orden[c] >= orden[cv])
+        ciclo = adelante & atras
+
+        posiciones = sorted(orden[c] for c in adelante | atras)
+        antes = sorted(atras - ciclo, key=orden.get)
+        despues = sorted(adelante - ciclo, key=orden.get)
+        for posicion, c in zip(posiciones, antes):
+            orden[c] = posicion
+        for posicion, c in zip(posiciones[len(posiciones) - len(despues):], despues):
+            orden[c] = posicion
+
+        if ciclo:
+            fusionada = self._fusionar(ciclo)
+            orden[fusionada] = posiciones[len(antes)]
+        else:
+            self._enlazar(cu, cv)
+
+    @staticmethod
+    def _explorar(inicio: int, aristas: Dict[int, Set[int]], dentro) -> Set[int]:
+        """Recorrido en profundidad del DAG limitado a las componentes `dentro`."""
+        visitadas = {inicio}
+        pila = [inicio]
+        while pila:
+            c = pila.pop()
+            for d in aristas[c]:
+                if d not in visitadas and dentro(d):
+                    visitadas.add(d)
+                    pila.append(d)
+        return visitadas
+
+    def _enlazar(self, cu: int, cv: int):
+        """Agrega una arista al DAG y actualiza los conjuntos de bits."""
+        self.sucesores[cu].add(cv)
+        self.predecesores[cv].add(cu)
+        if self._alcance is not None:
+            bit = 1 << cu
+            nuevos = self._alcance[cv]
+            for c, alcance in self._alcance.items():
+                if alcance & bit:
+                    self._alcance[c] = alcance | nuevos
+
+    def _fusionar(self, ciclo: Set[int]) -> int:
+        """Fusiona en una sola las componentes de un ciclo; retorna la que queda."""
+        fusionada = max(ciclo, key=lambda c: len(self.miembros[c]))
+        miembros = self.miembros[fusionada]
+        sucesores = self.sucesores[fusionada]
+        predecesores = self.predecesores[fusionada]
+        self.num_triviales -= sum(1 for c in ciclo if len(self.miembros[c]) == 1)
+
+        for c in ciclo:
+            if c == fusionada:
+                continue
+            for miembro in self.miembros.pop(c):
+                self.componente[miembro] = fusionada
+                miembros.append(miembro)
+            for d in self.sucesores.pop(c):
+                if d not in ciclo:
+                    self.predecesores[d].discard(c)
+                    self.predecesores[d].add(fusionada)
+                    sucesores.add(d)
+            for d in self.predecesores.pop(c):
+                if d not in ciclo:
+                    self.sucesores[d].discard(c)
+                    self.sucesores[d].add(fusionada)
+                    predecesores.add(d)
+            del self.orden[c]
+
+        sucesores -= ciclo
+        predecesores -= ciclo
+        self.tamano_mayor = max(self.tamano_mayor, len(miembros))
+        # Los bits de las componentes fusionadas ya no son válidos
+        self._alcance = None
+        return fusionada
+
+    def _construir_alcance(self) -> Dict[int, int]:
+        """Calcula los conjuntos de bits recorriendo el DAG de atrás hacia delante."""
+        alcance = {}
+        for c in sorted(self.miembros, key=self.orden.get, reverse=True):
+            bits = 1 << c
+            for d in self.sucesores[c]:
+                bits |= alcance[d]
+            alcance[c] = bits
+        self._alcance = alcance
+        return alcance
+
+    def puede_alcanzar(self, origen: str, destino: str) -> Optional[bool]:
+        """
+        Indica si puede existir una ruta de origen a destino.
+
+        Returns:
+            Optional[bool]: True si seguro hay ruta, False si seguro no la
+                            hay, None si hay que buscar (sin conjuntos de bits)
+        """
+        cu = self.componente.get(origen)
+        cv = self.componente.get(destino)
+        if cu is None or cv is None:
+            return False
+        if cu == cv:
+            return True
+        if self.orden[cu] > self.orden[cv]:
+            return False
+        if self.con_alcance:
+            alcance = self._alcance if self._alcance is not None else self._construir_alcance()
+            return bool(alcance[cu] >> cv & 1)
+        if not self.sucesores[cu] or not self.predecesores[cv]:
+            return False
+        return None
+
+    def num_componentes(self) -> int:
+        """Retorna el número de componentes."""
+        return len(self.miembros)
+
+    def estadisticas(self) -> Dict:
+        """
+        Resume la estructura de componentes.
+
+        Returns:
+            Dict: num_componentes, componente_mayor (vértices de la más
+                  grande) y componentes_triviales (de un solo vértice)
+        """
+        return {
+            'num_componentes': len(self.miembros),
+            'componente_mayor': self.tamano_mayor,
+            'componentes_triviales': self.num_triviales,
+        }
@@ -6,11 +6,23 @@ Autor: CityNavigator
 Fecha: Enero 2026
 """
 
+import os
+
 from grafo import Grafo
-from persistencia import GestorPersistencia
+from instantanea import cargar_con_instantanea
+from persistencia import ARCHIVO_DATOS_PERSONALIZADOS, GestorPersistencia, archivos_datos
+
+# Instantánea binaria del grafo (ver cargar_grafo_puerto_ordaz())
+ARCHIVO_INSTANTANEA = "grafo_puerto_ordaz.bin"
 
+# Factor del tiempo de viaje en hora pico: (minuto del día, factor)
+PERFIL_HORA_PICO = [
+    (0, 1.0), (390, 1.0), (450, 2.0), (510, 2.0), (570, 1.0),
+    (990, 1.0), (1050, 2.0), (1110, 2.0), (1170, 1.0),
+]
 
-def crear_grafo_puerto_ordaz() -> Grafo:
+
+def crear_grafo_puerto_ordaz(compacto: bool = False) -> Grafo:
     """
     Crea y retorna un grafo representando una zona de Puerto Ordaz.
     
@@ -20,6 +32,10 @@ def crear_grafo_puerto_ordaz() -> Grafo:
     - Unare
     - Centro Cívico
     
+    Args:
+        compacto (bool): Si es True, convierte el grafo al almacenamiento
+                         compacto CSR una vez cargados todos los datos
+    
     Returns:
         Grafo: Instancia del grafo con la red urbana de Puerto Ordaz
     """
@@ -150,6 +166,15 @@ def crear_grafo_puerto_ordaz() -> Grafo:
     for origen, destino, distancia, tiempo in aristas:
         grafo.agregar_arista(origen, destino, distancia, tiempo)
     
+    # ========== PERFIL DE HORA PICO ==========
+    # En la Av. Guayana el tiempo de viaje se duplica en las horas pico
+    # (7:30-8:30 y 17:30-18:30), con una hora de transición a cada lado.
+    # Solo lo usa dijkstra_dependiente(); los demás algoritmos usan el tiempo fijo.
+    hora_pico = grafo.agregar_perfil_tiempo(PERFIL_HORA_PICO)
+    for origen, destino, _, _ in aristas:
+        if origen.startswith("Guayana-") and destino.startswith("Guayana-"):
+            grafo.asignar_perfil_tiempo(origen, destino, hora_pico)
+    
     # ========== CARGAR DATOS PERSONALIZADOS DEL USUARIO ==========
     gestor = GestorPersistencia()
     
@@ -170,9 +195,30 @@ def crear_grafo_puerto_ordaz() -> Grafo:
             conexion["tiempo"]
         )
     
+    if compacto:
+        grafo.compactar()
+    
     return grafo
 
 
+def cargar_grafo_puerto_ordaz(ruta_instantanea: str = ARCHIVO_INSTANTANEA) -> Grafo:
+    """
+    Carga el grafo de Puerto Ordaz desde su instantánea binaria.
+    
+    La instantánea se abre con mmap y queda lista en milisegundos; si no
+    existe o si cambiaron este módulo o los datos personalizados, se
+    reconstruye con crear_grafo_puerto_ordaz() y se vuelve a guardar.
+    
+    Args:
+        ruta_instantanea (str): Archivo de la instantánea
+    
+    Returns:
+        Grafo: Grafo en modo compacto (CSR)
+    """
+    fuentes = [os.path.abspath(__file__)] + archivos_datos(ARCHIVO_DATOS_PERSONALIZADOS)
+    return cargar_con_instantanea(crear_grafo_puerto_ordaz, ruta_instantanea, fuentes)
+
+
 def obtener_puntos_interes() -> dict:
     """
     Retorna un diccionario con puntos de interés mapeados a vértices.
@@ -0,0 +1,214 @@
+"""
+Módulo: estadisticas_grafo.py
+Descripción: Estadísticas del grafo mantenidas de forma incremental (conteos,
+             histogramas de grados, pesos y caja de coordenadas), para que
+             consultarlas no requiera recorrer las aristas.
+Autor: CityNavigator
+Fecha: Enero 2026
+"""
+
+from collections import Counter
+import heapq
+from typing import Dict, Optional
+
+
+class ResumenValores:
+    """
+    Mínimo, máximo y media de un multiconjunto de valores con altas y bajas.
+
+    El mínimo y el máximo se guardan en montículos con borrado perezoso:
+    un valor dado de baja se descarta cuando llega a la cima. Si los
+    montículos acumulan demasiados valores dados de baja, se reconstruyen.
+
+    Atributos:
+        cantidad (int): Número de valores
+        suma (float): Suma de los valores
+    """
+
+    def __init__(self):
+        """Inicializa un resumen vacío."""
+        self.cantidad = 0
+        self.suma = 0.0
+        self._conteo = Counter()
+        self._minimos = []
+        self._maximos = []
+        self._cargados = None  # Valores de cargar() aún sin contar
+        self._extremos = None
+
+    def agregar(self, valor: float):
+        """Agrega un valor."""
+        self._materializar()
+        self.cantidad += 1
+        self.suma += valor
+        if self._conteo[valor] == 0:
+            if len(self._minimos) > 2 * len(self._conteo) + 16:
+                self._minimos = list(self._conteo)
+                self._maximos = [-v for v in self._conteo]
+                heapq.heapify(self._minimos)
+                heapq.heapify(self._maximos)
+            heapq.heappush(self._minimos, valor)
+            heapq.heappush(self._maximos, -valor)
+        self._conteo[valor] += 1
+
+    def cargar(self, valores):
+        """
+        Agrega muchos valores de una vez.
+
+        Los conteos por valor (necesarios solo para dar de baja) se calculan
+        la primera vez que se agrega o se quita un valor suelto.
+        """
+        self._materializar()
+        valores = list(valores)
+        if not valores:
+            return
+        self.cantidad += len(valores)
+        self.suma += sum(valores)
+        self._cargados = valores
+        self._extremos = (min(valores), max(valores))
+        if self._conteo:
+            # Ya había valores contados: se cuentan también los nuevos
+            self._materializar()
+
+    def _materializar(self):
+        """Cuenta los valores cargados en bloque que aún no se contaron."""
+        if self._cargados is None:
+            return
+        self._conteo.update(self._cargados)
+        self._minimos = list(self._conteo)
+        self._maximos = [-v for v in self._conteo]
+        heapq.heapify(self._minimos)
+        heapq.heapify(self._maximos)
+        self._cargados = None
+
+    def quitar(self, valor: float):
+        """Quita una aparición de un valor agregado antes."""
+        self._materializar()
+        self.cantidad -= 1
+        self.suma -= valor
+        self._conteo[valor] -= 1
+        if self._conteo[valor] == 0:
+            del self._conteo[valor]
+
+    def minimo(self) -> Optional[float]:
+        """Retorna el menor valor (None si está vacío)."""
+        if self._cargados is not None:
+            return self._extremos[0]
+        while self._minimos and self._minimos[0] not in self._conteo:
+            heapq.heappop(self._minimos)
+        return self._minimos[0] if self._minimos else None
+
+    def maximo(self) -> Optional[float]:
+        """Retorna el mayor valor (None si está vacío)."""
+        if self._cargados is not None:
+            return self._extremos[1]
+        while self._maximos and -self._maximos[0] not in self._conteo:
+            heapq.heappop(self._maximos)
+        return -self._maximos[0] if self._maximos else None
+
+    def media(self) -> Optional[float]:
+        """Retorna la media (None si está vacío)."""
+        return self.suma / self.cantidad if self.cantidad else None
+
+    def resumen(self) -> Dict[str, Optional[float]]:
+        """Retorna {'min', 'max', 'media'}."""
+        return {'min': self.minimo(), 'max': self.maximo(), 'media': self.media()}
+
+
+class EstadisticasGrafo:
+    """
+    Contadores del grafo actualizados en cada alta de vértice o arista.
+
+    Atributos:
+        num_aristas (int): Aristas dirigidas
+        grados_salida (dict): Grado de salida de cada vértice
+        grados_entrada (dict): Grado de entrada de cada vértice
+        histograma_salida (Counter): {grado: número de vértices}
+        histograma_entrada (Counter): {grado: número de vértices}
+        pesos (dict): ResumenValores por criterio ('distancia', 'tiempo')
+        xs, ys (ResumenValores): Coordenadas de los vértices ubicados
+    """
+
+    def __init__(self):
+        """Inicializa los contadores de un grafo vacío."""
+        self.num_aristas = 0
+        self.grados_salida: Dict[str, int] = {}
+        self.grados_entrada: Dict[str, int] = {}
+        self.histograma_salida = Counter()
+        self.histograma_entrada = Counter()
+        self.pesos = {'distancia': ResumenValores(), 'tiempo': ResumenValores()}
+        self.xs = ResumenValores()
+        self.ys = ResumenValores()
+
+    def cargar_csr(self, csr, coordenadas: Dict[str, tuple]):
+        """
+        Calcula todos los contadores de una vez a partir de un CSR compactado.
+
+        Args:
+            csr: AlmacenamientoCSR sin aristas pendientes
+            coordenadas: {vertice: (x, y)}
+        """
+        ids = csr.ids
+        desplazamientos = csr.desplazamientos
+        self.num_aristas = len(csr.destinos)
+        self.grados_salida = {v: desplazamientos[i + 1] - desplazamientos[i]
+                              for i, v in enumerate(ids)}
+        entrantes = Counter(csr.destinos)
+        self.grados_entrada = {v: entrantes.get(i, 0) for i, v in enumerate(ids)}
+        self.histograma_salida = Counter(self.grados_salida.values())
+        self.histograma_entrada = Counter(self.grados_entrada.values())
+        self.pesos['distancia'].cargar(csr.distancias)
+        self.pesos['tiempo'].cargar(csr.tiempos)
+        self.xs.cargar(x for x, _ in coordenadas.values())
+        self.ys.cargar(y for _, y in coordenadas.values())
+
+    def agregar_vertice(self, vertice: str):
+        """Registra un vértice nuevo (grados 0)."""
+        if vertice not in self.grados_salida:
+            self.grados_salida[vertice] = 0
+            self.grados_entrada[vertice] = 0
+            self.histograma_salida[0] += 1
+            self.histograma_entrada[0] += 1
+
+    def ubicar_vertice(self, anteriores: Optional[tuple], coordenadas: tuple):
+        """Registra las coordenadas de un vértice (y quita las anteriores si se movió)."""
+        if anteriores is not None:
+            self.xs.quitar(anteriores[0])
+            self.ys.quitar(anteriores[1])
+        self.xs.agregar(coordenadas[0])
+        self.ys.agregar(coordenadas[1])
+
+    @staticmethod
+    def _mover_grado(grados: Dict[str, int], histograma: Counter, vertice: str, cambio: int):
+        """Cambia el grado de un vértice y su casilla en el histograma."""
+        grado = grados[vertice]
+        histograma[grado] -= 1
+        if not histograma[grado]:
+            del histograma[grado]
+        grados[vertice] = grado + cambio
+        histograma[grado + cambio] += 1
+
+    def agregar_arista(self, origen: str, destino: str, distancia: float, tiempo: float):
+        """Registra una arista nueva."""
+        self.num_aristas += 1
+        self._mover_grado(self.grados_salida, self.histograma_salida, origen, 1)
+        self._mover_grado(self.grados_entrada, self.histograma_entrada, destino, 1)
+        self.pesos['distancia'].agregar(distancia)
+        self.pesos['tiempo'].agregar(tiempo)
+
+    def cambiar_pesos(self, anteriores: tuple, nuevos: tuple):
+        """Reemplaza los pesos (distancia, tiempo) de una arista."""
+        for criterio, anterior, nuevo in zip(('distancia', 'tiempo'), anteriores, nuevos):
+            self.pesos[criterio].quitar(anterior)
+            self.pesos[criterio].agregar(nuevo)
+
+    def caja_coordenadas(self) -> Optional[Dict[str, float]]:
+        """
+        Retorna la caja que contiene todos los vértices ubicados.
+
+        Returns:
+            Dict: {'min_x', 'min_y', 'max_x', 'max_y'} o None si no hay coordenadas
+        """
+        if not self.xs.cantidad:
+            return None
+        return {'min_x': self.xs.minimo(), 'min_y': self.ys.minimo(),
+                'max_x': self.xs.maximo(), 'max_y': self.ys.maximo()}
@@ -7,26 +7,121 @@ Fecha: Enero 2026
 """
 
 from collections import defaultdict, deque
+from itertools import islice
 import heapq
-from typing import List, Tuple, Dict, Optional
+import math
+import os
+from typing import List, Tuple, Dict, Iterator, Optional
+
+from almacenamiento_csr import AlmacenamientoCSR, EstadoBusqueda
+from arboles_caminos import ArbolesCaminos
+from cache_rutas import CacheRutas
+from componentes_fuertes import ComponentesFuertes
+from estadisticas_grafo import EstadisticasGrafo
+from indice_espacial import IndiceEspacial, proyectar_en_segmento
+from isocronas import Isocrona, calcular_isocrona
+from jerarquia_contraccion import JerarquiaContraccion
+from k_rutas import rutas_yen
+from landmarks import IndiceLandmarks, NUM_LANDMARKS
+from perfiles_tiempo import PerfilesTiempo
+from rutas_pareto import frente_pareto
+from sssp_dinamico import ArbolDinamico
+
+RADIO_TIERRA_METROS = 6371008.8
+
+
+def distancia_haversine(coord1: Tuple[float, float], coord2: Tuple[float, float]) -> float:
+    """
+    Calcula la distancia de círculo máximo entre dos coordenadas.
+    
+    Args:
+        coord1 (tuple): Coordenadas (lon, lat) en grados
+        coord2 (tuple): Coordenadas (lon, lat) en grados
+        
+    Returns:
+        float: Distancia en metros
+    """
+    lon1, lat1 = math.radians(coord1[0]), math.radians(coord1[1])
+    lon2, lat2 = math.radians(coord2[0]), math.radians(coord2[1])
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * RADIO_TIERRA_METROS * math.asin(min(1.0, math.sqrt(a)))
 
 
 class Grafo:
     """
     Clase que representa un grafo dirigido y ponderado para modelar una red urbana.
     
+    Las consultas no son reentrantes: en modo compacto todas las búsquedas
+    comparten un único estado por grafo (_estado_csr), y nodos_asentados
+    refleja solo la última búsqueda. Para consultar desde varios hilos se
+    debe serializar el acceso (ServicioRutas usa un único hilo de cálculo)
+    o usar un grafo por hilo o proceso (como rutas_lote).
+    
     Atributos:
         vertices (set): Conjunto de todos los vértices (intersecciones)
         adyacencias (dict): Diccionario de listas de adyacencia
                            estructura: {vertice_origen: [(vertice_destino, distancia, tiempo), ...]}
+        adyacencias_inversas (dict): Índice de aristas entrantes
+                           estructura: {vertice_destino: [(vertice_origen, distancia, tiempo), ...]}
+        csr (AlmacenamientoCSR): Almacenamiento compacto de aristas, o None
+                                 mientras el grafo usa listas de adyacencia
+        version (int): Contador de mutaciones; invalida la caché de rutas
+        cache_rutas (CacheRutas): Caché LRU de resultados de dijkstra()
+        arboles_caminos (ArbolesCaminos): Árboles de caminos reutilizables por
+                                          origen (desactivado por defecto)
+        componentes (ComponentesFuertes): Componentes fuertemente conexas, o
+                                          None si no se han preparado
+        estadisticas (EstadisticasGrafo): Contadores de obtener_estadisticas()
     """
     
     def __init__(self):
         """Inicializa un grafo vacío."""
         self.vertices = set()
         self.adyacencias = defaultdict(list)
+        self.adyacencias_inversas = defaultdict(list)
         self.nombres_vertices = {}  # Mapeo de ID a nombre legible
         self.coordenadas = {}  # Coordenadas (x, y) para visualización
+        self.indice_espacial = IndiceEspacial()  # Búsqueda de vértices por posición
+        self.csr = None  # Modo compacto (ver compactar())
+        self._estado_csr = EstadoBusqueda()  # Arreglos reutilizados por _dijkstra_csr
+        self.nodos_asentados = 0  # Vértices asentados en la última búsqueda
+        self._factores_heuristica = None  # Calibración de A* (ver _calibrar_heuristica)
+        self.jerarquias = {}  # Jerarquías de contracción por criterio
+        self.landmarks = None  # Tablas ALT (ver preparar_landmarks())
+        self.version = 0
+        self.cache_rutas = CacheRutas()
+        self.arboles_caminos = ArbolesCaminos()
+        self.perfiles_tiempo = PerfilesTiempo()  # Tiempos según la hora del día
+        self.origenes_vigilados = {}  # Árboles dinámicos por (origen, criterio)
+        self.componentes = None  # Componentes fuertemente conexas (ver preparar_componentes())
+        self.estadisticas = EstadisticasGrafo()  # Contadores para obtener_estadisticas()
+    
+    @classmethod
+    def desde_csr(cls, csr: AlmacenamientoCSR, nombres: Dict[str, str] = None,
+                  coordenadas: Dict[str, Tuple[float, float]] = None) -> 'Grafo':
+        """
+        Crea un grafo compacto a partir de un CSR ya construido (carga masiva).
+        
+        Evita llamar a agregar_vertice() y agregar_arista() por cada elemento:
+        los índices y contadores derivados se calculan de una vez.
+        
+        Args:
+            csr (AlmacenamientoCSR): Aristas compactadas (sin pendientes)
+            nombres (dict): Nombre descriptivo de cada vértice
+            coordenadas (dict): Coordenadas (lon, lat) de cada vértice
+            
+        Returns:
+            Grafo: Grafo en modo compacto
+        """
+        grafo = cls()
+        grafo.csr = csr
+        grafo.vertices = set(csr.ids)
+        grafo.nombres_vertices = dict(nombres or {})
+        grafo.coordenadas = dict(coordenadas or {})
+        grafo.indice_espacial.cargar(grafo.coordenadas)
+        grafo.estadisticas.cargar_csr(csr, grafo.coordenadas)
+        return grafo
     
     def agregar_vertice(self, vertice: str, nombre: str = None, coordenadas: Tuple[float, float] = None):
         """
@@ -37,11 +132,27 @@ class Grafo:
             nombre (str): Nombre descriptivo de la intersección
             coordenadas (tuple): Coordenadas (x, y) para visualización
         """
+        if vertice not in self.vertices:
+            # Las jerarquías no conocen el vértice nuevo
+            self.jerarquias = {}
         self.vertices.add(vertice)
+        self.estadisticas.agregar_vertice(vertice)
+        self.version += 1
+        if self.csr is not None:
+            self.csr.internar(vertice)
+        if self.componentes is not None:
+            self.componentes.agregar_vertice(vertice)
         if nombre:
             self.nombres_vertices[vertice] = nombre
         if coordenadas:
+            self.estadisticas.ubicar_vertice(self.coordenadas.get(vertice), coordenadas)
             self.coordenadas[vertice] = coordenadas
+            self.indice_espacial.insertar(vertice, coordenadas)
+        self._factores_heuristica = None
+        # Un vértice nuevo no es alcanzable: los árboles vigilados siguen siendo válidos
+        for arbol in self.origenes_vigilados.values():
+            if arbol.version == self.version - 1:
+                arbol.version = self.version
     
     def agregar_arista(self, origen: str, destino: str, distancia: float, tiempo: float):
         """
@@ -52,13 +163,174 @@ class Grafo:
             destino (str): Vértice de destino
             distancia (float): Distancia en metros
             tiempo (float): Tiempo promedio en minutos
+            
+        Raises:
+            ValueError: Si el par tiene un perfil de tiempo que la arista
+                        nueva haría violar FIFO
         """
+        perfiles_origen = self.perfiles_tiempo.de_origen(origen)
+        if perfiles_origen is not None and destino in perfiles_origen:
+            # El perfil se aplica a todas las aristas paralelas, también a la nueva
+            tiempos = [t for vecino, _, t in self.obtener_vecinos(origen) if vecino == destino]
+            self.perfiles_tiempo.asignar(origen, destino, perfiles_origen[destino],
+                                         max(tiempos + [tiempo]))
+        
         if origen not in self.vertices:
             self.agregar_vertice(origen)
         if destino not in self.vertices:
             self.agregar_vertice(destino)
         
-        self.adyacencias[origen].append((destino, distancia, tiempo))
+        self.version += 1
+        self.estadisticas.agregar_arista(origen, destino, distancia, tiempo)
+        if self.csr is not None:
+            self.csr.agregar_arista(self.csr.indice[origen], self.csr.indice[destino],
+                                    distancia, tiempo)
+        else:
+            self.adyacencias[origen].append((destino, distancia, tiempo))
+            self.adyacencias_inversas[destino].append((origen, distancia, tiempo))
+        self._factores_heuristica = None
+        self.jerarquias = {}
+        self.landmarks = None
+        if self.componentes is not None:
+            self.componentes.agregar_arista(origen, destino)
+        
+        # Una arista nueva equivale a abaratar una arista de peso infinito
+        for (_, criterio), arbol in self.origenes_vigilados.items():
+            if arbol.version == self.version - 1:
+                peso = distancia if criterio == 'distancia' else tiempo
+                arbol.reparar_disminucion(origen, destino, peso, self.obtener_vecinos)
+                arbol.version = self.version
+    
+    def actualizar_peso(self, origen: str, destino: str, distancia: float, tiempo: float) -> bool:
+        """
+        Cambia la distancia y el tiempo de la calle origen -> destino.
+        
+        Pensado para refrescar el tráfico en vivo: en lugar de descartar todo
+        lo precalculado, solo se invalida lo que el cambio puede afectar.
+        - Si un peso aumenta, las rutas en caché que no usan la arista siguen
+          siendo óptimas, y los landmarks y la calibración de A* siguen
+          siendo cotas válidas.
+        - Si un peso disminuye, se descartan las rutas en caché de ese
+          criterio, los landmarks y la calibración de A*.
+        - Las jerarquías de contracción del criterio que cambia se descartan.
+        - Los árboles de los orígenes vigilados se reparan en su parte afectada.
+        
+        Si hay varias aristas origen -> destino, todas toman los nuevos pesos.
+        
+        Args:
+            origen (str): Vértice de origen
+            destino (str): Vértice de destino
+            distancia (float): Nueva distancia en metros
+            tiempo (float): Nuevo tiempo promedio en minutos
+            
+        Returns:
+            bool: True si la arista existía
+            
+        Raises:
+            ValueError: Si la arista tiene un perfil de tiempo que violaría FIFO
+        """
+        anteriores = [(dist, tiemp) for vecino, dist, tiemp in self.obtener_vecinos(origen)
+                      if vecino == destino]
+        if not anteriores:
+            return False
+        
+        perfiles_origen = self.perfiles_tiempo.de_origen(origen)
+        if perfiles_origen is not None and destino in perfiles_origen:
+            self.perfiles_tiempo.asignar(origen, destino, perfiles_origen[destino], tiempo)
+        
+        for pesos_anteriores in anteriores:
+            self.estadisticas.cambiar_pesos(pesos_anteriores, (distancia, tiempo))
+        
+        if self.csr is not None:
+            self.csr.actualizar_peso(self.csr.indice[origen], self.csr.indice[destino],
+                                     distancia, tiempo)
+        else:
+            self.adyacencias[origen] = [(v, distancia, tiempo) if v == destino else (v, d, t)
+                                        for v, d, t in self.adyacencias[origen]]
+            self.adyacencias_inversas[destino] = [(v, distancia, tiempo) if v == origen else (v, d, t)
+                                                  for v, d, t in self.adyacencias_inversas[destino]]
+        
+        version_anterior = self.version
+        self.version += 1
+        
+        # Cambio del peso efectivo (el menor entre aristas paralelas) por criterio
+        cambios = {
+            'distancia': (min(d for d, _ in anteriores), distancia),
+            'tiempo': (min(t for _, t in anteriores), tiempo),
+        }
+        aumentados = {c for c, (antes, despues) in cambios.items() if despues > antes}
+        disminuidos = {c for c, (antes, despues) in cambios.items() if despues < antes}
+        
+        for criterio in aumentados | disminuidos:
+            self.jerarquias.pop(criterio, None)
+        if disminuidos:
+            self._factores_heuristica = None
+            self.landmarks = None
+        
+        def afectada(clave, camino) -> bool:
+            criterio = clave[2]
+            if criterio in disminuidos:
+                return True
+            if criterio in aumentados:
+                return any(camino[k] == origen and camino[k + 1] == destino
+                           for k in range(len(camino) - 1))
+            return False
+        
+        self.cache_rutas.revalidar(version_anterior, self.version, afectada)
+        
+        for (_, criterio), arbol in self.origenes_vigilados.items():
+            if arbol.version != version_anterior:
+                continue
+            if criterio in disminuidos:
+                arbol.reparar_disminucion(origen, destino, cambios[criterio][1],
+                                          self.obtener_vecinos)
+            elif criterio in aumentados:
+                arbol.reparar_aumento(origen, destino, self.obtener_vecinos,
+                                      self.obtener_entrantes)
+            arbol.version = self.version
+        
+        return True
+    
+    def vigilar_origen(self, origen: str, criterio: str = 'tiempo') -> ArbolDinamico:
+        """
+        Mantiene el árbol completo de caminos mínimos de un origen frecuente.
+        
+        El árbol se calcula una vez y luego se repara de forma incremental con
+        cada agregar_arista() y actualizar_peso(); dijkstra() responde desde él
+        cualquier destino en O(longitud del camino).
+        
+        Args:
+            origen (str): Vértice vigilado (p. ej. 'Terminal' o 'CentroCívico')
+            criterio (str): 'distancia' o 'tiempo'
+            
+        Returns:
+            ArbolDinamico: Árbol del origen
+        """
+        arbol = ArbolDinamico(origen, criterio)
+        arbol.construir(self.obtener_vecinos, self.version)
+        self.origenes_vigilados[(origen, criterio)] = arbol
+        return arbol
+    
+    def dejar_de_vigilar(self, origen: str, criterio: str = 'tiempo'):
+        """Descarta el árbol dinámico de un origen vigilado."""
+        self.origenes_vigilados.pop((origen, criterio), None)
+    
+    def compactar(self):
+        """
+        Convierte el grafo al modo de almacenamiento compacto (CSR).
+        
+        Los vértices se internan como enteros densos y las aristas pasan a
+        arreglos contiguos de destinos, distancias y tiempos. Las listas de
+        adyacencia se liberan; la API basada en identificadores (str) sigue
+        funcionando igual. Si el grafo ya es compacto, incorpora las aristas
+        agregadas desde la última compactación.
+        """
+        if self.csr is None:
+            self.csr = AlmacenamientoCSR.desde_adyacencias(self.vertices, self.adyacencias)
+            self.adyacencias = defaultdict(list)
+            self.adyacencias_inversas = defaultdict(list)
+        else:
+            self.csr.compactar()
     
     def obtener_vecinos(self, vertice: str) -> List[Tuple[str, float, float]]:
         """
@@ -70,12 +342,49 @@ class Grafo:
         Returns:
             List[Tuple]: Lista de tuplas (vertice_destino, distancia, tiempo)
         """
+        if self.csr is not None:
+            i = self.csr.indice.get(vertice)
+            if i is None:
+                return []
+            ids = self.csr.ids
+            return [(ids[j], dist, tiemp) for j, dist, tiemp in self.csr.vecinos(i)]
         return self.adyacencias.get(vertice, [])
     
+    def obtener_entrantes(self, vertice: str) -> List[Tuple[str, float, float]]:
+        """
+        Obtiene la lista de aristas que llegan a un vértice.
+        
+        Args:
+            vertice (str): Vértice del cual obtener las aristas entrantes
+            
+        Returns:
+            List[Tuple]: Lista de tuplas (vertice_origen, distancia, tiempo)
+        """
+        if self.csr is not None:
+            j = self.csr.indice.get(vertice)
+            if j is None:
+                return []
+            ids = self.csr.ids
+            return [(ids[i], dist, tiemp) for i, dist, tiemp in self.csr.entrantes(j)]
+        return self.adyacencias_inversas.get(vertice, [])
+    
+    def grado_salida(self, vertice: str) -> int:
+        """Retorna el número de aristas salientes de un vértice."""
+        if self.csr is not None:
+            i = self.csr.indice.get(vertice)
+            return self.csr.grado_salida(i) if i is not None else 0
+        return len(self.adyacencias.get(vertice, []))
+    
     def dijkstra(self, origen: str, destino: str, criterio: str = 'distancia') -> Tuple[List[str], float]:
         """
         Implementa el algoritmo de Dijkstra para encontrar el camino más corto.
         
+        Los resultados se guardan en la caché de rutas; una consulta repetida
+        se responde sin buscar mientras el grafo no cambie. Si los árboles de
+        caminos están activados (arboles_caminos.configurar(k)), la búsqueda
+        desde un origen reciente se reanuda donde se dejó. Los orígenes
+        vigilados (vigilar_origen()) se responden directamente de su árbol.
+        
         Args:
             origen (str): Vértice de inicio
             destino (str): Vértice de destino
@@ -89,11 +398,42 @@ class Grafo:
         # Validar que los vértices existen
         if origen not in self.vertices or destino not in self.vertices:
             return [], float('inf')
+        if self._sin_ruta(origen, destino):
+            self.nodos_asentados = 0
+            return [], float('inf')
+        
+        clave = (origen, destino, criterio)
+        en_cache = self.cache_rutas.obtener(clave, self.version)
+        if en_cache is not None:
+            self.nodos_asentados = 0
+            return en_cache
+        
+        vigilado = self.origenes_vigilados.get((origen, criterio))
+        if vigilado is not None and vigilado.version == self.version:
+            self.nodos_asentados = 0
+            camino, coste = vigilado.camino(destino)
+        elif self.arboles_caminos.activo:
+            arbol = self.arboles_caminos.obtener(origen, criterio, self.version)
+            self.nodos_asentados = arbol.avanzar_hasta(destino, self.obtener_vecinos)
+            camino, coste = arbol.camino(destino)
+        elif self.csr is not None:
+            camino, coste = self._dijkstra_csr(origen, destino, criterio)
+        else:
+            camino, coste = self._dijkstra_listas(origen, destino, criterio)
+        
+        self.cache_rutas.guardar(clave, self.version, camino, coste)
+        return camino, coste
+    
+    def _dijkstra_listas(self, origen: str, destino: str, criterio: str) -> Tuple[List[str], float]:
+        """
+        Dijkstra sobre las listas de adyacencia (modo no compacto).
         
-        # Inicializar estructuras de datos
-        distancias = {v: float('inf') for v in self.vertices}
-        distancias[origen] = 0
-        predecesores = {v: None for v in self.vertices}
+        El estado se crea solo para los vértices alcanzados, así que una
+        consulta corta no paga una inicialización proporcional al grafo.
+        """
+        # Inicializar estructuras de datos (solo con el origen)
+        distancias = {origen: 0}
+        predecesores = {origen: None}
         visitados = set()
         
         # Cola de prioridad: (distancia_acumulada, vertice)
@@ -119,34 +459,716 @@ class Grafo:
                 
                 # Seleccionar la métrica según el criterio
                 peso = dist if criterio == 'distancia' else tiemp
-                nueva_distancia = distancias[vertice_actual] + peso
+                nueva_distancia = distancia_actual + peso
                 
                 # Si encontramos un camino mejor, actualizar
-                if nueva_distancia < distancias[vecino]:
+                if nueva_distancia < distancias.get(vecino, float('inf')):
                     distancias[vecino] = nueva_distancia
                     predecesores[vecino] = vertice_actual
                     heapq.heappush(cola_prioridad, (nueva_distancia, vecino))
         
+        self.nodos_asentados = len(visitados)
+        
+        # Si el destino no se alcanzó, no hay conexión
+        if destino not in visitados:
+            return [], float('inf')
+        
         # Reconstruir el camino desde el destino hasta el origen
+        return self.reconstruir_camino(predecesores, destino), distancias[destino]
+    
+    def _dijkstra_csr(self, origen: str, destino: str, criterio: str) -> Tuple[List[str], float]:
+        """
+        Dijkstra sobre el almacenamiento CSR usando índices enteros.
+        
+        El bucle de relajación recorre directamente los arreglos de destinos
+        y pesos, sin crear tuplas ni calcular hashes de cadenas. El estado se
+        reutiliza entre consultas con sellos de generación (ver EstadoBusqueda).
+        """
+        csr = self.csr
+        inicio = csr.indice[origen]
+        fin = csr.indice[destino]
+        desplazamientos = csr.desplazamientos
+        destinos = csr.destinos
+        pesos = csr.distancias if criterio == 'distancia' else csr.tiempos
+        pendientes = csr.pendientes if csr.num_pendientes else {}
+        indice_peso = 1 if criterio == 'distancia' else 2
+        
+        estado = self._estado_csr
+        generacion = estado.nueva_busqueda(csr.num_vertices())
+        distancias = estado.costes
+        predecesores = estado.predecesores
+        sellos = estado.sellos
+        visitados = estado.asentados
+        
+        distancias[inicio] = 0
+        predecesores[inicio] = -1
+        sellos[inicio] = generacion
+        cola_prioridad = [(0, inicio)]
+        asentados = 0
+        
+        while cola_prioridad:
+            distancia_actual, i = heapq.heappop(cola_prioridad)
+            if visitados[i] == generacion:
+                continue
+            visitados[i] = generacion
+            asentados += 1
+            if i == fin:
+                break
+            
+            for k in range(desplazamientos[i], desplazamientos[i + 1]):
+                j = destinos[k]
+                nueva_distancia = distancia_actual + pesos[k]
+                if sellos[j] != generacion or nueva_distancia < distancias[j]:
+                    sellos[j] = generacion
+                    distancias[j] = nueva_distancia
+                    predecesores[j] = i
+                    heapq.heappush(cola_prioridad, (nueva_distancia, j))
+            
+            for arista in pendientes.get(i, ()):
+                j = arista[0]
+                nueva_distancia = distancia_actual + arista[indice_peso]
+                if sellos[j] != generacion or nueva_distancia < distancias[j]:
+                    sellos[j] = generacion
+                    distancias[j] = nueva_distancia
+                    predecesores[j] = i
+                    heapq.heappush(cola_prioridad, (nueva_distancia, j))
+        
+        self.nodos_asentados = asentados
+        
+        if visitados[fin] != generacion:
+            return [], float('inf')
+        
         camino = []
-        vertice_actual = destino
+        i = fin
+        while i != -1:
+            camino.append(csr.ids[i])
+            i = predecesores[i]
+        camino.reverse()
+        
+        return camino, distancias[fin]
+    
+    def _calibrar_heuristica(self) -> Dict[str, float]:
+        """
+        Calcula los factores que convierten distancia geográfica en una cota inferior.
+        
+        Para 'distancia' el factor es el menor cociente distancia/haversine de
+        todas las aristas; para 'tiempo' es el inverso de la velocidad máxima
+        (haversine/tiempo). Así h(v) = factor * haversine(v, destino) nunca
+        sobreestima el coste real y además es consistente, aunque las
+        coordenadas estén escaladas para visualización.
+        
+        Si algún vértice no tiene coordenadas, los factores son 0 y A* se
+        comporta exactamente como Dijkstra.
+        
+        Returns:
+            Dict[str, float]: {'distancia': factor, 'tiempo': factor}
+        """
+        if self._factores_heuristica is not None:
+            return self._factores_heuristica
+        
+        factores = {'distancia': float('inf'), 'tiempo': float('inf')}
+        if any(v not in self.coordenadas for v in self.vertices):
+            factores = {'distancia': 0.0, 'tiempo': 0.0}
+        else:
+            for origen in self.vertices:
+                coord_origen = self.coordenadas[origen]
+                for destino, dist, tiemp in self.obtener_vecinos(origen):
+                    geodesica = distancia_haversine(coord_origen, self.coordenadas[destino])
+                    if geodesica <= 0:
+                        continue
+                    factores['distancia'] = min(factores['distancia'], dist / geodesica)
+                    factores['tiempo'] = min(factores['tiempo'], tiemp / geodesica)
+            for criterio, factor in factores.items():
+                # Sin aristas útiles la heurística no aporta; margen para errores de redondeo
+                factores[criterio] = 0.0 if factor == float('inf') else factor * (1 - 1e-9)
+        
+        self._factores_heuristica = factores
+        return factores
+    
+    def a_estrella(self, origen: str, destino: str, criterio: str = 'distancia') -> Tuple[List[str], float]:
+        """
+        Algoritmo A* guiado por las coordenadas (lon, lat) de los vértices.
+        
+        Usa como heurística la distancia haversine al destino escalada por
+        un factor calibrado sobre las aristas (ver _calibrar_heuristica),
+        lo que la hace admisible tanto para 'distancia' como para 'tiempo'.
+        Devuelve el mismo resultado que dijkstra() asentando menos vértices.
+        
+        Args:
+            origen (str): Vértice de inicio
+            destino (str): Vértice de destino
+            criterio (str): 'distancia' o 'tiempo' - métrica a minimizar
+            
+        Returns:
+            Tuple[List[str], float]: (camino_optimo, coste_total)
+        """
+        if origen not in self.vertices or destino not in self.vertices:
+            return [], float('inf')
+        if self._sin_ruta(origen, destino):
+            self.nodos_asentados = 0
+            return [], float('inf')
+        
+        factor = self._calibrar_heuristica()[criterio]
+        coord_destino = self.coordenadas.get(destino)
+        if coord_destino is None:
+            factor = 0.0
+        
+        def heuristica(vertice):
+            if factor == 0.0:
+                return 0.0
+            return factor * distancia_haversine(self.coordenadas[vertice], coord_destino)
+        
+        return self._busqueda_dirigida(origen, destino, criterio, heuristica)
+    
+    def preparar_componentes(self, con_alcance: bool = False) -> ComponentesFuertes:
+        """
+        Calcula las componentes fuertemente conexas y su grafo condensado.
+        
+        Con las calles de un solo sentido hay pares de vértices sin ruta;
+        una vez preparadas las componentes, dijkstra(), bfs() y el resto de
+        búsquedas punto a punto los descartan en O(1) sin explorar el grafo.
+        Las componentes se mantienen al agregar vértices y aristas.
+        
+        Args:
+            con_alcance (bool): Si es True guarda además, para cada componente,
+                                el conjunto de bits de las alcanzables, de modo
+                                que toda consulta sin ruta se descarta (memoria
+                                cuadrática en el número de componentes)
+            
+        Returns:
+            ComponentesFuertes: Componentes, DAG condensado y orden topológico
+        """
+        self.componentes = ComponentesFuertes.construir(self, con_alcance)
+        return self.componentes
+    
+    def _sin_ruta(self, origen: str, destino: str) -> bool:
+        """Indica si las componentes preparadas prueban que no hay ruta."""
+        return self.componentes is not None and \
+            self.componentes.puede_alcanzar(origen, destino) is False
+    
+    def preparar_landmarks(self, num_landmarks: int = NUM_LANDMARKS) -> IndiceLandmarks:
+        """
+        Elige landmarks y precalcula sus tablas de distancias para ruta_alt().
+        
+        Las tablas se descartan al agregar aristas; no es necesario
+        reconstruirlas cuando solo aumenta el peso de una arista.
+        
+        Args:
+            num_landmarks (int): Número de landmarks (K)
+            
+        Returns:
+            IndiceLandmarks: Tablas de distancias desde y hacia cada landmark
+        """
+        self.landmarks = IndiceLandmarks.construir(self, num_landmarks)
+        return self.landmarks
+    
+    def ruta_alt(self, origen: str, destino: str, criterio: str = 'distancia') -> Tuple[List[str], float]:
+        """
+        Algoritmo A* con cotas de landmarks y desigualdad triangular (ALT).
+        
+        Funciona igual de bien para 'distancia' y 'tiempo', porque las cotas
+        salen de distancias reales del grafo y no de las coordenadas. Si no se
+        han preparado los landmarks se comporta como Dijkstra.
+        
+        Args:
+            origen (str): Vértice de inicio
+            destino (str): Vértice de destino
+            criterio (str): 'distancia' o 'tiempo' - métrica a minimizar
+            
+        Returns:
+            Tuple[List[str], float]: (camino_optimo, coste_total)
+        """
+        if origen not in self.vertices or destino not in self.vertices:
+            return [], float('inf')
+        if self._sin_ruta(origen, destino):
+            self.nodos_asentados = 0
+            return [], float('inf')
+        
+        if self.landmarks is None:
+            heuristica = lambda vertice: 0.0
+        else:
+            heuristica = self.landmarks.potencial(destino, criterio, origen)
+        
+        return self._busqueda_dirigida(origen, destino, criterio, heuristica)
+    
+    def _busqueda_dirigida(self, origen: str, destino: str, criterio: str,
+                           heuristica) -> Tuple[List[str], float]:
+        """
+        Núcleo común de A*: Dijkstra ordenado por coste acumulado + heurística.
         
+        La heurística debe ser consistente (nunca sobreestimar el coste de
+        una arista) para que cada vértice se asiente una sola vez.
+        """
+        indice_peso = 1 if criterio == 'distancia' else 2
+        costes = {origen: 0}
+        predecesores = {origen: None}
+        visitados = set()
+        
+        # Cola de prioridad: (coste_estimado, coste_acumulado, vertice)
+        cola_prioridad = [(heuristica(origen), 0, origen)]
+        
+        while cola_prioridad:
+            _, coste_actual, vertice_actual = heapq.heappop(cola_prioridad)
+            
+            if vertice_actual in visitados:
+                continue
+            
+            visitados.add(vertice_actual)
+            
+            if vertice_actual == destino:
+                break
+            
+            for arista in self.obtener_vecinos(vertice_actual):
+                vecino = arista[0]
+                if vecino in visitados:
+                    continue
+                
+                nuevo_coste = coste_actual + arista[indice_peso]
+                if nuevo_coste < costes.get(vecino, float('inf')):
+                    costes[vecino] = nuevo_coste
+                    predecesores[vecino] = vertice_actual
+                    heapq.heappush(cola_prioridad,
+                                   (nuevo_coste + heuristica(vecino), nuevo_coste, vecino))
+        
+        self.nodos_asentados = len(visitados)
+        
+        if destino not in visitados:
+            return [], float('inf')
+        
+        camino = []
+        vertice_actual = destino
         while vertice_actual is not None:
             camino.append(vertice_actual)
             vertice_actual = predecesores[vertice_actual]
+        camino.reverse()
+        
+        return camino, costes[destino]
+    
+    def dijkstra_bidireccional(self, origen: str, destino: str,
+                               criterio: str = 'distancia') -> Tuple[List[str], float]:
+        """
+        Dijkstra bidireccional: búsqueda hacia adelante desde el origen y hacia
+        atrás (sobre las aristas entrantes) desde el destino.
+        
+        En cada paso avanza la búsqueda cuya cola tiene el menor tope y se
+        detiene cuando la suma de ambos topes alcanza el mejor coste de
+        encuentro conocido. Retorna lo mismo que dijkstra().
+        
+        Args:
+            origen (str): Vértice de inicio
+            destino (str): Vértice de destino
+            criterio (str): 'distancia' o 'tiempo' - métrica a minimizar
+            
+        Returns:
+            Tuple[List[str], float]: (camino_optimo, coste_total)
+        """
+        if origen not in self.vertices or destino not in self.vertices:
+            return [], float('inf')
+        if self._sin_ruta(origen, destino):
+            self.nodos_asentados = 0
+            return [], float('inf')
+        
+        if origen == destino:
+            self.nodos_asentados = 1
+            return [origen], 0
+        
+        indice_peso = 1 if criterio == 'distancia' else 2
+        
+        # Índice 0: búsqueda hacia adelante, índice 1: hacia atrás
+        costes = ({origen: 0}, {destino: 0})
+        predecesores = ({origen: None}, {destino: None})
+        asentados = (set(), set())
+        colas = ([(0, origen)], [(0, destino)])
+        expandir = (self.obtener_vecinos, self.obtener_entrantes)
+        
+        mejor_coste = float('inf')
+        encuentro = None
+        
+        while colas[0] and colas[1]:
+            # Criterio de parada: ningún camino nuevo puede mejorar el encuentro
+            if colas[0][0][0] + colas[1][0][0] >= mejor_coste:
+                break
+            
+            lado = 0 if colas[0][0][0] <= colas[1][0][0] else 1
+            coste_actual, vertice_actual = heapq.heappop(colas[lado])
+            if vertice_actual in asentados[lado]:
+                continue
+            asentados[lado].add(vertice_actual)
+            
+            propios = costes[lado]
+            opuestos = costes[1 - lado]
+            for arista in expandir[lado](vertice_actual):
+                vecino = arista[0]
+                nuevo_coste = coste_actual + arista[indice_peso]
+                if nuevo_coste < propios.get(vecino, float('inf')):
+                    propios[vecino] = nuevo_coste
+                    predecesores[lado][vecino] = vertice_actual
+                    heapq.heappush(colas[lado], (nuevo_coste, vecino))
+                if vecino in opuestos and propios[vecino] + opuestos[vecino] < mejor_coste:
+                    mejor_coste = propios[vecino] + opuestos[vecino]
+                    encuentro = vecino
+        
+        self.nodos_asentados = len(asentados[0]) + len(asentados[1])
+        
+        if encuentro is None:
+            return [], float('inf')
         
+        # Tramo hacia adelante: origen → encuentro
+        camino = []
+        vertice_actual = encuentro
+        while vertice_actual is not None:
+            camino.append(vertice_actual)
+            vertice_actual = predecesores[0][vertice_actual]
         camino.reverse()
         
-        # Si el camino no empieza en el origen, no hay conexión
-        if not camino or camino[0] != origen:
+        # Tramo hacia atrás: encuentro → destino
+        vertice_actual = predecesores[1][encuentro]
+        while vertice_actual is not None:
+            camino.append(vertice_actual)
+            vertice_actual = predecesores[1][vertice_actual]
+        
+        return camino, mejor_coste
+    
+    def construir_jerarquia(self, criterio: str = 'distancia',
+                            archivo: Optional[str] = None) -> JerarquiaContraccion:
+        """
+        Prepara la jerarquía de contracción de un criterio para ruta_jerarquica().
+        
+        Si se indica un archivo y contiene una jerarquía construida a partir de
+        los mismos datos, se carga en lugar de reconstruirla; en caso contrario
+        se construye y se guarda en ese archivo.
+        
+        Args:
+            criterio (str): 'distancia' o 'tiempo'
+            archivo (str): Ruta opcional donde guardar/cargar la jerarquía
+            
+        Returns:
+            JerarquiaContraccion: Jerarquía lista para consultas
+        """
+        jerarquia = None
+        if archivo and os.path.exists(archivo):
+            try:
+                jerarquia = JerarquiaContraccion.cargar(archivo)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Error al cargar jerarquía de contracción: {e}")
+            if jerarquia is not None and (jerarquia.criterio != criterio
+                                          or not jerarquia.es_valida_para(self)):
+                jerarquia = None
+        
+        if jerarquia is None:
+            jerarquia = JerarquiaContraccion.construir(self, criterio)
+            if archivo:
+                jerarquia.guardar(archivo)
+        
+        self.jerarquias[criterio] = jerarquia
+        return jerarquia
+    
+    def ruta_jerarquica(self, origen: str, destino: str,
+                        criterio: str = 'distancia') -> Tuple[List[str], float]:
+        """
+        Ruta óptima usando la jerarquía de contracción del criterio.
+        
+        Si no se ha llamado a construir_jerarquia() (o el grafo cambió desde
+        entonces) se usa dijkstra().
+        
+        Args:
+            origen (str): Vértice de inicio
+            destino (str): Vértice de destino
+            criterio (str): 'distancia' o 'tiempo' - métrica a minimizar
+            
+        Returns:
+            Tuple[List[str], float]: (camino_optimo, coste_total)
+        """
+        if origen == destino and origen in self.vertices:
+            self.nodos_asentados = 0
+            return [origen], 0
+        jerarquia = self.jerarquias.get(criterio)
+        if jerarquia is None:
+            return self.dijkstra(origen, destino, criterio)
+        
+        resultado = jerarquia.consultar(origen, destino)
+        self.nodos_asentados = jerarquia.nodos_asentados
+        return resultado
+    
+    def rutas_pareto(self, origen: str, destino: str,
+                     epsilon: float = 0.0) -> List[Tuple[List[str], float, float]]:
+        """
+        Obtiene en una sola búsqueda todas las rutas óptimas de Pareto.
+        
+        Una ruta es óptima de Pareto si ninguna otra es a la vez más corta y
+        más rápida. El frente incluye la ruta más corta y la más rápida (las
+        mismas que dijkstra() con cada criterio) y los compromisos entre ellas.
+        
+        Args:
+            origen (str): Vértice de inicio
+            destino (str): Vértice de destino
+            epsilon (float): Relajación de la dominancia; p. ej. 0.05 omite
+                             las rutas que no mejoran en más de un 5% ningún
+                             criterio respecto a otra del frente
+            
+        Returns:
+            List[Tuple[List[str], float, float]]: (camino, distancia, tiempo) de
+                                                  cada ruta, por distancia creciente
+        """
+        rutas, self.nodos_asentados = frente_pareto(self, origen, destino, epsilon)
+        return rutas
+    
+    def k_rutas(self, origen: str, destino: str, k: int = 3,
+                criterio: str = 'distancia') -> Iterator[Tuple[List[str], float]]:
+        """
+        Genera hasta k rutas sin ciclos, de la mejor a la peor (algoritmo de Yen).
+        
+        Las rutas se calculan a medida que se piden, así que se puede dejar de
+        iterar en cuanto se tenga una alternativa aceptable. La primera ruta
+        tiene el mismo coste que dijkstra().
+        
+        Args:
+            origen (str): Vértice de inicio
+            destino (str): Vértice de destino
+            k (int): Número máximo de rutas
+            criterio (str): 'distancia' o 'tiempo' - métrica a minimizar
+            
+        Yields:
+            Tuple[List[str], float]: (camino, coste_total) de cada ruta
+        """
+        yield from islice(rutas_yen(self, origen, destino, criterio), k)
+    
+    def isocrona(self, origen: str, presupuestos, criterio: str = 'tiempo') -> Isocrona:
+        """
+        Calcula todo lo alcanzable desde un vértice dentro de uno o varios presupuestos.
+        
+        Con varios presupuestos (p. ej. [5, 10, 15] minutos) se hace una sola
+        búsqueda y cada vértice queda en la banda del menor presupuesto que
+        lo alcanza. Las calles que quedan a medias se cortan en el punto
+        donde se agota el presupuesto.
+        
+        Args:
+            origen (str): Vértice de partida
+            presupuestos: Presupuesto o lista de presupuestos (minutos o metros)
+            criterio (str): 'distancia' o 'tiempo'
+            
+        Returns:
+            Isocrona: Vértices, costes, bandas y aristas cortadas en arreglos
+                      paralelos (ver visualizador.dibujar_grafo)
+        """
+        return calcular_isocrona(self, origen, presupuestos, criterio)
+    
+    def isocrona_inversa(self, destino: str, presupuestos, criterio: str = 'tiempo') -> Isocrona:
+        """
+        Calcula desde dónde se puede llegar a un vértice dentro de los presupuestos.
+        
+        Igual que isocrona(), pero recorriendo las aristas en sentido
+        contrario: el coste de cada vértice es el de ir HACIA el destino.
+        
+        Args:
+            destino (str): Vértice de llegada
+            presupuestos: Presupuesto o lista de presupuestos (minutos o metros)
+            criterio (str): 'distancia' o 'tiempo'
+            
+        Returns:
+            Isocrona: Vértices, costes, bandas y aristas cortadas
+        """
+        return calcular_isocrona(self, destino, presupuestos, criterio, inversa=True)
+    
+    def agregar_perfil_tiempo(self, puntos: List[Tuple[float, float]]) -> int:
+        """
+        Registra un perfil de tiempo que luego pueden compartir varias aristas.
+        
+        Args:
+            puntos: Lista de (minuto_del_dia, factor), p. ej.
+                    [(0, 1.0), (420, 1.0), (480, 2.0), (540, 1.0)] duplica el
+                    tiempo a las 8:00 y lo interpola entre las 7:00 y las 9:00
+            
+        Returns:
+            int: Identificador del perfil para asignar_perfil_tiempo()
+        """
+        return self.perfiles_tiempo.agregar(puntos)
+    
+    def asignar_perfil_tiempo(self, origen: str, destino: str, perfil: int):
+        """
+        Hace que el tiempo de la arista origen -> destino dependa de la hora.
+        
+        El tiempo a una hora dada es el tiempo estático de la arista por el
+        factor del perfil. No afecta a dijkstra() ni a los demás algoritmos,
+        que siguen usando el tiempo estático.
+        
+        Args:
+            origen (str): Vértice de origen de la arista
+            destino (str): Vértice de destino de la arista
+            perfil (int): Identificador devuelto por agregar_perfil_tiempo()
+            
+        Raises:
+            ValueError: Si la arista no existe o el perfil violaría FIFO
+        """
+        tiempos = [tiempo for vecino, _, tiempo in self.obtener_vecinos(origen)
+                   if vecino == destino]
+        if not tiempos:
+            raise ValueError(f"No existe la arista {origen} -> {destino}")
+        self.perfiles_tiempo.asignar(origen, destino, perfil, max(tiempos))
+    
+    def dijkstra_dependiente(self, origen: str, destino: str,
+                             hora_salida: float) -> Tuple[List[str], float]:
+        """
+        Ruta más rápida saliendo del origen a una hora dada.
+        
+        El coste de cada vértice es su hora de llegada y el tiempo de cada
+        arista se evalúa a la hora en que se entra en ella. Como los perfiles
+        cumplen FIFO (salir más tarde nunca hace llegar antes), el Dijkstra
+        habitual sobre horas de llegada es exacto. Sin perfiles asignados
+        equivale a dijkstra(origen, destino, 'tiempo').
+        
+        Args:
+            origen (str): Vértice de inicio
+            destino (str): Vértice de destino
+            hora_salida (float): Minutos desde la medianoche (p. ej. 450 = 7:30)
+            
+        Returns:
+            Tuple[List[str], float]: (camino_optimo, duracion_en_minutos)
+        """
+        if origen not in self.vertices or destino not in self.vertices:
+            return [], float('inf')
+        if self._sin_ruta(origen, destino):
+            self.nodos_asentados = 0
+            return [], float('inf')
+        
+        perfiles = self.perfiles_tiempo
+        llegadas = {origen: hora_salida}
+        predecesores = {origen: None}
+        visitados = set()
+        cola_prioridad = [(hora_salida, origen)]
+        
+        while cola_prioridad:
+            hora_actual, vertice_actual = heapq.heappop(cola_prioridad)
+            if vertice_actual in visitados:
+                continue
+            visitados.add(vertice_actual)
+            if vertice_actual == destino:
+                break
+            
+            # Solo los vértices con aristas dependientes pagan la evaluación
+            perfiles_origen = perfiles.de_origen(vertice_actual)
+            for vecino, _, tiempo in self.obtener_vecinos(vertice_actual):
+                if perfiles_origen is not None:
+                    perfil = perfiles_origen.get(vecino)
+                    if perfil is not None:
+                        tiempo *= perfiles.factor(perfil, hora_actual)
+                nueva_hora = hora_actual + tiempo
+                if nueva_hora < llegadas.get(vecino, float('inf')):
+                    llegadas[vecino] = nueva_hora
+                    predecesores[vecino] = vertice_actual
+                    heapq.heappush(cola_prioridad, (nueva_hora, vecino))
+        
+        self.nodos_asentados = len(visitados)
+        
+        if destino not in visitados:
             return [], float('inf')
         
-        return camino, distancias[destino]
+        return self.reconstruir_camino(predecesores, destino), llegadas[destino] - hora_salida
+    
+    def matriz_distancias(self, origenes: List[str], destinos: List[str],
+                          criterio: str = 'distancia', con_predecesores: bool = False):
+        """
+        Calcula el coste óptimo entre cada origen y cada destino.
+        
+        Hace una sola búsqueda por origen, que se detiene en cuanto todos los
+        destinos quedan asentados, en lugar de len(origenes) * len(destinos)
+        llamadas a dijkstra().
+        
+        Args:
+            origenes (List[str]): Vértices de partida (filas)
+            destinos (List[str]): Vértices de llegada (columnas)
+            criterio (str): 'distancia' o 'tiempo' - métrica a minimizar
+            con_predecesores (bool): Si es True, también retorna el árbol de
+                                     predecesores de cada origen
+            
+        Returns:
+            List[List[float]]: Matriz de costes (float('inf') si no hay ruta),
+                               convertible con numpy.asarray(). Con
+                               con_predecesores=True retorna (matriz, predecesores),
+                               donde predecesores[i] sirve para reconstruir_camino()
+        """
+        matriz = []
+        predecesores = []
+        
+        for origen in origenes:
+            if origen in self.vertices:
+                costes, arbol = self._dijkstra_multidestino(origen, destinos, criterio)
+            else:
+                costes, arbol = {}, {}
+            matriz.append([costes.get(destino, float('inf')) for destino in destinos])
+            predecesores.append(arbol)
+        
+        if con_predecesores:
+            return matriz, predecesores
+        return matriz
+    
+    def _dijkstra_multidestino(self, origen: str, destinos: List[str],
+                               criterio: str) -> Tuple[Dict[str, float], Dict[str, Optional[str]]]:
+        """
+        Dijkstra desde un origen que termina al asentar todos los destinos.
+        
+        El estado se crea solo para los vértices alcanzados.
+        
+        Returns:
+            Tuple[Dict, Dict]: (costes, predecesores) de los vértices asentados
+        """
+        indice_peso = 1 if criterio == 'distancia' else 2
+        pendientes = {destino for destino in destinos if destino in self.vertices}
+        tentativos = {origen: 0}
+        costes = {}
+        predecesores = {origen: None}
+        cola_prioridad = [(0, origen)]
+        
+        while cola_prioridad and pendientes:
+            coste_actual, vertice_actual = heapq.heappop(cola_prioridad)
+            if vertice_actual in costes:
+                continue
+            costes[vertice_actual] = coste_actual
+            pendientes.discard(vertice_actual)
+            
+            for arista in self.obtener_vecinos(vertice_actual):
+                vecino = arista[0]
+                if vecino in costes:
+                    continue
+                nuevo_coste = coste_actual + arista[indice_peso]
+                if nuevo_coste < tentativos.get(vecino, float('inf')):
+                    tentativos[vecino] = nuevo_coste
+                    predecesores[vecino] = vertice_actual
+                    heapq.heappush(cola_prioridad, (nuevo_coste, vecino))
+        
+        self.nodos_asentados = len(costes)
+        return costes, {v: predecesores[v] for v in costes}
+    
+    @staticmethod
+    def reconstruir_camino(predecesores: Dict[str, Optional[str]], destino: str) -> List[str]:
+        """
+        Reconstruye un camino a partir de un árbol de predecesores.
+        
+        Args:
+            predecesores (dict): {vertice: predecesor}, con None en la raíz
+            destino (str): Vértice final del camino
+            
+        Returns:
+            List[str]: Camino desde la raíz hasta el destino, o [] si el
+                       destino no está en el árbol
+        """
+        if destino not in predecesores:
+            return []
+        camino = []
+        vertice_actual = destino
+        while vertice_actual is not None:
+            camino.append(vertice_actual)
+            vertice_actual = predecesores[vertice_actual]
+        camino.reverse()
+        return camino
     
     def bfs(self, origen: str, destino: str) -> Tuple[bool, List[str]]:
         """
         Búsqueda en anchura (BFS) para verificar conectividad.
         
+        Guarda un solo predecesor por vértice visitado (memoria O(V)) y
+        reconstruye el camino al final.
+        
         Args:
             origen (str): Vértice de inicio
             destino (str): Vértice de destino
@@ -156,25 +1178,26 @@ class Grafo:
         """
         if origen not in self.vertices or destino not in self.vertices:
             return False, []
+        if self._sin_ruta(origen, destino):
+            return False, []
         
         if origen == destino:
             return True, [origen]
         
-        visitados = set([origen])
-        cola = deque([(origen, [origen])])
+        predecesores = {origen: None}
+        cola = deque([origen])
         
         while cola:
-            vertice_actual, camino = cola.popleft()
+            vertice_actual = cola.popleft()
             
             for vecino, _, _ in self.obtener_vecinos(vertice_actual):
-                if vecino not in visitados:
-                    nuevo_camino = camino + [vecino]
+                if vecino not in predecesores:
+                    predecesores[vecino] = vertice_actual
                     
                     if vecino == destino:
-                        return True, nuevo_camino
+                        return True, self.reconstruir_camino(predecesores, destino)
                     
-                    visitados.add(vecino)
-                    cola.append((vecino, nuevo_camino))
+                    cola.append(vecino)
         
         return False, []
     
@@ -182,6 +1205,10 @@ class Grafo:
         """
         Búsqueda en profundidad (DFS) para verificar conectividad.
         
+        Usa una pila explícita de iteradores en lugar de recursión, por lo
+        que no depende del límite de recursión de Python en corredores
+        largos. Visita los vértices en el mismo orden que la versión recursiva.
+        
         Args:
             origen (str): Vértice de inicio
             destino (str): Vértice de destino
@@ -191,28 +1218,153 @@ class Grafo:
         """
         if origen not in self.vertices or destino not in self.vertices:
             return False, []
+        if self._sin_ruta(origen, destino):
+            return False, []
         
-        visitados = set()
-        camino = []
+        if origen == destino:
+            return True, [origen]
         
-        def dfs_recursivo(vertice_actual):
-            if vertice_actual == destino:
-                camino.append(vertice_actual)
-                return True
+        visitados = {origen}
+        # La pila contiene exactamente el camino actual desde el origen
+        pila = [(origen, iter(self.obtener_vecinos(origen)))]
+        
+        while pila:
+            _, vecinos = pila[-1]
             
-            visitados.add(vertice_actual)
-            camino.append(vertice_actual)
+            for vecino, _, _ in vecinos:
+                if vecino in visitados:
+                    continue
+                if vecino == destino:
+                    return True, [vertice for vertice, _ in pila] + [destino]
+                visitados.add(vecino)
+                pila.append((vecino, iter(self.obtener_vecinos(vecino))))
+                break
+            else:
+                # Sin vecinos por explorar: retroceder
+                pila.pop()
+        
+        return False, []
+    
+    def recorrer_bfs(self, origen: str) -> Iterator[str]:
+        """
+        Recorre en anchura los vértices alcanzables desde un origen.
+        
+        Es un generador: los vértices se producen a medida que se descubren,
+        así que el llamador puede detenerse en cualquier momento.
+        
+        Args:
+            origen (str): Vértice de inicio
             
+        Yields:
+            str: Vértices en orden BFS (empezando por el origen)
+        """
+        if origen not in self.vertices:
+            return
+        
+        visitados = {origen}
+        cola = deque([origen])
+        yield origen
+        
+        while cola:
+            vertice_actual = cola.popleft()
             for vecino, _, _ in self.obtener_vecinos(vertice_actual):
                 if vecino not in visitados:
-                    if dfs_recursivo(vecino):
-                        return True
+                    visitados.add(vecino)
+                    cola.append(vecino)
+                    yield vecino
+    
+    def recorrer_dfs(self, origen: str) -> Iterator[str]:
+        """
+        Recorre en profundidad (preorden) los vértices alcanzables desde un origen.
+        
+        Es un generador con pila explícita, sin recursión.
+        
+        Args:
+            origen (str): Vértice de inicio
             
-            camino.pop()
-            return False
+        Yields:
+            str: Vértices en el orden en que la DFS los visita
+        """
+        if origen not in self.vertices:
+            return
         
-        encontrado = dfs_recursivo(origen)
-        return encontrado, camino if encontrado else []
+        visitados = {origen}
+        pila = [iter(self.obtener_vecinos(origen))]
+        yield origen
+        
+        while pila:
+            for vecino, _, _ in pila[-1]:
+                if vecino not in visitados:
+                    visitados.add(vecino)
+                    pila.append(iter(self.obtener_vecinos(vecino)))
+                    yield vecino
+                    break
+            else:
+                pila.pop()
+    
+    def vertices_cercanos(self, coordenadas: Tuple[float, float], k: int = 1,
+                          radio_maximo: float = float('inf')) -> List[Tuple[float, str]]:
+        """
+        Busca los k vértices más cercanos a un punto usando el índice espacial.
+        
+        Args:
+            coordenadas (tuple): Punto (lon, lat)
+            k (int): Número de vértices
+            radio_maximo (float): Distancia máxima, en grados como las coordenadas
+            
+        Returns:
+            List[Tuple[float, str]]: (distancia, vertice) del más cercano al más lejano
+        """
+        return self.indice_espacial.mas_cercanos(coordenadas[0], coordenadas[1], k, radio_maximo)
+    
+    def ajustar_a_red(self, coordenadas: Tuple[float, float],
+                      candidatos: int = 8) -> Optional[Dict]:
+        """
+        Ajusta un punto arbitrario (p. ej. una posición GPS) a la calle más cercana.
+        
+        Se proyecta el punto sobre las aristas que salen o llegan a los
+        `candidatos` vértices más cercanos y se elige la proyección más próxima.
+        
+        Args:
+            coordenadas (tuple): Punto (lon, lat)
+            candidatos (int): Vértices cercanos cuyas aristas se consideran
+            
+        Returns:
+            Dict: {'origen', 'destino', 'fraccion', 'punto', 'distancia_metros'},
+                  donde fraccion indica la posición sobre la arista (0 = origen);
+                  si los vértices cercanos no tienen aristas, origen y destino
+                  son el vértice más cercano. None si no hay vértices con coordenadas
+        """
+        cercanos = self.vertices_cercanos(coordenadas, candidatos)
+        if not cercanos:
+            return None
+        
+        mejor = None
+        for _, vertice in cercanos:
+            aristas = [(vertice, vecino) for vecino, _, _ in self.obtener_vecinos(vertice)]
+            aristas += [(anterior, vertice) for anterior, _, _ in self.obtener_entrantes(vertice)]
+            for origen, destino in aristas:
+                if origen not in self.coordenadas or destino not in self.coordenadas:
+                    continue
+                fraccion, punto = proyectar_en_segmento(coordenadas, self.coordenadas[origen],
+                                                        self.coordenadas[destino])
+                distancia = math.hypot(punto[0] - coordenadas[0], punto[1] - coordenadas[1])
+                if mejor is None or distancia < mejor[0]:
+                    mejor = (distancia, origen, destino, fraccion, punto)
+        
+        if mejor is None:
+            # Vértices aislados: se ajusta al más cercano
+            distancia, vertice = cercanos[0]
+            mejor = (distancia, vertice, vertice, 0.0, self.coordenadas[vertice])
+        
+        _, origen, destino, fraccion, punto = mejor
+        return {
+            'origen': origen,
+            'destino': destino,
+            'fraccion': fraccion,
+            'punto': punto,
+            'distancia_metros': distancia_haversine(coordenadas, punto),
+        }
     
     def obtener_info_vertice(self, vertice: str) -> Dict:
         """
@@ -228,25 +1380,51 @@ class Grafo:
             'id': vertice,
             'nombre': self.nombres_vertices.get(vertice, vertice),
             'coordenadas': self.coordenadas.get(vertice, (0, 0)),
-            'grado_salida': len(self.adyacencias.get(vertice, []))
+            'grado_salida': self.grado_salida(vertice)
         }
     
     def obtener_todos_vertices(self) -> List[str]:
         """Retorna una lista ordenada de todos los vértices."""
         return sorted(list(self.vertices))
     
-    def obtener_estadisticas(self) -> Dict:
+    def obtener_estadisticas(self, incluir_componentes: bool = False) -> Dict:
         """
-        Calcula estadísticas generales del grafo.
+        Obtiene estadísticas generales del grafo.
+        
+        Los contadores se mantienen al agregar vértices y aristas o cambiar
+        pesos (ver EstadisticasGrafo), así que la consulta no recorre el
+        grafo. La estructura de componentes fuertemente conexas solo se
+        incluye si ya está preparada, o si se pide con incluir_componentes;
+        prepararla hace que cada agregar_arista() la mantenga, así que una
+        simple lectura no la activa.
         
+        Args:
+            incluir_componentes (bool): Preparar las componentes si aún no lo están
+            
         Returns:
-            Dict: Diccionario con estadísticas
+            Dict: num_vertices, num_aristas, densidad, grado_medio,
+                  histogramas de grados ({grado: vértices}), resumen
+                  {'min', 'max', 'media'} de cada criterio, caja de
+                  coordenadas y, si están preparadas, estructura de componentes
         """
+        if incluir_componentes and self.componentes is None:
+            self.preparar_componentes()
+        
+        contadores = self.estadisticas
         num_vertices = len(self.vertices)
-        num_aristas = sum(len(vecinos) for vecinos in self.adyacencias.values())
+        num_aristas = contadores.num_aristas
         
-        return {
+        estadisticas = {
             'num_vertices': num_vertices,
             'num_aristas': num_aristas,
-            'densidad': num_aristas / (num_vertices * (num_vertices - 1)) if num_vertices > 1 else 0
+            'densidad': num_aristas / (num_vertices * (num_vertices - 1)) if num_vertices > 1 else 0,
+            'grado_medio': num_aristas / num_vertices if num_vertices else 0,
+            'histograma_grado_salida': dict(contadores.histograma_salida),
+            'histograma_grado_entrada': dict(contadores.histograma_entrada),
+            'distancia': contadores.pesos['distancia'].resumen(),
+            'tiempo': contadores.pesos['tiempo'].resumen(),
+            'caja_coordenadas': contadores.caja_coordenadas(),
         }
+        if self.componentes is not None:
+            estadisticas.update(self.componentes.estadisticas())
+        return estadisticas
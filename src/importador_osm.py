@@ -0,0 +1,327 @@
+"""
+Módulo: importador_osm.py
+Descripción: Importa la red vial de un extracto de OpenStreetMap (.osm, XML)
+             leyéndolo en flujo, y la carga en bloque en un Grafo.
+Autor: CityNavigator
+Fecha: Enero 2026
+"""
+
+import argparse
+from array import array
+import bz2
+from collections import Counter
+import gzip
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+import xml.etree.ElementTree as ET
+
+from almacenamiento_csr import AlmacenamientoCSR
+from grafo import Grafo, distancia_haversine
+from instantanea import cargar_con_instantanea, guardar_instantanea, huella_fuentes
+
+# Tipos de vía (etiqueta highway) por los que circulan vehículos, con su
+# velocidad en km/h cuando la vía no trae maxspeed
+VELOCIDADES = {
+    'motorway': 100, 'motorway_link': 60,
+    'trunk': 80, 'trunk_link': 50,
+    'primary': 60, 'primary_link': 40,
+    'secondary': 50, 'secondary_link': 40,
+    'tertiary': 40, 'tertiary_link': 30,
+    'unclassified': 30, 'residential': 30, 'road': 30,
+    'living_street': 10, 'service': 15,
+}
+
+# Tipos de vía que son de sentido único aunque no tengan la etiqueta oneway
+SENTIDO_UNICO_IMPLICITO = {'motorway', 'motorway_link'}
+
+# Valores de access / motor_vehicle que cierran la vía al tráfico general
+ACCESO_CERRADO = {'no', 'private'}
+
+# Cada cuántos elementos (nodos + vías) se informa el progreso
+INTERVALO_PROGRESO = 100000
+
+MILLA_KM = 1.609344
+
+
+def _abrir(ruta: str):
+    """Abre el extracto en binario, descomprimiéndolo si termina en .gz o .bz2."""
+    if ruta.endswith('.gz'):
+        return gzip.open(ruta, 'rb')
+    if ruta.endswith('.bz2'):
+        return bz2.open(ruta, 'rb')
+    return open(ruta, 'rb')
+
+
+def velocidad_maxima(valor: Optional[str]) -> Optional[float]:
+    """
+    Interpreta una etiqueta maxspeed ("60", "60 km/h", "30 mph", "50;60").
+
+    Returns:
+        Optional[float]: Velocidad en km/h, o None si no es numérica
+                         (p. ej. "VE:urban" o "none")
+    """
+    if not valor:
+        return None
+    valor = valor.split(';')[0].strip().lower()
+    factor = 1.0
+    if valor.endswith('mph'):
+        factor = MILLA_KM
+        valor = valor[:-3]
+    elif valor.endswith('km/h'):
+        valor = valor[:-4]
+    try:
+        velocidad = float(valor) * factor
+    except ValueError:
+        return None
+    return velocidad if velocidad > 0 else None
+
+
+def sentido_via(etiquetas: Dict[str, str]) -> int:
+    """
+    Determina el sentido de circulación de una vía.
+
+    Returns:
+        int: 1 si solo se circula en el orden de sus nodos, -1 si solo en el
+             orden inverso, 0 si en ambos
+    """
+    oneway = etiquetas.get('oneway')
+    if oneway in ('yes', 'true', '1'):
+        return 1
+    if oneway in ('-1', 'reverse'):
+        return -1
+    if oneway in ('no', 'false', '0'):
+        return 0
+    if (etiquetas.get('highway') in SENTIDO_UNICO_IMPLICITO
+            or etiquetas.get('junction') in ('roundabout', 'circular')):
+        return 1
+    return 0
+
+
+def es_rutable(etiquetas: Dict[str, str]) -> bool:
+    """Indica si una vía es una calle abierta a vehículos."""
+    if etiquetas.get('highway') not in VELOCIDADES or etiquetas.get('area') == 'yes':
+        return False
+    for clave in ('access', 'motor_vehicle', 'vehicle'):
+        if etiquetas.get(clave) in ACCESO_CERRADO:
+            return False
+    return True
+
+
+def imprimir_progreso(contadores: Dict):
+    """Informa el avance de la lectura por consola."""
+    print(f"  {contadores['nodos']:>12,} nodos  {contadores['vias']:>10,} vías  "
+          f"({contadores['nodos_por_segundo']:,.0f} nodos/s)")
+
+
+def importar_osm(ruta: str, progreso: Optional[Callable[[Dict], None]] = imprimir_progreso
+                 ) -> Tuple[Grafo, Dict]:
+    """
+    Lee un extracto .osm en una sola pasada y construye el grafo vial.
+
+    El XML se recorre con iterparse y cada nodo o vía se descarta del árbol
+    en cuanto se procesa, así que la memoria del análisis no crece con el
+    archivo; de cada nodo solo se guardan id y coordenadas en arreglos
+    compactos. Las vías rutables se parten en las intersecciones (nodos
+    compartidos por más de una vía) y en sus extremos: cada tramo es una
+    arista con su longitud haversine en metros y su tiempo en minutos según
+    maxspeed o la velocidad por defecto de su tipo. Las vías de sentido
+    único solo generan la arista de su sentido.
+
+    Args:
+        ruta (str): Archivo .osm (también .osm.gz o .osm.bz2)
+        progreso: Función que recibe los contadores cada INTERVALO_PROGRESO
+                  elementos (None para no informar)
+
+    Returns:
+        Tuple[Grafo, Dict]: Grafo en modo compacto y resumen de la
+            importación: nodos, vias, vias_rutables, segundos y
+            nodos_por_segundo de la lectura; vertices, aristas y
+            segundos_construccion del grafo
+    """
+    inicio = time.perf_counter()
+    ids_nodos = array('q')
+    longitudes = array('d')
+    latitudes = array('d')
+
+    # Vías rutables: sus nodos seguidos en un solo arreglo
+    referencias = array('q')
+    inicios_vias = array('q', [0])
+    velocidades = array('d')
+    sentidos = array('b')
+    nombres_vias: List[str] = []
+    num_nodos = num_vias = elementos = 0
+
+    def contadores() -> Dict:
+        segundos = time.perf_counter() - inicio
+        return {'nodos': num_nodos, 'vias': num_vias, 'vias_rutables': len(sentidos),
+                'segundos': segundos,
+                'nodos_por_segundo': num_nodos / segundos if segundos else 0.0}
+
+    with _abrir(ruta) as archivo:
+        contexto = ET.iterparse(archivo, events=('start', 'end'))
+        _, raiz = next(contexto)
+        for evento, elemento in contexto:
+            if evento != 'end':
+                continue
+            etiqueta = elemento.tag
+            if etiqueta == 'node':
+                num_nodos += 1
+                ids_nodos.append(int(elemento.get('id')))
+                longitudes.append(float(elemento.get('lon')))
+                latitudes.append(float(elemento.get('lat')))
+            elif etiqueta == 'way':
+                num_vias += 1
+                etiquetas = {hijo.get('k'): hijo.get('v') for hijo in elemento.iter('tag')}
+                if es_rutable(etiquetas):
+                    nodos = [int(hijo.get('ref')) for hijo in elemento.iter('nd')]
+                    if len(nodos) >= 2:
+                        referencias.extend(nodos)
+                        inicios_vias.append(len(referencias))
+                        velocidades.append(velocidad_maxima(etiquetas.get('maxspeed'))
+                                           or VELOCIDADES[etiquetas['highway']])
+                        sentidos.append(sentido_via(etiquetas))
+                        nombres_vias.append(etiquetas.get('name') or etiquetas.get('ref') or '')
+            elif etiqueta != 'relation':
+                continue
+            # Nodo, vía o relación terminados: se sueltan del árbol
+            raiz.clear()
+            elementos += 1
+            if progreso is not None and elementos % INTERVALO_PROGRESO == 0:
+                progreso(contadores())
+
+    resumen = contadores()
+    inicio_construccion = time.perf_counter()
+
+    # Coordenadas solo de los nodos que usan las vías rutables
+    usos = Counter(referencias)
+    coordenadas_nodos = {id_nodo: (longitudes[i], latitudes[i])
+                         for i, id_nodo in enumerate(ids_nodos) if id_nodo in usos}
+    del ids_nodos, longitudes, latitudes
+
+    # Vértices (índices densos) y aristas en arreglos paralelos
+    indices: Dict[int, int] = {}
+    ids_vertices: List[int] = []
+    calles: List[List[str]] = []  # Nombres de las vías que pasan por cada vértice
+    origenes = array('q')
+    destinos = array('q')
+    distancias = array('d')
+    tiempos = array('d')
+
+    def vertice(nodo: int, nombre: str) -> int:
+        i = indices.get(nodo)
+        if i is None:
+            i = indices[nodo] = len(ids_vertices)
+            ids_vertices.append(nodo)
+            calles.append([])
+        if nombre and nombre not in calles[i]:
+            calles[i].append(nombre)
+        return i
+
+    def agregar_tramo(via: int, desde: int, hasta: int, distancia: float):
+        if desde == hasta:
+            return  # Vía cerrada sin otra intersección: no lleva a ningún lado
+        i = vertice(desde, nombres_vias[via])
+        j = vertice(hasta, nombres_vias[via])
+        tiempo = distancia / (velocidades[via] * 1000 / 60)
+        if sentidos[via] < 0:
+            i, j = j, i
+        origenes.append(i)
+        destinos.append(j)
+        distancias.append(distancia)
+        tiempos.append(tiempo)
+        if sentidos[via] == 0:
+            origenes.append(j)
+            destinos.append(i)
+            distancias.append(distancia)
+            tiempos.append(tiempo)
+
+    for via in range(len(sentidos)):
+        ultima = inicios_vias[via + 1] - 1
+        desde = anterior = None
+        distancia = 0.0
+        for posicion in range(inicios_vias[via], ultima + 1):
+            nodo = referencias[posicion]
+            coordenadas = coordenadas_nodos.get(nodo)
+            if coordenadas is None:
+                # Nodo fuera del extracto: la vía se corta en el último nodo presente
+                if desde is not None and anterior != desde:
+                    agregar_tramo(via, desde, anterior, distancia)
+                desde = None
+                continue
+            if desde is None:
+                desde, distancia = nodo, 0.0
+            else:
+                distancia += distancia_haversine(coordenadas_nodos[anterior], coordenadas)
+                if usos[nodo] > 1 or posicion == ultima:
+                    agregar_tramo(via, desde, nodo, distancia)
+                    desde, distancia = nodo, 0.0
+            anterior = nodo
+
+    # CSR: aristas ordenadas por origen (el orden de sorted() es estable)
+    orden = sorted(range(len(origenes)), key=origenes.__getitem__)
+    csr = AlmacenamientoCSR()
+    csr.ids = [str(nodo) for nodo in ids_vertices]
+    csr.indice = {id_vertice: i for i, id_vertice in enumerate(csr.ids)}
+    csr.destinos = array('q', map(destinos.__getitem__, orden))
+    csr.distancias = array('d', map(distancias.__getitem__, orden))
+    csr.tiempos = array('d', map(tiempos.__getitem__, orden))
+    grados = Counter(origenes)
+    desplazamientos = array('q', [0])
+    for i in range(len(ids_vertices)):
+        desplazamientos.append(desplazamientos[-1] + grados[i])
+    csr.desplazamientos = desplazamientos
+
+    nombres = {csr.ids[i]: ' con '.join(nombres[:2]) for i, nombres in enumerate(calles) if nombres}
+    coordenadas = {csr.ids[i]: coordenadas_nodos[nodo] for i, nodo in enumerate(ids_vertices)}
+    grafo = Grafo.desde_csr(csr, nombres, coordenadas)
+
+    resumen['vertices'] = len(csr.ids)
+    resumen['aristas'] = len(csr.destinos)
+    resumen['segundos_construccion'] = time.perf_counter() - inicio_construccion
+    return grafo, resumen
+
+
+def cargar_grafo_osm(ruta_osm: str, ruta_instantanea: Optional[str] = None) -> Grafo:
+    """
+    Carga el grafo de un extracto .osm a través de su instantánea binaria.
+
+    La primera vez se importa el extracto y se guarda la instantánea; las
+    siguientes se abre con mmap mientras el extracto no cambie. Al ser una
+    función de módulo sirve como cargador de resolver_lote().
+
+    Args:
+        ruta_osm (str): Archivo .osm
+        ruta_instantanea (str): Archivo de la instantánea (por defecto, el
+                                extracto con extensión .bin)
+
+    Returns:
+        Grafo: Grafo en modo compacto
+    """
+    if ruta_instantanea is None:
+        ruta_instantanea = ruta_osm + '.bin'
+    return cargar_con_instantanea(lambda: importar_osm(ruta_osm, progreso=None)[0],
+                                  ruta_instantanea, [ruta_osm])
+
+
+def main():
+    """Importa un extracto desde la línea de comandos y muestra el resumen."""
+    parser = argparse.ArgumentParser(description="Importa la red vial de un extracto de OpenStreetMap")
+    parser.add_argument('extracto', help="Archivo .osm, .osm.gz u .osm.bz2")
+    parser.add_argument('--instantanea', help="Guarda el grafo en esta instantánea binaria")
+    argumentos = parser.parse_args()
+
+    print(f"Importando {argumentos.extracto}...")
+    grafo, resumen = importar_osm(argumentos.extracto)
+    print(f"Leídos {resumen['nodos']:,} nodos y {resumen['vias']:,} vías "
+          f"({resumen['vias_rutables']:,} rutables) en {resumen['segundos']:.1f} s "
+          f"({resumen['nodos_por_segundo']:,.0f} nodos/s)")
+    print(f"Grafo: {resumen['vertices']:,} intersecciones y {resumen['aristas']:,} aristas "
+          f"construido en {resumen['segundos_construccion']:.1f} s")
+
+    if argumentos.instantanea:
+        guardar_instantanea(grafo, argumentos.instantanea, huella_fuentes([argumentos.extracto]))
+        print(f"Instantánea guardada en {argumentos.instantanea}")
+
+
+if __name__ == "__main__":
+    main()
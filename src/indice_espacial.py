@@ -0,0 +1,236 @@
+"""
+Módulo: indice_espacial.py
+Descripción: Índice espacial de rejilla uniforme sobre las coordenadas de los
+             vértices, para buscar los más cercanos a un punto sin recorrer
+             todo el grafo.
+Autor: CityNavigator
+Fecha: Enero 2026
+"""
+
+import heapq
+import math
+from typing import Dict, List, Tuple
+
+# Lado inicial de cada celda, en las unidades de las coordenadas (grados)
+TAMANO_CELDA = 0.01
+
+# Si hay más puntos por celda ocupada que esto, se reduce la celda a la mitad
+MAX_POR_CELDA = 8
+
+# Lado mínimo de celda (evita dividir sin fin con puntos repetidos)
+TAMANO_MINIMO = 1e-6
+
+
+class IndiceEspacial:
+    """
+    Rejilla uniforme de puntos con actualización incremental.
+
+    Cada vértice se guarda en la celda que contiene sus coordenadas. Las
+    búsquedas examinan anillos de celdas alrededor del punto, de dentro
+    hacia fuera, y paran cuando ningún anillo restante puede contener algo
+    más cercano. Cuando las celdas se llenan demasiado, la rejilla se
+    reconstruye con celdas más pequeñas.
+
+    Las distancias son euclidianas en las unidades de las coordenadas, como
+    en la visualización del mapa.
+
+    Atributos:
+        tamano_celda (float): Lado de cada celda
+        posiciones (dict): Coordenadas de cada vértice indexado
+        celdas (dict): {(columna, fila): [vertice, ...]}
+    """
+
+    def __init__(self, tamano_celda: float = TAMANO_CELDA):
+        """
+        Inicializa un índice vacío.
+
+        Args:
+            tamano_celda: Lado inicial de cada celda
+        """
+        self.tamano_celda = tamano_celda
+        self.posiciones: Dict[str, Tuple[float, float]] = {}
+        self.celdas: Dict[Tuple[int, int], List[str]] = {}
+        self._siguiente_revision = MAX_POR_CELDA
+
+    def _celda(self, x: float, y: float) -> Tuple[int, int]:
+        """Retorna la celda que contiene un punto."""
+        return (math.floor(x / self.tamano_celda), math.floor(y / self.tamano_celda))
+
+    def insertar(self, vertice: str, coordenadas: Tuple[float, float]):
+        """
+        Agrega un vértice o lo mueve si ya estaba indexado.
+
+        Args:
+            vertice: Identificador del vértice
+            coordenadas: (x, y), p. ej. (longitud, latitud)
+        """
+        if vertice in self.posiciones:
+            self.eliminar(vertice)
+        x, y = coordenadas
+        self.posiciones[vertice] = (x, y)
+        self.celdas.setdefault(self._celda(x, y), []).append(vertice)
+
+        if len(self.posiciones) >= self._siguiente_revision:
+            self._siguiente_revision = 2 * len(self.posiciones)
+            while (len(self.posiciones) > MAX_POR_CELDA * len(self.celdas)
+                   and self.tamano_celda / 2 >= TAMANO_MINIMO):
+                self._reconstruir(self.tamano_celda / 2)
+
+    def cargar(self, coordenadas: Dict[str, Tuple[float, float]]):
+        """
+        Indexa muchos vértices de una vez (p. ej. al abrir un grafo guardado).
+
+        El tamaño de celda se estima de la extensión de los puntos para que
+        haya unos MAX_POR_CELDA / 2 por celda, y los puntos se reparten una
+        sola vez.
+
+        Args:
+            coordenadas: {vertice: (x, y)}
+        """
+        self.posiciones.update(coordenadas)
+        n = len(self.posiciones)
+        if n > MAX_POR_CELDA:
+            xs = [x for x, _ in self.posiciones.values()]
+            ys = [y for _, y in self.posiciones.values()]
+            area = max(max(xs) - min(xs), TAMANO_MINIMO) * max(max(ys) - min(ys), TAMANO_MINIMO)
+            estimado = math.sqrt(area * MAX_POR_CELDA / 2 / n)
+            self.tamano_celda = min(self.tamano_celda, max(estimado, TAMANO_MINIMO))
+        self._reconstruir(self.tamano_celda)
+        while (n > MAX_POR_CELDA * len(self.celdas)
+               and self.tamano_celda / 2 >= TAMANO_MINIMO):
+            self._reconstruir(self.tamano_celda / 2)
+        self._siguiente_revision = max(MAX_POR_CELDA, 2 * n)
+
+    def eliminar(self, vertice: str):
+        """Quita un vértice del índice (si está)."""
+        posicion = self.posiciones.pop(vertice, None)
+        if posicion is None:
+            return
+        celda = self._celda(*posicion)
+        ocupantes = self.celdas[celda]
+        ocupantes.remove(vertice)
+        if not ocupantes:
+            del self.celdas[celda]
+
+    def _reconstruir(self, tamano_celda: float):
+        """Vuelve a repartir todos los puntos con otro tamaño de celda."""
+        self.tamano_celda = tamano_celda
+        self.celdas = celdas = {}
+        floor = math.floor
+        for vertice, (x, y) in self.posiciones.items():
+            # Igual que _celda(), sin la llamada por punto
+            celda = (floor(x / tamano_celda), floor(y / tamano_celda))
+            ocupantes = celdas.get(celda)
+            if ocupantes is None:
+                celdas[celda] = [vertice]
+            else:
+                ocupantes.append(vertice)
+
+    def en_radio(self, x: float, y: float, radio: float) -> List[Tuple[float, str]]:
+        """
+        Busca los vértices a una distancia de (x, y) no mayor que `radio`.
+
+        Returns:
+            List[Tuple[float, str]]: (distancia, vertice) ordenados por distancia
+        """
+        columna_min, fila_min = self._celda(x - radio, y - radio)
+        columna_max, fila_max = self._celda(x + radio, y + radio)
+        encontrados = []
+
+        if (columna_max - columna_min + 1) * (fila_max - fila_min + 1) > len(self.celdas):
+            # Radio enorme: es más barato revisar solo las celdas ocupadas
+            candidatas = self.celdas.values()
+        else:
+            candidatas = (self.celdas.get((columna, fila), ())
+                          for columna in range(columna_min, columna_max + 1)
+                          for fila in range(fila_min, fila_max + 1))
+
+        for ocupantes in candidatas:
+            for vertice in ocupantes:
+                px, py = self.posiciones[vertice]
+                distancia = math.hypot(px - x, py - y)
+                if distancia <= radio:
+                    encontrados.append((distancia, vertice))
+
+        encontrados.sort()
+        return encontrados
+
+    def mas_cercanos(self, x: float, y: float, k: int = 1,
+                     radio_maximo: float = float('inf')) -> List[Tuple[float, str]]:
+        """
+        Busca los k vértices más cercanos a (x, y).
+
+        Args:
+            x, y: Punto de consulta
+            k: Número de vértices
+            radio_maximo: Distancia máxima (los más lejanos se ignoran)
+
+        Returns:
+            List[Tuple[float, str]]: Hasta k pares (distancia, vertice), del más
+                                     cercano al más lejano
+        """
+        if k <= 0 or not self.posiciones:
+            return []
+
+        columna, fila = self._celda(x, y)
+        candidatos: List[Tuple[float, str]] = []
+        anillo = 0
+
+        while True:
+            if 8 * anillo > len(self.celdas):
+                # Quedan menos celdas ocupadas que celdas en el anillo
+                candidatos = [(math.hypot(px - x, py - y), v)
+                              for v, (px, py) in self.posiciones.items()]
+                break
+
+            for celda in self._anillo(columna, fila, anillo):
+                for vertice in self.celdas.get(celda, ()):
+                    px, py = self.posiciones[vertice]
+                    candidatos.append((math.hypot(px - x, py - y), vertice))
+
+            # Todo punto fuera de los anillos examinados está al menos a esta distancia
+            cota = anillo * self.tamano_celda
+            if cota > radio_maximo:
+                break
+            if len(candidatos) >= k and heapq.nsmallest(k, candidatos)[-1][0] <= cota:
+                break
+            anillo += 1
+
+        return [par for par in heapq.nsmallest(k, candidatos) if par[0] <= radio_maximo]
+
+    @staticmethod
+    def _anillo(columna: int, fila: int, anillo: int):
+        """Itera las celdas a distancia de Chebyshev `anillo` de una celda."""
+        if anillo == 0:
+            yield (columna, fila)
+            return
+        for desplazamiento in range(-anillo, anillo + 1):
+            yield (columna + desplazamiento, fila - anillo)
+            yield (columna + desplazamiento, fila + anillo)
+        for desplazamiento in range(-anillo + 1, anillo):
+            yield (columna - anillo, fila + desplazamiento)
+            yield (columna + anillo, fila + desplazamiento)
+
+    def __len__(self) -> int:
+        return len(self.posiciones)
+
+    def __contains__(self, vertice: str) -> bool:
+        return vertice in self.posiciones
+
+
+def proyectar_en_segmento(punto: Tuple[float, float], inicio: Tuple[float, float],
+                          fin: Tuple[float, float]) -> Tuple[float, Tuple[float, float]]:
+    """
+    Proyecta un punto sobre un segmento.
+
+    Returns:
+        Tuple[float, Tuple[float, float]]: (fraccion en [0, 1] desde el
+                                           inicio, punto proyectado)
+    """
+    dx, dy = fin[0] - inicio[0], fin[1] - inicio[1]
+    longitud2 = dx * dx + dy * dy
+    if longitud2 == 0:
+        return 0.0, inicio
+    fraccion = ((punto[0] - inicio[0]) * dx + (punto[1] - inicio[1]) * dy) / longitud2
+    fraccion = min(1.0, max(0.0, fraccion))
+    return fraccion, (inicio[0] + fraccion * dx, inicio[1] + fraccion * dy)
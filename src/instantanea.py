@@ -0,0 +1,220 @@
+"""
+Módulo: instantanea.py
+Descripción: Instantánea binaria del grafo (cabecera, tabla de cadenas,
+             arreglos CSR y coordenadas) que se abre con mmap para arrancar
+             sin reconstruir el grafo desde los datos fuente.
+Autor: CityNavigator
+Fecha: Enero 2026
+"""
+
+from array import array
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+from typing import Callable, Iterable, Optional
+
+from almacenamiento_csr import AlmacenamientoCSR
+from grafo import Grafo
+
+MAGIA = b'CNAVGRF\0'
+
+# Sube cada vez que cambia la disposición del archivo: las instantáneas
+# antiguas se descartan y se reconstruyen
+VERSION_FORMATO = 1
+
+# Secciones del archivo, en orden
+SECCIONES = ('ids', 'nombres', 'coordenadas', 'desplazamientos',
+             'destinos', 'distancias', 'tiempos', 'extras')
+
+# magia, versión, orden de bytes, reservado, n, m, huella, (inicio, longitud) por sección
+CABECERA = struct.Struct('<8sIHHqq32s%dq' % (2 * len(SECCIONES)))
+
+ORDEN_BYTES = {'little': 1, 'big': 2}[sys.byteorder]
+
+
+def huella_fuentes(rutas: Iterable[str]) -> bytes:
+    """
+    Calcula el SHA-256 de los archivos fuente de un grafo.
+
+    Un archivo inexistente cuenta como vacío, de modo que crearlo también
+    cambia la huella.
+
+    Args:
+        rutas: Archivos de los que depende el grafo
+
+    Returns:
+        bytes: Huella de 32 bytes
+    """
+    sha = hashlib.sha256(b'%d' % VERSION_FORMATO)
+    for ruta in rutas:
+        sha.update(os.path.basename(ruta).encode('utf-8') + b'\0')
+        if os.path.exists(ruta):
+            with open(ruta, 'rb') as f:
+                for bloque in iter(lambda: f.read(1 << 20), b''):
+                    sha.update(bloque)
+        sha.update(b'\0')
+    return sha.digest()
+
+
+def _tabla_cadenas(cadenas) -> bytes:
+    """Codifica una lista de cadenas separadas por el carácter nulo."""
+    tabla = '\0'.join(cadenas)
+    if tabla.count('\0') != max(len(cadenas) - 1, 0):
+        raise ValueError("Los identificadores y nombres no pueden contener '\\0'")
+    return tabla.encode('utf-8')
+
+
+def guardar_instantanea(grafo: Grafo, ruta: str, huella: bytes = b''):
+    """
+    Escribe la instantánea de un grafo.
+
+    El archivo se escribe aparte y se renombra al final, así que un proceso
+    que abra la instantánea nunca ve un archivo a medio escribir. Se guardan
+    los vértices, nombres, coordenadas, aristas y perfiles de tiempo; las
+    estructuras derivadas (landmarks, jerarquías, cachés) no.
+
+    Args:
+        grafo (Grafo): Grafo a guardar (si es compacto, se compacta primero)
+        ruta (str): Archivo de destino
+        huella (bytes): Huella de los datos fuente (ver huella_fuentes())
+    """
+    if grafo.csr is None:
+        csr = AlmacenamientoCSR.desde_adyacencias(grafo.vertices, grafo.adyacencias)
+    else:
+        grafo.compactar()
+        csr = grafo.csr
+
+    coordenadas = array('d')
+    for vertice in csr.ids:
+        coordenadas.extend(grafo.coordenadas.get(vertice, (math.nan, math.nan)))
+
+    perfiles = grafo.perfiles_tiempo
+    extras = {
+        # Sin la copia de los extremos que agrega PerfilesTiempo.agregar()
+        'perfiles': [list(zip(perfiles.horas[inicio + 1:fin - 1],
+                              perfiles.factores[inicio + 1:fin - 1]))
+                     for inicio, fin in zip(perfiles.inicios, perfiles.inicios[1:])],
+        'asignaciones': perfiles.asignaciones,
+    }
+
+    contenidos = [
+        _tabla_cadenas(csr.ids),
+        _tabla_cadenas([grafo.nombres_vertices.get(v, '') for v in csr.ids]),
+        coordenadas.tobytes(),
+        bytes(csr.desplazamientos),
+        bytes(csr.destinos),
+        bytes(csr.distancias),
+        bytes(csr.tiempos),
+        json.dumps(extras, ensure_ascii=False).encode('utf-8'),
+    ]
+
+    secciones = []
+    posicion = CABECERA.size
+    for contenido in contenidos:
+        secciones += [posicion, len(contenido)]
+        posicion += len(contenido) + (-len(contenido) % 8)  # Alineado a 8 bytes
+
+    temporal = f'{ruta}.{os.getpid()}.tmp'  # Único por proceso: pueden guardar a la vez
+    with open(temporal, 'wb') as f:
+        f.write(CABECERA.pack(MAGIA, VERSION_FORMATO, ORDEN_BYTES, 0,
+                              len(csr.ids), len(csr.destinos), huella.ljust(32, b'\0'),
+                              *secciones))
+        for contenido in contenidos:
+            f.write(contenido)
+            f.write(b'\0' * (-len(contenido) % 8))
+    os.replace(temporal, ruta)
+
+
+def abrir_instantanea(ruta: str, huella: Optional[bytes] = None) -> Optional[Grafo]:
+    """
+    Abre una instantánea con mmap.
+
+    Los arreglos de aristas no se leen: son vistas sobre las páginas del
+    archivo, que el sistema carga a medida que se usan y comparte entre los
+    procesos que abren el mismo archivo. El mapeo es copia-en-escritura, así
+    que modificar el grafo nunca altera el archivo.
+
+    Args:
+        ruta (str): Archivo de la instantánea
+        huella (bytes): Si se indica, la instantánea solo se acepta si fue
+                        guardada con esta huella
+
+    Returns:
+        Grafo: Grafo en modo compacto, o None si el archivo no existe, es de
+               otra versión u otra plataforma, o su huella no coincide
+    """
+    try:
+        with open(ruta, 'rb') as f:
+            mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    except (OSError, ValueError):
+        return None
+
+    if len(mapa) < CABECERA.size:
+        return None
+    magia, version, orden_bytes, _, n, m, huella_archivo, *secciones = \
+        CABECERA.unpack_from(mapa)
+    if magia != MAGIA or version != VERSION_FORMATO or orden_bytes != ORDEN_BYTES:
+        return None
+    if huella is not None and huella_archivo != huella.ljust(32, b'\0'):
+        return None
+
+    try:
+        vista = memoryview(mapa)
+        partes = {nombre: vista[inicio:inicio + longitud]
+                  for nombre, inicio, longitud in zip(SECCIONES, secciones[::2], secciones[1::2])}
+
+        csr = AlmacenamientoCSR()
+        csr.ids = str(partes['ids'], 'utf-8').split('\0') if n else []
+        csr.indice = {vertice: i for i, vertice in enumerate(csr.ids)}
+        csr.desplazamientos = partes['desplazamientos'].cast('q')
+        csr.destinos = partes['destinos'].cast('q')
+        csr.distancias = partes['distancias'].cast('d')
+        csr.tiempos = partes['tiempos'].cast('d')
+        if len(csr.ids) != n or len(csr.desplazamientos) != n + 1 or len(csr.destinos) != m:
+            return None
+
+        nombres = {vertice: nombre for vertice, nombre in
+                   zip(csr.ids, str(partes['nombres'], 'utf-8').split('\0')) if nombre}
+        valores = partes['coordenadas'].cast('d')
+        coordenadas = {vertice: (valores[2 * i], valores[2 * i + 1])
+                       for i, vertice in enumerate(csr.ids) if not math.isnan(valores[2 * i])}
+        extras = json.loads(str(partes['extras'], 'utf-8'))
+    except (ValueError, TypeError):
+        return None  # Archivo truncado o dañado
+
+    grafo = Grafo.desde_csr(csr, nombres, coordenadas)
+    for puntos in extras['perfiles']:
+        grafo.perfiles_tiempo.agregar([tuple(punto) for punto in puntos])
+    grafo.perfiles_tiempo.asignaciones = extras['asignaciones']
+    return grafo
+
+
+def cargar_con_instantanea(constructor: Callable[[], Grafo], ruta: str,
+                           fuentes: Iterable[str]) -> Grafo:
+    """
+    Abre la instantánea si está al día; si no, construye el grafo y la guarda.
+
+    Args:
+        constructor: Función que construye el grafo desde los datos fuente
+        ruta (str): Archivo de la instantánea
+        fuentes: Archivos de los que depende el grafo; si cambia alguno, la
+                 instantánea se reconstruye
+
+    Returns:
+        Grafo: Grafo listo para usar
+    """
+    huella = huella_fuentes(fuentes)
+    grafo = abrir_instantanea(ruta, huella)
+    if grafo is not None:
+        return grafo
+
+    grafo = constructor()
+    try:
+        guardar_instantanea(grafo, ruta, huella)
+    except OSError as e:
+        print(f"No se pudo guardar la instantánea del grafo: {e}")
+    return grafo
@@ -13,7 +13,7 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 
 from grafo import Grafo
-from datos_puerto_ordaz import crear_grafo_puerto_ordaz, obtener_puntos_interes
+from datos_puerto_ordaz import cargar_grafo_puerto_ordaz, obtener_puntos_interes
 from visualizador import dibujar_grafo, mostrar_info_ruta
 from modal_resultados import crear_modal_resultados
 from persistencia import GestorPersistencia
@@ -38,8 +38,8 @@ class AplicacionCityNavigator:
         self.ventana.state('zoomed')  # Maximizar ventana al iniciar
         self.ventana.configure(bg='#f0f0f0')
         
-        # Cargar el grafo de Puerto Ordaz
-        self.grafo = crear_grafo_puerto_ordaz()
+        # Cargar el grafo de Puerto Ordaz (desde su instantánea si está al día)
+        self.grafo = cargar_grafo_puerto_ordaz()
         self.puntos_interes = obtener_puntos_interes()
         
         # Variables de interfaz
@@ -201,6 +201,13 @@ class AplicacionCityNavigator:
                       bg='white',
                       font=('Segoe UI', 9)).pack(anchor='w', pady=2)
         
+        tk.Radiobutton(frame_algoritmo,
+                      text="A* (Ruta Óptima Dirigida)",
+                      variable=self.algoritmo_seleccionado,
+                      value='a_estrella',
+                      bg='white',
+                      font=('Segoe UI', 9)).pack(anchor='w', pady=2)
+        
         tk.Radiobutton(frame_algoritmo,
                       text="BFS (Búsqueda en Anchura)",
                       variable=self.algoritmo_seleccionado,
@@ -394,6 +401,10 @@ class AplicacionCityNavigator:
             criterio = self.criterio_busqueda.get()
             ruta, coste = self.grafo.dijkstra(origen, destino, criterio)
             self.mostrar_resultados_dijkstra(ruta, coste, criterio)
+        elif algoritmo == 'a_estrella':
+            criterio = self.criterio_busqueda.get()
+            ruta, coste = self.grafo.a_estrella(origen, destino, criterio)
+            self.mostrar_resultados_dijkstra(ruta, coste, criterio, 'A*')
         elif algoritmo == 'bfs':
             encontrado, ruta = self.grafo.bfs(origen, destino)
             self.mostrar_resultados_busqueda(ruta, encontrado, 'BFS')
@@ -401,20 +412,21 @@ class AplicacionCityNavigator:
             encontrado, ruta = self.grafo.dfs(origen, destino)
             self.mostrar_resultados_busqueda(ruta, encontrado, 'DFS')
     
-    def mostrar_resultados_dijkstra(self, ruta, coste, criterio):
+    def mostrar_resultados_dijkstra(self, ruta, coste, criterio, nombre_algoritmo='Dijkstra'):
         """
-        Muestra los resultados del algoritmo de Dijkstra.
+        Muestra los resultados de un algoritmo de ruta óptima (Dijkstra, A*).
         
         Args:
             ruta: Lista de vértices de la ruta
             coste: Coste total de la ruta
             criterio: Criterio usado ('distancia' o 'tiempo')
+            nombre_algoritmo: Nombre del algoritmo usado
         """
         # Guardar resultados para el modal
         self.ultima_ruta = ruta
         self.ultimo_coste = coste
         self.ultimo_criterio = criterio
-        self.ultimo_algoritmo = 'Dijkstra'
+        self.ultimo_algoritmo = nombre_algoritmo
         
         # Actualizar visualización con la ruta
         self.actualizar_visualizacion(ruta)
@@ -485,13 +497,18 @@ class AplicacionCityNavigator:
     
     def mostrar_estadisticas(self):
         """Muestra estadísticas del grafo en una ventana emergente."""
-        stats = self.grafo.obtener_estadisticas()
+        stats = self.grafo.obtener_estadisticas(incluir_componentes=True)
+        cache = self.grafo.cache_rutas.estadisticas()
         
         mensaje = f"""📊 ESTADÍSTICAS DE LA RED URBANA
         
 🔹 Número de intersecciones: {stats['num_vertices']}
 🔹 Número de calles (dirigidas): {stats['num_aristas']}
 🔹 Densidad del grafo: {stats['densidad']:.3f}
+🔹 Grado medio: {stats['grado_medio']:.2f} calles por intersección
+🔹 Longitud de calle: {stats['distancia']['min'] or 0:.0f}–{stats['distancia']['max'] or 0:.0f} m (media {stats['distancia']['media'] or 0:.0f} m)
+🔹 Componentes fuertemente conexas: {stats['num_componentes']} (mayor: {stats['componente_mayor']} intersecciones)
+🔹 Caché de rutas: {cache['aciertos']} aciertos, {cache['fallos']} fallos ({cache['tasa_aciertos']:.0%})
 
 📍 Puntos de Interés:
 """
@@ -619,24 +636,15 @@ class AplicacionCityNavigator:
     
     def conectar_nodo_en_posicion(self, lon, lat):
         """Conecta nodos haciendo clic en ellos."""
-        # Encontrar el nodo más cercano al clic
-        nodo_cercano = None
-        distancia_minima = float('inf')
-        
-        for vertice in self.grafo.vertices:
-            x, y = self.grafo.coordenadas.get(vertice, (0, 0))
-            distancia = ((x - lon)**2 + (y - lat)**2)**0.5
-            if distancia < distancia_minima:
-                distancia_minima = distancia
-                nodo_cercano = vertice
-        
-        # Umbral de cercanía (ajustar según necesidad)
-        umbral = 0.01
-        if distancia_minima > umbral:
+        # Encontrar el nodo más cercano al clic (índice espacial del grafo)
+        umbral = 0.01  # Umbral de cercanía (ajustar según necesidad)
+        cercanos = self.grafo.vertices_cercanos((lon, lat), k=1, radio_maximo=umbral)
+        if not cercanos:
             messagebox.showwarning("Nodo No Encontrado",
                                   "No hay ningún nodo cerca del clic.\n"
                                   "Haga clic más cerca de un nodo.")
             return
+        nodo_cercano = cercanos[0][1]
         
         # Si es el primer nodo (origen)
         if self.nodo_origen_conexion is None:
@@ -964,6 +972,7 @@ def iniciar_aplicacion():
     ventana_principal = tk.Tk()
     app = AplicacionCityNavigator(ventana_principal)
     ventana_principal.mainloop()
+    app.gestor_persistencia.cerrar()
 
 
 if __name__ == "__main__":
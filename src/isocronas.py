@@ -0,0 +1,150 @@
+"""
+Módulo: isocronas.py
+Descripción: Isocronas (todo lo alcanzable desde un vértice dentro de un
+             presupuesto) e isocronas inversas (todo lo que puede llegar a
+             un vértice dentro del presupuesto), con varias bandas por pasada.
+Autor: CityNavigator
+Fecha: Enero 2026
+"""
+
+from array import array
+import heapq
+from typing import List, Sequence, Tuple, Union
+
+INFINITO = float('inf')
+
+
+class Isocrona:
+    """
+    Resultado de una búsqueda con presupuesto, en arreglos paralelos.
+
+    Los vértices alcanzados se guardan en orden de coste creciente con su
+    banda (índice del menor presupuesto que los cubre) y sus coordenadas,
+    de modo que se pueden dibujar con un solo scatter coloreado por banda.
+    Las aristas que el presupuesto de una banda corta a medias se guardan
+    como segmentos con la parte recorrida, listos para un LineCollection.
+
+    Atributos:
+        centro (str): Vértice de partida (o de llegada si es inversa)
+        presupuestos (list): Presupuestos de cada banda, en orden creciente
+        criterio (str): 'distancia' o 'tiempo'
+        inversa (bool): True si los costes son HACIA el centro
+        vertices (list): Vértices alcanzados, por coste creciente
+        costes (array): Coste de cada vértice
+        bandas (array): Banda de cada vértice
+        xs, ys (array): Coordenadas de cada vértice
+        aristas (list): (origen, destino) de cada arista cortada, en el
+                        sentido de la calle
+        bandas_aristas (array): Banda en la que se corta cada arista
+        fracciones (array): Parte recorrida de cada arista (0..1), medida
+                            desde el extremo alcanzado
+        segmentos (list): ((x1, y1), (x2, y2)) de la parte recorrida de
+                          cada arista cortada
+    """
+
+    def __init__(self, centro: str, presupuestos: List[float], criterio: str, inversa: bool):
+        """Inicializa un resultado vacío."""
+        self.centro = centro
+        self.presupuestos = presupuestos
+        self.criterio = criterio
+        self.inversa = inversa
+        self.vertices: List[str] = []
+        self.costes = array('d')
+        self.bandas = array('q')
+        self.xs = array('d')
+        self.ys = array('d')
+        self.aristas: List[Tuple[str, str]] = []
+        self.bandas_aristas = array('q')
+        self.fracciones = array('d')
+        self.segmentos: List[Tuple[Tuple[float, float], Tuple[float, float]]] = []
+
+    def vertices_banda(self, banda: int) -> List[str]:
+        """Retorna los vértices alcanzables dentro del presupuesto de una banda."""
+        return [v for v, b in zip(self.vertices, self.bandas) if b <= banda]
+
+    def __len__(self) -> int:
+        return len(self.vertices)
+
+
+def calcular_isocrona(grafo, centro: str, presupuestos: Union[float, Sequence[float]],
+                      criterio: str = 'tiempo', inversa: bool = False) -> Isocrona:
+    """
+    Dijkstra acotado por el mayor presupuesto, que clasifica cada vértice en
+    su banda y corta las aristas que salen del área de cada banda.
+
+    Una arista u -> v con u alcanzado a coste c se corta en la banda de
+    presupuesto P si c <= P < c + peso; la fracción recorrida es
+    (P - c) / peso. En la isocrona inversa se recorren las aristas
+    entrantes y la parte recorrida es la más cercana a v.
+
+    Args:
+        grafo: Instancia de la clase Grafo
+        centro (str): Vértice de partida (o de llegada si inversa=True)
+        presupuestos: Un presupuesto o varios (p. ej. [5, 10, 15] minutos)
+        criterio (str): 'distancia' o 'tiempo'
+        inversa (bool): Si es True calcula desde dónde se llega al centro
+
+    Returns:
+        Isocrona: Vértices, bandas y aristas cortadas
+    """
+    if isinstance(presupuestos, (int, float)):
+        presupuestos = [presupuestos]
+    presupuestos = sorted(float(p) for p in presupuestos)
+    resultado = Isocrona(centro, presupuestos, criterio, inversa)
+    if centro not in grafo.vertices or not presupuestos:
+        return resultado
+
+    indice_peso = 1 if criterio == 'distancia' else 2
+    expandir = grafo.obtener_entrantes if inversa else grafo.obtener_vecinos
+    limite = presupuestos[-1]
+    coordenadas = grafo.coordenadas
+    tentativos = {centro: 0.0}
+    asentados = set()
+    cola = [(0.0, centro)]
+    banda = 0
+
+    while cola:
+        coste, vertice = heapq.heappop(cola)
+        if coste > limite:
+            break
+        if vertice in asentados:
+            continue
+        asentados.add(vertice)
+
+        # Los costes salen en orden creciente: la banda solo avanza
+        while presupuestos[banda] < coste:
+            banda += 1
+        x, y = coordenadas.get(vertice, (0, 0))
+        resultado.vertices.append(vertice)
+        resultado.costes.append(coste)
+        resultado.bandas.append(banda)
+        resultado.xs.append(x)
+        resultado.ys.append(y)
+
+        for arista in expandir(vertice):
+            vecino, peso = arista[0], arista[indice_peso]
+            nuevo_coste = coste + peso
+            # Bandas cuyo presupuesto se agota a mitad de la arista
+            for b in range(banda, len(presupuestos)):
+                presupuesto = presupuestos[b]
+                if presupuesto >= nuevo_coste:
+                    break
+                fraccion = (presupuesto - coste) / peso
+                xv, yv = coordenadas.get(vecino, (0, 0))
+                corte = (x + fraccion * (xv - x), y + fraccion * (yv - y))
+                if inversa:
+                    resultado.aristas.append((vecino, vertice))
+                    resultado.segmentos.append((corte, (x, y)))
+                else:
+                    resultado.aristas.append((vertice, vecino))
+                    resultado.segmentos.append(((x, y), corte))
+                resultado.bandas_aristas.append(b)
+                resultado.fracciones.append(fraccion)
+
+            if vecino not in asentados and nuevo_coste <= limite \
+                    and nuevo_coste < tentativos.get(vecino, INFINITO):
+                tentativos[vecino] = nuevo_coste
+                heapq.heappush(cola, (nuevo_coste, vecino))
+
+    grafo.nodos_asentados = len(asentados)
+    return resultado
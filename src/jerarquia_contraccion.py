@@ -0,0 +1,386 @@
+"""
+Módulo: jerarquia_contraccion.py
+Descripción: Jerarquías de contracción (Contraction Hierarchies) para consultas
+             de ruta óptima muy rápidas sobre redes viales grandes.
+Autor: CityNavigator
+Fecha: Enero 2026
+"""
+
+from array import array
+import hashlib
+import heapq
+import json
+from typing import Dict, List, Tuple
+
+# Número máximo de vértices que asienta cada búsqueda de testigos
+LIMITE_TESTIGO = 60
+
+VERSION_FORMATO = 1
+
+
+def huella_grafo(grafo, criterio: str) -> str:
+    """
+    Calcula una huella (SHA-1) de los vértices y aristas de un grafo.
+
+    Permite detectar si una jerarquía guardada corresponde al grafo actual.
+
+    Args:
+        grafo: Instancia de la clase Grafo
+        criterio (str): 'distancia' o 'tiempo'
+
+    Returns:
+        str: Huella hexadecimal
+    """
+    indice_peso = 1 if criterio == 'distancia' else 2
+    resumen = hashlib.sha1(criterio.encode('utf-8'))
+    for vertice in sorted(grafo.vertices):
+        resumen.update(vertice.encode('utf-8') + b'\n')
+        aristas = sorted((arista[0], arista[indice_peso]) for arista in grafo.obtener_vecinos(vertice))
+        for destino, peso in aristas:
+            resumen.update(f"\t{destino}\t{peso!r}\n".encode('utf-8'))
+    return resumen.hexdigest()
+
+
+def _busqueda_testigo(salida: List[Dict[int, float]], origen: int, excluido: int,
+                      objetivos: set, coste_maximo: float, limite: int) -> Dict[int, float]:
+    """
+    Dijkstra local acotado que busca caminos alternativos (testigos) sin pasar por `excluido`.
+
+    Returns:
+        Dict[int, float]: Costes tentativos alcanzados; cada valor corresponde
+                          a un camino real, por lo que es una cota superior
+    """
+    costes = {origen: 0}
+    cola = [(0, origen)]
+    restantes = set(objetivos)
+    asentados = 0
+
+    while cola:
+        coste, x = heapq.heappop(cola)
+        if coste > costes[x]:
+            continue
+        if coste > coste_maximo:
+            break
+        restantes.discard(x)
+        asentados += 1
+        if not restantes or asentados > limite:
+            break
+        for y, peso in salida[x].items():
+            if y == excluido:
+                continue
+            nuevo_coste = coste + peso
+            if nuevo_coste < costes.get(y, float('inf')):
+                costes[y] = nuevo_coste
+                heapq.heappush(cola, (nuevo_coste, y))
+
+    return costes
+
+
+def _construir_csr(listas: List[List[Tuple[int, float]]]) -> Tuple[array, array, array]:
+    """Convierte listas [(vecino, peso), ...] por vértice en arreglos CSR."""
+    desplazamientos = array('q', [0])
+    vecinos = array('q')
+    pesos = array('d')
+    for lista in listas:
+        for vecino, peso in lista:
+            vecinos.append(vecino)
+            pesos.append(peso)
+        desplazamientos.append(len(vecinos))
+    return desplazamientos, vecinos, pesos
+
+
+class JerarquiaContraccion:
+    """
+    Jerarquía de contracción de un grafo para un criterio ('distancia' o 'tiempo').
+
+    Los vértices se contraen en orden de diferencia de aristas (atajos
+    creados menos aristas eliminadas). Cada consulta es un Dijkstra
+    bidireccional que solo sube en la jerarquía; los atajos del camino
+    encontrado se desempacan hasta obtener los vértices originales.
+
+    Atributos:
+        criterio (str): Métrica de la jerarquía
+        ids (list): Identificador de cada índice entero
+        indice (dict): Mapeo {id: índice}
+        rangos (array): Orden de contracción de cada vértice
+        arriba (tuple): CSR de aristas v → w con rango[w] > rango[v]
+        abajo (tuple): CSR de aristas u → v con rango[u] > rango[v], indexado por v
+        intermedios (dict): Vértice contraído de cada atajo {u * n + w: v}
+        huella (str): Huella del grafo del que se construyó
+    """
+
+    def __init__(self, criterio: str, ids: List[str], rangos: array,
+                 arriba: Tuple[array, array, array], abajo: Tuple[array, array, array],
+                 intermedios: Dict[int, int], huella: str = ''):
+        """Inicializa una jerarquía ya construida (ver construir() y cargar())."""
+        self.criterio = criterio
+        self.ids = ids
+        self.indice = {vertice: i for i, vertice in enumerate(ids)}
+        self.rangos = rangos
+        self.arriba = arriba
+        self.abajo = abajo
+        self.intermedios = intermedios
+        self.huella = huella
+        self.nodos_asentados = 0
+
+    @classmethod
+    def construir(cls, grafo, criterio: str = 'distancia',
+                  limite_testigo: int = LIMITE_TESTIGO) -> 'JerarquiaContraccion':
+        """
+        Preprocesa un grafo contrayendo todos sus vértices.
+
+        Args:
+            grafo: Instancia de la clase Grafo
+            criterio (str): 'distancia' o 'tiempo'
+            limite_testigo (int): Vértices asentados como máximo por búsqueda de testigos
+
+        Returns:
+            JerarquiaContraccion: Jerarquía lista para consultas
+        """
+        indice_peso = 1 if criterio == 'distancia' else 2
+        ids = sorted(grafo.vertices)
+        indice = {vertice: i for i, vertice in enumerate(ids)}
+        n = len(ids)
+
+        # Grafo de trabajo: solo la arista más barata entre cada par, sin lazos
+        salida: List[Dict[int, float]] = [{} for _ in range(n)]
+        entrada: List[Dict[int, float]] = [{} for _ in range(n)]
+        for vertice in ids:
+            u = indice[vertice]
+            for arista in grafo.obtener_vecinos(vertice):
+                w = indice[arista[0]]
+                peso = arista[indice_peso]
+                if u != w and peso < salida[u].get(w, float('inf')):
+                    salida[u][w] = peso
+                    entrada[w][u] = peso
+
+        contraidos = bytearray(n)
+        vecinos_contraidos = [0] * n
+        niveles = [0] * n
+        intermedios: Dict[int, int] = {}
+        listas_arriba: List[List[Tuple[int, float]]] = [[] for _ in range(n)]
+        listas_abajo: List[List[Tuple[int, float]]] = [[] for _ in range(n)]
+        rangos = array('q', bytes(8 * n))
+
+        def atajos_necesarios(v: int) -> List[Tuple[int, int, float]]:
+            atajos = []
+            if not entrada[v] or not salida[v]:
+                return atajos
+            maximo_salida = max(salida[v].values())
+            for u, peso_entrada in entrada[v].items():
+                objetivos = {w for w in salida[v] if w != u}
+                if not objetivos:
+                    continue
+                costes = _busqueda_testigo(salida, u, v, objetivos,
+                                           peso_entrada + maximo_salida, limite_testigo)
+                for w in objetivos:
+                    coste_atajo = peso_entrada + salida[v][w]
+                    if costes.get(w, float('inf')) > coste_atajo:
+                        atajos.append((u, w, coste_atajo))
+            return atajos
+
+        def prioridad(v: int) -> int:
+            # Diferencia de aristas + vecinos ya contraídos + nivel en la jerarquía
+            diferencia = len(atajos_necesarios(v)) - len(entrada[v]) - len(salida[v])
+            return 2 * diferencia + vecinos_contraidos[v] + niveles[v]
+
+        prioridades = [prioridad(v) for v in range(n)]
+        cola = [(p, v) for v, p in enumerate(prioridades)]
+        heapq.heapify(cola)
+        rango = 0
+
+        while cola:
+            p, v = heapq.heappop(cola)
+            # Entradas obsoletas: el vértice ya se contrajo o cambió su prioridad
+            if contraidos[v] or p != prioridades[v]:
+                continue
+
+            for u, w, coste in atajos_necesarios(v):
+                if coste < salida[u].get(w, float('inf')):
+                    salida[u][w] = coste
+                    entrada[w][u] = coste
+                    intermedios[u * n + w] = v
+
+            # Todos los vecinos aún no contraídos tienen rango mayor
+            listas_arriba[v] = list(salida[v].items())
+            listas_abajo[v] = list(entrada[v].items())
+            vecinos = set(salida[v]) | set(entrada[v])
+            for w in salida[v]:
+                del entrada[w][v]
+            for u in entrada[v]:
+                del salida[u][v]
+            salida[v] = {}
+            entrada[v] = {}
+
+            contraidos[v] = 1
+            rangos[v] = rango
+            rango += 1
+
+            # Los vecinos cambiaron: se recalcula su prioridad
+            for w in vecinos:
+                vecinos_contraidos[w] += 1
+                niveles[w] = max(niveles[w], niveles[v] + 1)
+                prioridades[w] = prioridad(w)
+                heapq.heappush(cola, (prioridades[w], w))
+
+        return cls(criterio, ids, rangos, _construir_csr(listas_arriba),
+                   _construir_csr(listas_abajo), intermedios, huella_grafo(grafo, criterio))
+
+    def consultar(self, origen: str, destino: str) -> Tuple[List[str], float]:
+        """
+        Busca la ruta óptima con un Dijkstra bidireccional ascendente.
+
+        Args:
+            origen (str): Vértice de inicio
+            destino (str): Vértice de destino
+
+        Returns:
+            Tuple[List[str], float]: (camino_optimo, coste_total), igual que Grafo.dijkstra()
+        """
+        if origen not in self.indice or destino not in self.indice:
+            return [], float('inf')
+
+        s = self.indice[origen]
+        t = self.indice[destino]
+        if s == t:
+            self.nodos_asentados = 1
+            return [origen], 0
+
+        grafos = (self.arriba, self.abajo)
+        costes = ({s: 0}, {t: 0})
+        predecesores = ({s: -1}, {t: -1})
+        colas = ([(0, s)], [(0, t)])
+        mejor_coste = float('inf')
+        encuentro = -1
+        asentados = 0
+
+        while colas[0] or colas[1]:
+            # Se avanza el lado con menor tope; un lado termina al superar el mejor coste
+            if colas[0] and (not colas[1] or colas[0][0][0] <= colas[1][0][0]):
+                lado = 0
+            else:
+                lado = 1
+            if colas[lado][0][0] >= mejor_coste:
+                colas[lado].clear()
+                continue
+
+            coste, x = heapq.heappop(colas[lado])
+            if coste > costes[lado][x]:
+                continue
+
+            # Stall-on-demand: si un vértice superior llega a x más barato por
+            # una arista descendente, el coste de x no es óptimo en esta búsqueda
+            propios = costes[lado]
+            desplazamientos, vecinos, pesos = grafos[1 - lado]
+            detenido = False
+            for k in range(desplazamientos[x], desplazamientos[x + 1]):
+                if propios.get(vecinos[k], float('inf')) + pesos[k] < coste:
+                    detenido = True
+                    break
+            if detenido:
+                continue
+            asentados += 1
+
+            opuesto = costes[1 - lado].get(x)
+            if opuesto is not None and coste + opuesto < mejor_coste:
+                mejor_coste = coste + opuesto
+                encuentro = x
+
+            desplazamientos, vecinos, pesos = grafos[lado]
+            for k in range(desplazamientos[x], desplazamientos[x + 1]):
+                y = vecinos[k]
+                nuevo_coste = coste + pesos[k]
+                if nuevo_coste < propios.get(y, float('inf')):
+                    propios[y] = nuevo_coste
+                    predecesores[lado][y] = x
+                    heapq.heappush(colas[lado], (nuevo_coste, y))
+
+        self.nodos_asentados = asentados
+
+        if encuentro == -1:
+            return [], float('inf')
+
+        # Camino en el grafo aumentado: s → encuentro → t
+        secuencia = []
+        x = encuentro
+        while x != -1:
+            secuencia.append(x)
+            x = predecesores[0][x]
+        secuencia.reverse()
+        x = predecesores[1][encuentro]
+        while x != -1:
+            secuencia.append(x)
+            x = predecesores[1][x]
+
+        camino = [s]
+        for a, b in zip(secuencia, secuencia[1:]):
+            self._desempacar(a, b, camino)
+
+        return [self.ids[i] for i in camino], mejor_coste
+
+    def _desempacar(self, a: int, b: int, camino: List[int]):
+        """Agrega a `camino` los vértices originales de la arista a → b (sin incluir a)."""
+        n = len(self.ids)
+        pila = [(a, b)]
+        while pila:
+            x, y = pila.pop()
+            intermedio = self.intermedios.get(x * n + y)
+            if intermedio is None:
+                camino.append(y)
+            else:
+                pila.append((intermedio, y))
+                pila.append((x, intermedio))
+
+    def num_atajos(self) -> int:
+        """Retorna el número de atajos creados durante la contracción."""
+        return len(self.intermedios)
+
+    def es_valida_para(self, grafo) -> bool:
+        """Indica si la jerarquía se construyó a partir del grafo dado (mismos datos)."""
+        return self.huella == huella_grafo(grafo, self.criterio)
+
+    def guardar(self, ruta_archivo: str):
+        """
+        Guarda la jerarquía en un archivo JSON para no reconstruirla en cada inicio.
+
+        Args:
+            ruta_archivo (str): Ruta del archivo destino
+        """
+        datos = {
+            'version': VERSION_FORMATO,
+            'criterio': self.criterio,
+            'huella': self.huella,
+            'ids': self.ids,
+            'rangos': self.rangos.tolist(),
+            'arriba': [a.tolist() for a in self.arriba],
+            'abajo': [a.tolist() for a in self.abajo],
+            'intermedios': [[clave, v] for clave, v in self.intermedios.items()],
+        }
+        with open(ruta_archivo, 'w', encoding='utf-8') as f:
+            json.dump(datos, f, ensure_ascii=False)
+
+    @classmethod
+    def cargar(cls, ruta_archivo: str) -> 'JerarquiaContraccion':
+        """
+        Carga una jerarquía guardada con guardar().
+
+        Args:
+            ruta_archivo (str): Ruta del archivo
+
+        Returns:
+            JerarquiaContraccion: Jerarquía lista para consultas
+
+        Raises:
+            ValueError: Si el archivo tiene una versión de formato distinta
+        """
+        with open(ruta_archivo, 'r', encoding='utf-8') as f:
+            datos = json.load(f)
+        if datos.get('version') != VERSION_FORMATO:
+            raise ValueError(f"Versión de jerarquía no soportada: {datos.get('version')}")
+
+        def csr(listas):
+            return array('q', listas[0]), array('q', listas[1]), array('d', listas[2])
+
+        return cls(datos['criterio'], datos['ids'], array('q', datos['rangos']),
+                   csr(datos['arriba']), csr(datos['abajo']),
+                   {clave: v for clave, v in datos['intermedios']}, datos['huella'])
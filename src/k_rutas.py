@@ -0,0 +1,249 @@
+"""
+Módulo: k_rutas.py
+Descripción: K rutas más cortas sin ciclos entre dos vértices (algoritmo de
+             Yen), generadas de forma perezosa.
+Autor: CityNavigator
+Fecha: Enero 2026
+"""
+
+import heapq
+from itertools import count
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+INFINITO = float('inf')
+
+
+class ArbolInverso:
+    """
+    Dijkstra inverso desde el destino, avanzado solo lo necesario.
+
+    Los vértices asentados tienen su coste exacto hasta el destino y su
+    siguiente salto en el árbol de caminos mínimos. Para los demás, el radio
+    de la búsqueda es una cota inferior válida. Quitar aristas o vértices
+    solo puede alargar los caminos, así que las cotas siguen siendo
+    admisibles con cualquier máscara.
+
+    Atributos:
+        costes (dict): Coste exacto hasta el destino de cada vértice asentado
+        siguiente (dict): Siguiente vértice hacia el destino (None en el destino)
+        radio (float): Coste del último vértice asentado
+    """
+
+    def __init__(self, grafo, destino: str, indice_peso: int):
+        """Inicializa la búsqueda inversa con solo el destino en la frontera."""
+        self.grafo = grafo
+        self.indice_peso = indice_peso
+        self.costes: Dict[str, float] = {}
+        self.siguiente: Dict[str, Optional[str]] = {}
+        self.radio = 0.0
+        self._tentativos = {destino: 0.0}
+        self._sucesores: Dict[str, Optional[str]] = {destino: None}
+        self._cola = [(0.0, destino)]
+
+    def asentar(self, vertice: str) -> bool:
+        """
+        Avanza la búsqueda hasta asentar un vértice.
+
+        Returns:
+            bool: False si el vértice no puede llegar al destino
+        """
+        costes = self.costes
+        cola = self._cola
+        tentativos = self._tentativos
+        while vertice not in costes and cola:
+            coste, actual = heapq.heappop(cola)
+            if actual in costes:
+                continue
+            costes[actual] = coste
+            self.siguiente[actual] = self._sucesores[actual]
+            self.radio = coste
+            for arista in self.grafo.obtener_entrantes(actual):
+                anterior = arista[0]
+                nuevo_coste = coste + arista[self.indice_peso]
+                if anterior not in costes and nuevo_coste < tentativos.get(anterior, INFINITO):
+                    tentativos[anterior] = nuevo_coste
+                    self._sucesores[anterior] = actual
+                    heapq.heappush(cola, (nuevo_coste, anterior))
+        if not cola:
+            # Todo lo que llega al destino ya está asentado
+            self.radio = INFINITO
+        return vertice in costes
+
+
+def _ruta_desvio(grafo, arbol: ArbolInverso, desvio: str, destino: str, indice_peso: int,
+                 vertices_quitados: Set[str],
+                 aristas_quitadas: Set[str]) -> Optional[Tuple[List[str], List[float]]]:
+    """
+    Camino más corto desde el vértice de desvío aplicando las máscaras.
+
+    Se busca con A* usando las cotas del árbol inverso. En cuanto se extrae
+    un vértice cuyo camino en el árbol hasta el destino no toca nada
+    enmascarado, ese camino completa la ruta: su cota era exacta y ningún
+    otro vértice de la frontera puede mejorarla. El camino se retorna solo
+    hasta ese vértice (ver _completar()).
+
+    Args:
+        vertices_quitados: Vértices que el camino no puede visitar
+        aristas_quitadas: Vértices a los que no se puede ir desde `desvio`
+
+    Returns:
+        Tuple[List[str], List[float]]: (camino parcial, coste acumulado en
+                                        cada vértice) o None si no hay camino
+    """
+    if not arbol.asentar(desvio):
+        return None
+
+    siguiente = arbol.siguiente
+    limpios: Dict[str, bool] = {desvio: False}
+
+    def cadena_limpia(vertice: str) -> bool:
+        """Indica si el camino del árbol desde el vértice evita las máscaras."""
+        recorridos = []
+        while vertice is not None and vertice not in limpios:
+            if vertice in vertices_quitados or vertice not in siguiente:
+                limpios[vertice] = False
+                break
+            recorridos.append(vertice)
+            vertice = siguiente[vertice]
+        resultado = True if vertice is None else limpios[vertice]
+        for recorrido in recorridos:
+            limpios[recorrido] = resultado
+        return resultado
+
+    cotas = arbol.costes
+    radio = arbol.radio  # Cota de los vértices aún no asentados en el árbol
+    costes = {desvio: 0.0}
+    predecesores: Dict[str, Optional[str]] = {desvio: None}
+    asentados = set()
+    cola = [(cotas[desvio], desvio)]
+    enlace = None
+    while cola:
+        _, vertice = heapq.heappop(cola)
+        if vertice in asentados:
+            continue
+        asentados.add(vertice)
+        if vertice == destino or cadena_limpia(vertice):
+            enlace = vertice
+            break
+        coste = costes[vertice]
+        for arista in grafo.obtener_vecinos(vertice):
+            vecino = arista[0]
+            if vecino in vertices_quitados or vecino in asentados:
+                continue
+            if vertice == desvio and vecino in aristas_quitadas:
+                continue
+            nuevo_coste = coste + arista[indice_peso]
+            if nuevo_coste < costes.get(vecino, INFINITO):
+                cota = cotas.get(vecino, radio)
+                if cota == INFINITO:
+                    continue  # Desde el vecino no se llega al destino
+                costes[vecino] = nuevo_coste
+                predecesores[vecino] = vertice
+                heapq.heappush(cola, (nuevo_coste + cota, vecino))
+
+    if enlace is None:
+        return None
+
+    camino = []
+    vertice = enlace
+    while vertice is not None:
+        camino.append(vertice)
+        vertice = predecesores[vertice]
+    camino.reverse()
+    return camino, [costes[v] for v in camino]
+
+
+def _completar(arbol: ArbolInverso, camino: List[str], acumulados: List[float]):
+    """Extiende un camino parcial hasta el destino por el árbol inverso."""
+    enlace = camino[-1]
+    base = acumulados[-1] + arbol.costes[enlace]
+    vertice = arbol.siguiente[enlace]
+    while vertice is not None:
+        camino.append(vertice)
+        acumulados.append(base - arbol.costes[vertice])
+        vertice = arbol.siguiente[vertice]
+
+
+def rutas_yen(grafo, origen: str, destino: str,
+              criterio: str = 'distancia') -> Iterator[Tuple[List[str], float]]:
+    """
+    Genera las rutas sin ciclos de origen a destino en orden de coste.
+
+    Sigue el algoritmo de Yen con tres ahorros:
+    - El coste de la raíz de cada desvío sale de los costes acumulados de
+      la ruta ya calculada, sin volver a buscarla.
+    - Cada ruta solo se desvía a partir del punto donde ella misma se
+      desvió de su ruta madre (mejora de Lawler): los desvíos anteriores
+      ya se exploraron.
+    - Las búsquedas de desvío usan el árbol inverso desde el destino como
+      heurística exacta y terminan en cuanto alcanzan un vértice cuyo
+      camino en el árbol no toca nada enmascarado.
+    Los vértices y aristas quitados se aplican como máscaras (conjuntos),
+    nunca copiando el grafo.
+
+    Args:
+        grafo: Instancia de la clase Grafo
+        origen (str): Vértice de inicio
+        destino (str): Vértice de destino
+        criterio (str): 'distancia' o 'tiempo'
+
+    Yields:
+        Tuple[List[str], float]: (camino, coste) de cada ruta
+    """
+    if origen not in grafo.vertices or destino not in grafo.vertices:
+        return
+
+    indice_peso = 1 if criterio == 'distancia' else 2
+    arbol = ArbolInverso(grafo, destino, indice_peso)
+    primera = _ruta_desvio(grafo, arbol, origen, destino, indice_peso, set(), set())
+    if primera is None:
+        return
+    camino, acumulados = primera
+    _completar(arbol, camino, acumulados)
+
+    # Trie de las rutas entregadas: (nodo_padre, vertice) -> nodo, y los
+    # siguientes vértices ya usados tras el prefijo de cada nodo
+    hijos: Dict[Tuple[int, str], int] = {}
+    siguientes: List[Set[str]] = [set()]
+    entregadas = set()
+    candidatos = []
+    desempate = count()
+    desviacion = 0
+
+    while True:
+        entregadas.add(tuple(camino))
+        yield camino, acumulados[-1]
+
+        nodos = [0]
+        for vertice in camino[1:]:
+            siguientes[nodos[-1]].add(vertice)
+            nodo = hijos.get((nodos[-1], vertice))
+            if nodo is None:
+                nodo = hijos[(nodos[-1], vertice)] = len(siguientes)
+                siguientes.append(set())
+            nodos.append(nodo)
+
+        vertices_quitados = set(camino[:desviacion])
+        for i in range(desviacion, len(camino) - 1):
+            desvio = _ruta_desvio(grafo, arbol, camino[i], destino, indice_peso,
+                                  vertices_quitados, siguientes[nodos[i]])
+            vertices_quitados.add(camino[i])
+            if desvio is None:
+                continue
+            # El candidato se guarda sin copiar: (ruta madre, índice, desvío parcial)
+            camino_desvio, acumulados_desvio = desvio
+            coste = acumulados[i] + acumulados_desvio[-1] + arbol.costes[camino_desvio[-1]]
+            heapq.heappush(candidatos, (coste, next(desempate), camino, acumulados, i,
+                                        camino_desvio, acumulados_desvio))
+
+        while candidatos:
+            _, _, madre, acumulados_madre, i, camino_desvio, acumulados_desvio = \
+                heapq.heappop(candidatos)
+            camino = madre[:i] + camino_desvio
+            acumulados = acumulados_madre[:i] + [acumulados_madre[i] + c for c in acumulados_desvio]
+            _completar(arbol, camino, acumulados)
+            if tuple(camino) not in entregadas:
+                desviacion = i
+                break
+        else:
+            return
@@ -0,0 +1,193 @@
+"""
+Módulo: landmarks.py
+Descripción: Preprocesamiento de puntos de referencia (landmarks) para la
+             búsqueda A* con cotas por desigualdad triangular (ALT).
+Autor: CityNavigator
+Fecha: Enero 2026
+"""
+
+from array import array
+import heapq
+from typing import Callable, Dict, List, Tuple
+
+# Número de landmarks por defecto
+NUM_LANDMARKS = 8
+
+# Landmarks que se usan en cada consulta (los de mejor cota en el origen)
+LANDMARKS_ACTIVOS = 4
+
+INFINITO = float('inf')
+
+
+def distancias_desde(grafo, origen: str, criterio: str, inversa: bool = False) -> Dict[str, float]:
+    """
+    Dijkstra completo desde un vértice.
+
+    Además de preparar los landmarks, lo usan otros módulos que necesitan
+    cotas exactas hacia un vértice (p. ej. rutas_pareto).
+
+    Args:
+        grafo: Instancia de la clase Grafo
+        origen (str): Vértice de inicio
+        criterio (str): 'distancia' o 'tiempo'
+        inversa (bool): Si es True recorre las aristas entrantes, obteniendo
+                        la distancia de cada vértice HACIA el origen
+
+    Returns:
+        Dict[str, float]: Distancia de cada vértice alcanzado
+    """
+    indice_peso = 1 if criterio == 'distancia' else 2
+    expandir = grafo.obtener_entrantes if inversa else grafo.obtener_vecinos
+    distancias = {origen: 0}
+    cola = [(0, origen)]
+
+    while cola:
+        distancia, vertice = heapq.heappop(cola)
+        if distancia > distancias[vertice]:
+            continue
+        for arista in expandir(vertice):
+            vecino = arista[0]
+            nueva_distancia = distancia + arista[indice_peso]
+            if nueva_distancia < distancias.get(vecino, INFINITO):
+                distancias[vecino] = nueva_distancia
+                heapq.heappush(cola, (nueva_distancia, vecino))
+
+    return distancias
+
+
+class IndiceLandmarks:
+    """
+    Tablas de distancias desde y hacia un conjunto de landmarks.
+
+    Para un destino t, cada landmark L da dos cotas inferiores de d(v, t):
+        d(v, L) - d(t, L)   y   d(L, t) - d(L, v)
+    El potencial de A* es el máximo de esas cotas. Las cotas siguen siendo
+    válidas si el peso de alguna arista aumenta, por lo que las tablas solo
+    deben reconstruirse cuando se agregan aristas o disminuyen pesos.
+
+    Atributos:
+        landmarks (list): Vértices elegidos como landmarks
+        indice (dict): Mapeo {vertice: posición en las tablas}
+        desde (dict): {criterio: [array d(L, v) por landmark]}
+        hacia (dict): {criterio: [array d(v, L) por landmark]}
+    """
+
+    def __init__(self, landmarks: List[str], indice: Dict[str, int],
+                 desde: Dict[str, List[array]], hacia: Dict[str, List[array]]):
+        """Inicializa el índice con tablas ya calculadas (ver construir())."""
+        self.landmarks = landmarks
+        self.indice = indice
+        self.desde = desde
+        self.hacia = hacia
+
+    @classmethod
+    def construir(cls, grafo, num_landmarks: int = NUM_LANDMARKS,
+                  criterios: Tuple[str, ...] = ('distancia', 'tiempo')) -> 'IndiceLandmarks':
+        """
+        Elige los landmarks por el método del punto más lejano y calcula sus tablas.
+
+        Cada nuevo landmark es el vértice cuya distancia mínima a los ya
+        elegidos es máxima (los vértices inalcanzables se prefieren, pues
+        ningún landmark los cubre todavía).
+
+        Args:
+            grafo: Instancia de la clase Grafo
+            num_landmarks (int): Número de landmarks (K)
+            criterios (tuple): Criterios para los que se calculan tablas
+
+        Returns:
+            IndiceLandmarks: Índice listo para calcular potenciales
+        """
+        vertices = sorted(grafo.vertices)
+        indice = {vertice: i for i, vertice in enumerate(vertices)}
+        n = len(vertices)
+        num_landmarks = min(num_landmarks, n)
+
+        landmarks: List[str] = []
+        desde = {criterio: [] for criterio in criterios}
+        hacia = {criterio: [] for criterio in criterios}
+        cercania = [INFINITO] * n  # Distancia mínima a los landmarks elegidos
+
+        def tabla(distancias: Dict[str, float]) -> array:
+            valores = array('d', [INFINITO]) * n
+            for vertice, distancia in distancias.items():
+                valores[indice[vertice]] = distancia
+            return valores
+
+        # El primer landmark es el vértice más lejano a uno arbitrario
+        candidato = vertices[0] if vertices else None
+        if candidato is not None:
+            alcanzados = distancias_desde(grafo, candidato, criterios[0])
+            candidato = max(alcanzados, key=lambda v: (alcanzados[v], v))
+
+        while candidato is not None and len(landmarks) < num_landmarks:
+            landmarks.append(candidato)
+            for criterio in criterios:
+                desde[criterio].append(tabla(distancias_desde(grafo, candidato, criterio)))
+                hacia[criterio].append(tabla(distancias_desde(grafo, candidato, criterio, True)))
+
+            distancias = desde[criterios[0]][-1]
+            for i in range(n):
+                if distancias[i] < cercania[i]:
+                    cercania[i] = distancias[i]
+
+            elegidos = set(landmarks)
+            restantes = [i for i in range(n) if vertices[i] not in elegidos]
+            if not restantes:
+                break
+            candidato = vertices[max(restantes, key=lambda i: (cercania[i], vertices[i]))]
+
+        return cls(landmarks, indice, desde, hacia)
+
+    def potencial(self, destino: str, criterio: str,
+                  origen: str = None) -> Callable[[str], float]:
+        """
+        Construye la función potencial (cota inferior hacia `destino`).
+
+        Args:
+            destino (str): Vértice de destino de la consulta
+            criterio (str): 'distancia' o 'tiempo'
+            origen (str): Si se indica, solo se usan los LANDMARKS_ACTIVOS
+                          landmarks con mejor cota en el origen
+
+        Returns:
+            Callable[[str], float]: Función vertice -> cota inferior
+        """
+        t = self.indice.get(destino)
+        if t is None or criterio not in self.desde:
+            return lambda vertice: 0.0
+
+        pares = []
+        for desde_l, hacia_l in zip(self.desde[criterio], self.hacia[criterio]):
+            pares.append((desde_l, hacia_l, desde_l[t], hacia_l[t]))
+
+        indice = self.indice
+
+        def cota(i: int, pares_usados) -> float:
+            mejor = 0.0
+            for desde_l, hacia_l, desde_t, hacia_t in pares_usados:
+                # d(v, t) >= d(v, L) - d(t, L)
+                hacia_v = hacia_l[i]
+                if hacia_v != INFINITO and hacia_t != INFINITO and hacia_v - hacia_t > mejor:
+                    mejor = hacia_v - hacia_t
+                # d(v, t) >= d(L, t) - d(L, v)
+                desde_v = desde_l[i]
+                if desde_v != INFINITO and desde_t != INFINITO and desde_t - desde_v > mejor:
+                    mejor = desde_t - desde_v
+            return mejor
+
+        s = indice.get(origen) if origen is not None else None
+        if s is not None and len(pares) > LANDMARKS_ACTIVOS:
+            pares.sort(key=lambda par: cota(s, [par]), reverse=True)
+            pares = pares[:LANDMARKS_ACTIVOS]
+
+        def heuristica(vertice: str) -> float:
+            i = indice.get(vertice)
+            return 0.0 if i is None else cota(i, pares)
+
+        return heuristica
+
+    def memoria_bytes(self) -> int:
+        """Retorna los bytes ocupados por las tablas de distancias."""
+        return sum(t.itemsize * len(t) for tablas in (self.desde, self.hacia)
+                   for lista in tablas.values() for t in lista)
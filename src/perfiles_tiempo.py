@@ -0,0 +1,133 @@
+"""
+Módulo: perfiles_tiempo.py
+Descripción: Perfiles de tiempo de viaje dependientes de la hora del día,
+             lineales por tramos y compartidos entre aristas.
+Autor: CityNavigator
+Fecha: Enero 2026
+"""
+
+from array import array
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+
+# Minutos de un día (los perfiles se repiten cada día)
+MINUTOS_DIA = 1440.0
+
+
+class PerfilesTiempo:
+    """
+    Almacén de perfiles de tiempo lineales por tramos.
+
+    Cada perfil es una lista de puntos (minuto_del_dia, factor) y el tiempo
+    de una arista a una hora dada es su `tiempo` estático multiplicado por el
+    factor interpolado. Como el factor no depende de la arista, muchas aristas
+    comparten el mismo perfil (p. ej. "hora pico en avenida").
+
+    Los puntos de todos los perfiles se guardan en dos arreglos contiguos;
+    el perfil p ocupa las posiciones inicios[p] .. inicios[p + 1] - 1 e
+    incluye una copia del último punto un día antes y del primero un día
+    después, para interpolar sobre la medianoche sin casos especiales.
+
+    Atributos:
+        horas (array): Minuto del día de cada punto
+        factores (array): Factor multiplicativo de cada punto
+        inicios (array): Primer punto de cada perfil (num_perfiles + 1 valores)
+        pendientes_minimas (list): Pendiente más negativa del factor en cada perfil
+        asignaciones (dict): {origen: {destino: perfil}}
+    """
+
+    def __init__(self):
+        """Inicializa un almacén sin perfiles."""
+        self.horas = array('d')
+        self.factores = array('d')
+        self.inicios = array('q', [0])
+        self.pendientes_minimas: List[float] = []
+        self.asignaciones: Dict[str, Dict[str, int]] = {}
+
+    def agregar(self, puntos: List[Tuple[float, float]]) -> int:
+        """
+        Registra un perfil nuevo.
+
+        Args:
+            puntos: Lista de (minuto_del_dia, factor) con minutos crecientes
+                    en [0, 1440) y factores positivos
+
+        Returns:
+            int: Identificador del perfil
+
+        Raises:
+            ValueError: Si los puntos están vacíos, desordenados o fuera de rango
+        """
+        if not puntos:
+            raise ValueError("Un perfil necesita al menos un punto")
+        for i, (hora, factor) in enumerate(puntos):
+            if not 0 <= hora < MINUTOS_DIA:
+                raise ValueError(f"Hora fuera de rango en el perfil: {hora}")
+            if factor <= 0:
+                raise ValueError(f"El factor debe ser positivo: {factor}")
+            if i and hora <= puntos[i - 1][0]:
+                raise ValueError("Las horas del perfil deben ser crecientes")
+
+        extendidos = ([(puntos[-1][0] - MINUTOS_DIA, puntos[-1][1])] + list(puntos)
+                      + [(puntos[0][0] + MINUTOS_DIA, puntos[0][1])])
+        pendiente_minima = 0.0
+        for (h1, f1), (h2, f2) in zip(extendidos, extendidos[1:]):
+            if h2 > h1:
+                pendiente_minima = min(pendiente_minima, (f2 - f1) / (h2 - h1))
+
+        for hora, factor in extendidos:
+            self.horas.append(hora)
+            self.factores.append(factor)
+        self.inicios.append(len(self.horas))
+        self.pendientes_minimas.append(pendiente_minima)
+        return len(self.pendientes_minimas) - 1
+
+    def asignar(self, origen: str, destino: str, perfil: int, tiempo: float):
+        """
+        Asocia un perfil a la arista origen -> destino.
+
+        Para que la búsqueda por hora de salida sea correcta, salir más tarde
+        nunca debe permitir llegar antes (propiedad FIFO). Con un tiempo
+        lineal por tramos esto equivale a que la pendiente del tiempo de
+        viaje nunca sea menor que -1.
+
+        Args:
+            origen (str): Vértice de origen de la arista
+            destino (str): Vértice de destino de la arista
+            perfil (int): Identificador devuelto por agregar()
+            tiempo (float): Mayor tiempo estático de las aristas origen -> destino
+
+        Raises:
+            ValueError: Si el perfil no existe o la arista violaría FIFO
+        """
+        if not 0 <= perfil < len(self.pendientes_minimas):
+            raise ValueError(f"Perfil inexistente: {perfil}")
+        if tiempo * self.pendientes_minimas[perfil] < -1:
+            raise ValueError(f"El perfil {perfil} viola la propiedad FIFO en "
+                             f"{origen} -> {destino}")
+        self.asignaciones.setdefault(origen, {})[destino] = perfil
+
+    def de_origen(self, origen: str) -> Optional[Dict[str, int]]:
+        """Retorna los perfiles de las aristas salientes de un vértice (o None)."""
+        return self.asignaciones.get(origen)
+
+    def factor(self, perfil: int, hora: float) -> float:
+        """
+        Evalúa el factor de un perfil a una hora cualquiera.
+
+        Args:
+            perfil (int): Identificador del perfil
+            hora (float): Minutos desde la medianoche del primer día
+
+        Returns:
+            float: Factor interpolado
+        """
+        horas = self.horas
+        hora = hora % MINUTOS_DIA
+        k = bisect_right(horas, hora, self.inicios[perfil], self.inicios[perfil + 1]) - 1
+        h1 = horas[k]
+        f1 = self.factores[k]
+        return f1 + (self.factores[k + 1] - f1) * (hora - h1) / (horas[k + 1] - h1)
+
+    def __len__(self) -> int:
+        return len(self.pendientes_minimas)
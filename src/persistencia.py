@@ -1,37 +1,168 @@
 """
 Módulo: persistencia.py
 Descripción: Maneja la persistencia de nodos y conexiones personalizadas
+             (instantánea JSON más un diario de operaciones de solo anexado,
+             o una base SQLite, ver almacen_sqlite.py)
 Autor: CityNavigator
 Fecha: Enero 2026
 """
 
 import json
 import os
-from typing import Dict, List, Tuple
+import time
+from typing import Dict, List, Optional, Set, Tuple
 
 # Archivo donde se guardan los datos personalizados
 ARCHIVO_DATOS_PERSONALIZADOS = "datos_personalizados.json"
 
+# Los archivos con estas extensiones se guardan en SQLite
+EXTENSIONES_SQLITE = ('.db', '.sqlite', '.sqlite3')
 
-class GestorPersistencia:
-    """Gestiona el guardado y carga de datos personalizados del usuario."""
+# El diario de operaciones se guarda junto al archivo, con este sufijo
+SUFIJO_DIARIO = ".diario"
+
+# Operaciones que se escriben antes de forzar el diario a disco (fsync)...
+LOTE_FSYNC = 32
+
+# ...salvo que hayan pasado estos segundos desde el último fsync
+INTERVALO_FSYNC = 1.0
+
+# El diario se compacta cuando tiene más operaciones que registros hay en
+# los datos (y al menos estas), así que cada operación cuesta O(1) amortizado
+MIN_COMPACTACION = 256
+
+# Caja (min_lon, min_lat, max_lon, max_lat) para cargar solo una zona
+Caja = Tuple[float, float, float, float]
+
+
+def ruta_diario(archivo: str) -> str:
+    """Retorna el archivo del diario de operaciones de un archivo de datos."""
+    return archivo + SUFIJO_DIARIO
+
+
+def crear_almacen(archivo: str) -> 'AlmacenDatos':
+    """
+    Crea el almacén adecuado para un archivo según su extensión.
+    
+    Args:
+        archivo: Archivo JSON o base SQLite (.db, .sqlite, .sqlite3)
+        
+    Returns:
+        AlmacenDatos: AlmacenSQLite o AlmacenJSON
+    """
+    if archivo.lower().endswith(EXTENSIONES_SQLITE):
+        from almacen_sqlite import AlmacenSQLite
+        return AlmacenSQLite(archivo)
+    return AlmacenJSON(archivo)
+
+
+def archivos_datos(archivo: str) -> List[str]:
+    """Retorna los archivos en disco de un almacén (p. ej. para calcular su huella)."""
+    return crear_almacen(archivo).archivos()
+
+
+class AlmacenDatos:
+    """
+    Interfaz de los almacenes de datos personalizados.
+    
+    GestorPersistencia mantiene los registros en memoria y entrega cada
+    cambio al almacén como una operación:
+    
+        {"op": "nodo", "id", "nombre", "coordenadas"}      alta o edición
+        {"op": "conexion", "origen", "destino", "distancia", "tiempo"}
+        {"op": "eliminar_nodo", "id"}                      (con sus conexiones)
+        {"op": "eliminar_conexion", "origen", "destino"}
+        {"op": "limpiar"}
+    
+    Cada operación lleva el estado final del registro que toca, así que
+    aplicarla dos veces no cambia nada.
+    
+    Atributos:
+        archivo (str): Archivo principal del almacén
+    """
+    
+    archivo = ""
+    
+    def cargar(self, caja: Optional[Caja] = None) -> Tuple[Dict, List[Dict]]:
+        """
+        Lee los datos guardados.
+        
+        Args:
+            caja: Si se indica, solo los nodos dentro de la caja y las
+                  conexiones que tocan alguno de ellos
+        
+        Returns:
+            Tuple[Dict, List[Dict]]: Datos {"nodos": [...], "conexiones": [...]}
+                y operaciones que hay que aplicar encima
+        """
+        raise NotImplementedError
+    
+    def registrar(self, operacion: Dict) -> bool:
+        """Guarda una operación; retorna True si se guardó correctamente."""
+        raise NotImplementedError
+    
+    def guardar(self, datos: Dict, reemplazar: bool = False) -> bool:
+        """
+        Guarda de una vez todos los registros de `datos`.
+        
+        Con reemplazar=True los registros guardados que no están en `datos`
+        se eliminan; si no, los almacenes que lo admiten solo insertan o
+        actualizan (p. ej. tras una carga parcial).
+        """
+        raise NotImplementedError
+    
+    def necesita_compactar(self, registros: int) -> bool:
+        """Indica si conviene llamar a guardar() con los datos completos."""
+        return False
+    
+    def archivos(self) -> List[str]:
+        """Retorna los archivos en disco del almacén."""
+        return [self.archivo]
+    
+    def sincronizar(self):
+        """Fuerza a disco los cambios registrados."""
+    
+    def cerrar(self):
+        """Libera los recursos abiertos (se reabren si hay más cambios)."""
+
+
+class AlmacenJSON(AlmacenDatos):
+    """
+    Instantánea JSON completa más un diario con una operación por línea.
+    
+    Cada cambio solo agrega una línea al diario; al cargar, el diario se
+    reaplica sobre la instantánea. Cuando el diario crece lo suficiente se
+    compacta: la instantánea se reescribe en un archivo temporal que
+    reemplaza al anterior con un renombrado atómico, y el diario se vacía.
+    Como las operaciones se pueden reaplicar, un corte entre el renombrado
+    y el vaciado del diario es inofensivo.
+    
+    Las líneas se pasan al sistema en cada cambio (sobreviven a un cierre
+    abrupto del programa) y se fuerzan a disco por lotes (LOTE_FSYNC,
+    INTERVALO_FSYNC); cerrar() fuerza las que falten.
+    """
     
     def __init__(self, archivo: str = ARCHIVO_DATOS_PERSONALIZADOS):
         """
-        Inicializa el gestor de persistencia.
+        Inicializa el almacén (los archivos se abren al cargar o registrar).
         
         Args:
             archivo: Nombre del archivo JSON donde guardar los datos
         """
         self.archivo = archivo
-        self.datos = self._cargar_datos()
+        self.archivo_diario = ruta_diario(archivo)
+        self.operaciones_diario = 0  # Operaciones en el diario desde la última compactación
+        self._diario = None  # Se abre al escribir la primera operación
+        self._fin_diario = 0  # Fin de la última línea completa del diario
+        self._sin_fsync = 0
+        self._ultimo_fsync = 0.0
     
-    def _cargar_datos(self) -> Dict:
+    def cargar(self, caja: Optional[Caja] = None) -> Tuple[Dict, List[Dict]]:
         """
-        Carga los datos personalizados desde el archivo JSON.
+        Carga los datos personalizados desde el archivo JSON y su diario.
         
         Returns:
-            Dict con estructura:
+            Tuple[Dict, List[Dict]]: Datos con estructura
             {
                 "nodos": [
                     {
@@ -51,56 +182,278 @@ class GestorPersistencia:
                     ...
                 ]
             }
+            y operaciones del diario
         """
+        if caja is not None:
+            # Compactar con solo una parte de los datos borraría el resto
+            raise ValueError("El almacén JSON no admite cargas parciales; use AlmacenSQLite")
+        
+        datos = {"nodos": [], "conexiones": []}
         if os.path.exists(self.archivo):
             try:
                 with open(self.archivo, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                    datos = json.load(f)
             except Exception as e:
                 print(f"Error al cargar datos personalizados: {e}")
-                return {"nodos": [], "conexiones": []}
-        else:
-            return {"nodos": [], "conexiones": []}
+        
+        operaciones = []
+        self.operaciones_diario = 0
+        self._fin_diario = 0
+        if os.path.exists(self.archivo_diario):
+            with open(self.archivo_diario, 'rb') as f:
+                for linea in f:
+                    # Una línea a medio escribir (por un corte) se descarta desde aquí
+                    if not linea.endswith(b'\n'):
+                        break
+                    try:
+                        operaciones.append(json.loads(linea))
+                    except ValueError:
+                        break
+                    self.operaciones_diario += 1
+                    self._fin_diario += len(linea)
+        return datos, operaciones
     
-    def guardar_datos(self):
-        """Guarda los datos actuales en el archivo JSON."""
+    def registrar(self, operacion: Dict) -> bool:
+        """Agrega una operación al diario."""
         try:
-            with open(self.archivo, 'w', encoding='utf-8') as f:
-                json.dump(self.datos, f, ensure_ascii=False, indent=4)
+            if self._diario is None:
+                self._diario = open(self.archivo_diario, 'ab')
+                # Descarta una posible línea a medio escribir al final
+                self._diario.truncate(self._fin_diario)
+            linea = json.dumps(operacion, ensure_ascii=False).encode('utf-8') + b'\n'
+            self._diario.write(linea)
+            self._diario.flush()
+            self._fin_diario += len(linea)
+            self.operaciones_diario += 1
+            self._sin_fsync += 1
+            
+            # Una operación aislada se fuerza a disco en el acto; las ráfagas, por lotes
+            if (self._sin_fsync >= LOTE_FSYNC
+                    or time.monotonic() - self._ultimo_fsync >= INTERVALO_FSYNC):
+                self.sincronizar()
+            return True
+        except OSError as e:
+            print(f"Error al guardar datos personalizados: {e}")
+            return False
+    
+    def necesita_compactar(self, registros: int) -> bool:
+        """El diario se compacta cuando tiene más operaciones que registros los datos."""
+        return self.operaciones_diario >= max(MIN_COMPACTACION, registros)
+    
+    def guardar(self, datos: Dict, reemplazar: bool = False) -> bool:
+        """
+        Compacta: escribe todos los datos en el archivo JSON y vacía el diario.
+        
+        El JSON se escribe en un archivo temporal que reemplaza al anterior
+        con un renombrado atómico, así que el archivo nunca queda a medias.
+        Como se reescribe completo, siempre reemplaza (se ignora `reemplazar`).
+        """
+        temporal = f'{self.archivo}.{os.getpid()}.tmp'
+        try:
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump(datos, f, ensure_ascii=False, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporal, self.archivo)
+            _sincronizar_directorio(self.archivo)
+            
+            self.cerrar()
+            if os.path.exists(self.archivo_diario):
+                os.remove(self.archivo_diario)
+            self.operaciones_diario = 0
+            self._fin_diario = 0
             return True
         except Exception as e:
             print(f"Error al guardar datos personalizados: {e}")
             return False
     
+    def archivos(self) -> List[str]:
+        """Retorna el JSON y su diario."""
+        return [self.archivo, self.archivo_diario]
+    
+    def sincronizar(self):
+        """Fuerza a disco las operaciones del diario que aún no lo están."""
+        if self._diario is not None and self._sin_fsync:
+            os.fsync(self._diario.fileno())
+        self._sin_fsync = 0
+        self._ultimo_fsync = time.monotonic()
+    
+    def cerrar(self):
+        """Fuerza a disco el diario y lo cierra."""
+        if self._diario is not None:
+            try:
+                self.sincronizar()
+            finally:
+                self._diario.close()
+                self._diario = None
+
+
+class GestorPersistencia:
+    """
+    Gestiona el guardado y carga de datos personalizados del usuario.
+    
+    Los registros se mantienen en memoria indexados por id de nodo, por par
+    (origen, destino) y por nodo -> conexiones que lo tocan: consultar o
+    actualizar un registro cuesta O(1) y eliminar un nodo, O(grado). Cada
+    cambio se aplica en memoria y se entrega al almacén como una operación
+    (ver AlmacenDatos): por defecto un JSON con diario (AlmacenJSON), o una
+    base SQLite si el archivo termina en .db, .sqlite o .sqlite3.
+    """
+    
+    def __init__(self, archivo: str = ARCHIVO_DATOS_PERSONALIZADOS,
+                 almacen: AlmacenDatos = None, caja: Optional[Caja] = None):
+        """
+        Inicializa el gestor de persistencia.
+        
+        Args:
+            archivo: Nombre del archivo donde guardar los datos
+            almacen: Almacén a usar (por defecto, según la extensión del archivo)
+            caja: (min_lon, min_lat, max_lon, max_lat) para cargar solo los
+                  nodos de una zona y sus conexiones (solo SQLite)
+        """
+        self.almacen = almacen if almacen is not None else crear_almacen(archivo)
+        self.archivo = self.almacen.archivo
+        self.caja = caja
+        
+        # Índices (los diccionarios conservan el orden de alta de los registros)
+        self._nodos: Dict[str, Dict] = {}
+        self._conexiones: Dict[Tuple[str, str], Dict] = {}
+        self._incidentes: Dict[str, Set[Tuple[str, str]]] = {}
+        
+        datos, operaciones = self.almacen.cargar(caja)
+        self._indexar(datos)
+        for operacion in operaciones:
+            self._aplicar(operacion)
+    
+    @property
+    def datos(self) -> Dict:
+        """
+        Datos con el mismo formato que el archivo JSON ({"nodos": [...], "conexiones": [...]}).
+        
+        Se construye en cada lectura: modificar el diccionario retornado no
+        cambia el gestor. Asignar un diccionario nuevo reemplaza los datos en
+        memoria y reconstruye los índices; como antes, se escriben con
+        guardar_datos().
+        """
+        return {"nodos": self.obtener_nodos(), "conexiones": self.obtener_conexiones()}
+    
+    @datos.setter
+    def datos(self, datos: Dict):
+        self._aplicar({"op": "limpiar"})
+        self._indexar(datos)
+    
+    def _indexar(self, datos: Dict):
+        """Agrega a los índices los nodos y conexiones de un diccionario con formato JSON."""
+        for nodo in datos.get("nodos", []):
+            self._aplicar(dict(nodo, op="nodo"))
+        for conexion in datos.get("conexiones", []):
+            self._aplicar(dict(conexion, op="conexion"))
+    
+    def _aplicar(self, operacion: Dict):
+        """
+        Aplica una operación del diario a los datos en memoria.
+        
+        Args:
+            operacion: {"op": "nodo" | "conexion" | "eliminar_nodo" |
+                        "eliminar_conexion" | "limpiar", ...campos del registro}
+        """
+        tipo = operacion["op"]
+        if tipo == "nodo":
+            nodo = self._nodos.get(operacion["id"])
+            if nodo is None:
+                self._nodos[operacion["id"]] = {
+                    "id": operacion["id"],
+                    "nombre": operacion["nombre"],
+                    "coordenadas": operacion["coordenadas"]
+                }
+            else:
+                nodo["nombre"] = operacion["nombre"]
+                nodo["coordenadas"] = operacion["coordenadas"]
+        elif tipo == "conexion":
+            clave = (operacion["origen"], operacion["destino"])
+            conexion = self._conexiones.get(clave)
+            if conexion is None:
+                self._conexiones[clave] = {
+                    "origen": operacion["origen"],
+                    "destino": operacion["destino"],
+                    "distancia": operacion["distancia"],
+                    "tiempo": operacion["tiempo"]
+                }
+                for extremo in clave:
+                    self._incidentes.setdefault(extremo, set()).add(clave)
+            else:
+                conexion["distancia"] = operacion["distancia"]
+                conexion["tiempo"] = operacion["tiempo"]
+        elif tipo == "eliminar_nodo":
+            self._nodos.pop(operacion["id"], None)
+            # Eliminar todas las conexiones relacionadas
+            for clave in list(self._incidentes.get(operacion["id"], ())):
+                self._quitar_conexion(clave)
+        elif tipo == "eliminar_conexion":
+            self._quitar_conexion((operacion["origen"], operacion["destino"]))
+        elif tipo == "limpiar":
+            self._nodos.clear()
+            self._conexiones.clear()
+            self._incidentes.clear()
+    
+    def _quitar_conexion(self, clave: Tuple[str, str]):
+        """Quita una conexión y sus entradas en el índice de incidencias."""
+        if self._conexiones.pop(clave, None) is None:
+            return
+        for extremo in set(clave):  # Un lazo (origen == destino) aparece una sola vez
+            incidentes = self._incidentes[extremo]
+            incidentes.discard(clave)
+            if not incidentes:
+                del self._incidentes[extremo]
+    
+    def _registrar(self, operacion: Dict) -> bool:
+        """
+        Aplica una operación en memoria y la entrega al almacén.
+        
+        Returns:
+            bool: True si se guardó correctamente
+        """
+        self._aplicar(operacion)
+        if not self.almacen.registrar(operacion):
+            return False
+        if self.almacen.necesita_compactar(len(self._nodos) + len(self._conexiones)):
+            return self.guardar_datos()
+        return True
+    
+    def sincronizar(self):
+        """Fuerza a disco los cambios que aún no lo están."""
+        self.almacen.sincronizar()
+    
+    def cerrar(self):
+        """Fuerza a disco los cambios y cierra el almacén (se reabre si hay más cambios)."""
+        self.almacen.cerrar()
+    
+    def guardar_datos(self):
+        """
+        Guarda de una vez todos los datos en memoria.
+        
+        En el almacén JSON reescribe el archivo completo y vacía el diario;
+        en SQLite reemplaza todos los registros en una transacción. Si los
+        datos se cargaron solo para una zona (caja), los registros de fuera
+        no están en memoria: entonces solo se insertan o actualizan los leídos.
+        """
+        return self.almacen.guardar(self.datos, reemplazar=self.caja is None)
+    
     def agregar_nodo(self, id_nodo: str, nombre: str, coordenadas: Tuple[float, float]):
         """
-        Agrega un nodo personalizado.
+        Agrega un nodo personalizado (o lo actualiza si ya existe).
         
         Args:
             id_nodo: Identificador único del nodo
             nombre: Nombre descriptivo
             coordenadas: Tupla (lon, lat)
         """
-        # Verificar si ya existe
-        for nodo in self.datos["nodos"]:
-            if nodo["id"] == id_nodo:
-                # Actualizar si ya existe
-                nodo["nombre"] = nombre
-                nodo["coordenadas"] = list(coordenadas)
-                self.guardar_datos()
-                return
-        
-        # Agregar nuevo nodo
-        self.datos["nodos"].append({
-            "id": id_nodo,
-            "nombre": nombre,
-            "coordenadas": list(coordenadas)
-        })
-        self.guardar_datos()
+        self._registrar({"op": "nodo", "id": id_nodo, "nombre": nombre,
+                         "coordenadas": list(coordenadas)})
     
     def agregar_conexion(self, origen: str, destino: str, distancia: float, tiempo: float):
         """
-        Agrega una conexión personalizada.
+        Agrega una conexión personalizada (o la actualiza si ya existe).
         
         Args:
             origen: ID del nodo origen
@@ -108,31 +461,16 @@ class GestorPersistencia:
             distancia: Distancia en metros
             tiempo: Tiempo en minutos
         """
-        # Verificar si ya existe esta conexión
-        for conexion in self.datos["conexiones"]:
-            if conexion["origen"] == origen and conexion["destino"] == destino:
-                # Actualizar si ya existe
-                conexion["distancia"] = distancia
-                conexion["tiempo"] = tiempo
-                self.guardar_datos()
-                return
-        
-        # Agregar nueva conexión
-        self.datos["conexiones"].append({
-            "origen": origen,
-            "destino": destino,
-            "distancia": distancia,
-            "tiempo": tiempo
-        })
-        self.guardar_datos()
+        self._registrar({"op": "conexion", "origen": origen, "destino": destino,
+                         "distancia": distancia, "tiempo": tiempo})
     
     def obtener_nodos(self) -> List[Dict]:
         """Retorna la lista de nodos personalizados."""
-        return self.datos["nodos"]
+        return list(self._nodos.values())
     
     def obtener_conexiones(self) -> List[Dict]:
         """Retorna la lista de conexiones personalizadas."""
-        return self.datos["conexiones"]
+        return list(self._conexiones.values())
     
     def eliminar_nodo(self, id_nodo: str) -> bool:
         """
@@ -144,16 +482,7 @@ class GestorPersistencia:
         Returns:
             bool: True si se eliminó correctamente
         """
-        # Eliminar el nodo
-        self.datos["nodos"] = [n for n in self.datos["nodos"] if n["id"] != id_nodo]
-        
-        # Eliminar todas las conexiones relacionadas
-        self.datos["conexiones"] = [
-            c for c in self.datos["conexiones"]
-            if c["origen"] != id_nodo and c["destino"] != id_nodo
-        ]
-        
-        return self.guardar_datos()
+        return self._registrar({"op": "eliminar_nodo", "id": id_nodo})
     
     def eliminar_conexion(self, origen: str, destino: str) -> bool:
         """
@@ -166,12 +495,7 @@ class GestorPersistencia:
         Returns:
             bool: True si se eliminó correctamente
         """
-        self.datos["conexiones"] = [
-            c for c in self.datos["conexiones"]
-            if not (c["origen"] == origen and c["destino"] == destino)
-        ]
-        
-        return self.guardar_datos()
+        return self._registrar({"op": "eliminar_conexion", "origen": origen, "destino": destino})
     
     def editar_nodo(self, id_nodo: str, nuevo_nombre: str = None, 
                    nuevas_coordenadas: Tuple[float, float] = None) -> bool:
@@ -186,15 +510,16 @@ class GestorPersistencia:
         Returns:
             bool: True si se editó correctamente
         """
-        for nodo in self.datos["nodos"]:
-            if nodo["id"] == id_nodo:
-                if nuevo_nombre:
-                    nodo["nombre"] = nuevo_nombre
-                if nuevas_coordenadas:
-                    nodo["coordenadas"] = list(nuevas_coordenadas)
-                return self.guardar_datos()
+        nodo = self._nodos.get(id_nodo)
+        if nodo is None:
+            return False
         
-        return False
+        return self._registrar({
+            "op": "nodo",
+            "id": id_nodo,
+            "nombre": nuevo_nombre or nodo["nombre"],
+            "coordenadas": list(nuevas_coordenadas) if nuevas_coordenadas else nodo["coordenadas"]
+        })
     
     def editar_conexion(self, origen: str, destino: str, 
                        nueva_distancia: float = None, nuevo_tiempo: float = None) -> bool:
@@ -210,15 +535,17 @@ class GestorPersistencia:
         Returns:
             bool: True si se editó correctamente
         """
-        for conexion in self.datos["conexiones"]:
-            if conexion["origen"] == origen and conexion["destino"] == destino:
-                if nueva_distancia is not None:
-                    conexion["distancia"] = nueva_distancia
-                if nuevo_tiempo is not None:
-                    conexion["tiempo"] = nuevo_tiempo
-                return self.guardar_datos()
+        conexion = self._conexiones.get((origen, destino))
+        if conexion is None:
+            return False
         
-        return False
+        return self._registrar({
+            "op": "conexion",
+            "origen": origen,
+            "destino": destino,
+            "distancia": conexion["distancia"] if nueva_distancia is None else nueva_distancia,
+            "tiempo": conexion["tiempo"] if nuevo_tiempo is None else nuevo_tiempo
+        })
     
     def es_nodo_personalizado(self, id_nodo: str) -> bool:
         """
@@ -230,9 +557,21 @@ class GestorPersistencia:
         Returns:
             bool: True si es personalizado
         """
-        return any(nodo["id"] == id_nodo for nodo in self.datos["nodos"])
+        return id_nodo in self._nodos
     
     def limpiar_todo(self) -> bool:
         """Elimina todos los datos personalizados."""
-        self.datos = {"nodos": [], "conexiones": []}
+        if not self._registrar({"op": "limpiar"}):
+            return False
         return self.guardar_datos()
+
+
+def _sincronizar_directorio(archivo: str):
+    """Fuerza a disco el renombrado de un archivo (solo donde el sistema lo permite)."""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    descriptor = os.open(os.path.dirname(os.path.abspath(archivo)), os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
@@ -7,11 +7,27 @@ Fecha: Enero 2026
 
 import sys
 import io
+import json
+import random
+import math
+import os
+import tempfile
+import threading
+import asyncio
+from collections import Counter, deque
 
 # Configurar salida UTF-8 para evitar problemas con emojis en Windows
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
 from datos_puerto_ordaz import crear_grafo_puerto_ordaz, obtener_puntos_interes
+from grafo import Grafo, distancia_haversine
+from importador_osm import importar_osm
+from instantanea import abrir_instantanea, guardar_instantanea
+from almacen_sqlite import migrar_json_a_sqlite
+from cache_rutas import CacheRutas
+from persistencia import GestorPersistencia
+from rutas_lote import resolver_lote
+from servicio_rutas import ErrorPeticion, ServicioRutas
 
 
 def probar_creacion_grafo():
@@ -163,6 +179,20 @@ def comparar_algoritmos(grafo):
     print(f"   - Camino: {' → '.join(ruta_t)}")
     print(f"   - Tiempo: {coste_t:.1f} min")
     print(f"   - Intersecciones: {len(ruta_t)}")
+    asentados_dijkstra = grafo.nodos_asentados
+    
+    # A* por tiempo
+    ruta_a, coste_a = grafo.a_estrella(origen, destino, 'tiempo')
+    print(f"\n⭐ A* (tiempo):")
+    print(f"   - Camino: {' → '.join(ruta_a)}")
+    print(f"   - Tiempo: {coste_a:.1f} min")
+    print(f"   - Vértices asentados: {grafo.nodos_asentados} (Dijkstra: {asentados_dijkstra})")
+    
+    # Frente de Pareto (distancia y tiempo en una sola búsqueda)
+    rutas_p = grafo.rutas_pareto(origen, destino)
+    print(f"\n⚖️  Pareto (distancia y tiempo): {len(rutas_p)} ruta(s) no dominada(s)")
+    for camino, distancia, tiempo in rutas_p:
+        print(f"   - {distancia:.0f} m, {tiempo:.1f} min: {' → '.join(camino)}")
     
     # BFS
     encontrado_b, ruta_b = grafo.bfs(origen, destino)
@@ -179,6 +209,1263 @@ def comparar_algoritmos(grafo):
     print()
 
 
+def probar_modo_compacto():
+    """Verifica que el modo compacto (CSR) da los mismos resultados."""
+    print("=" * 60)
+    print("PRUEBA 7: Almacenamiento Compacto (CSR)")
+    print("=" * 60)
+    
+    grafo = crear_grafo_puerto_ordaz()
+    compacto = crear_grafo_puerto_ordaz(compacto=True)
+    
+    coincidencias = 0
+    total = 0
+    for origen in grafo.obtener_todos_vertices():
+        for destino in grafo.obtener_todos_vertices():
+            for criterio in ('distancia', 'tiempo'):
+                total += 1
+                if grafo.dijkstra(origen, destino, criterio) == compacto.dijkstra(origen, destino, criterio):
+                    coincidencias += 1
+    
+    if coincidencias == total:
+        print(f"✅ Dijkstra coincide en {total} consultas")
+    else:
+        print(f"❌ Dijkstra difiere en {total - coincidencias} de {total} consultas")
+    
+    print(f"   - Memoria de aristas CSR: {compacto.csr.memoria_bytes()} bytes")
+    print()
+
+
+def crear_grafo_aleatorio(num_vertices: int, num_aristas: int, semilla: int) -> Grafo:
+    """Crea un grafo dirigido aleatorio con pesos positivos."""
+    generador = random.Random(semilla)
+    grafo = Grafo()
+    for i in range(num_vertices):
+        grafo.agregar_vertice(f"V{i}")
+    for _ in range(num_aristas):
+        origen = f"V{generador.randrange(num_vertices)}"
+        destino = f"V{generador.randrange(num_vertices)}"
+        grafo.agregar_arista(origen, destino,
+                             generador.uniform(50, 500), generador.uniform(0.5, 5.0))
+    return grafo
+
+
+def probar_dijkstra_bidireccional():
+    """Compara Dijkstra bidireccional con Dijkstra en grafos aleatorios."""
+    print("=" * 60)
+    print("PRUEBA 8: Dijkstra Bidireccional (grafos aleatorios)")
+    print("=" * 60)
+    
+    generador = random.Random(2026)
+    consultas = 0
+    errores = 0
+    asentados_dijkstra = 0
+    asentados_bidireccional = 0
+    
+    for semilla in range(50):
+        num_vertices = generador.randint(2, 200)
+        grafo = crear_grafo_aleatorio(num_vertices, num_vertices * 3, semilla)
+        grafo.cache_rutas.configurar(max_entradas=0)  # Contar vértices asentados reales
+        for _ in range(20):
+            origen = f"V{generador.randrange(num_vertices)}"
+            destino = f"V{generador.randrange(num_vertices)}"
+            for criterio in ('distancia', 'tiempo'):
+                _, coste = grafo.dijkstra(origen, destino, criterio)
+                asentados_dijkstra += grafo.nodos_asentados
+                ruta, coste_bd = grafo.dijkstra_bidireccional(origen, destino, criterio)
+                asentados_bidireccional += grafo.nodos_asentados
+                consultas += 1
+                if abs(coste - coste_bd) > 1e-9 and coste != coste_bd:
+                    errores += 1
+                elif ruta and (ruta[0] != origen or ruta[-1] != destino):
+                    errores += 1
+    
+    if errores == 0:
+        print(f"✅ Costes idénticos en {consultas} consultas")
+    else:
+        print(f"❌ {errores} de {consultas} consultas difieren")
+    print(f"   - Vértices asentados (Dijkstra): {asentados_dijkstra}")
+    print(f"   - Vértices asentados (bidireccional): {asentados_bidireccional}")
+    print()
+
+
+def probar_a_estrella():
+    """Compara A* con Dijkstra en grafos aleatorios con coordenadas, en ambos modos."""
+    print("=" * 60)
+    print("PRUEBA 30: A* (grafos aleatorios con coordenadas)")
+    print("=" * 60)
+    
+    generador = random.Random(12)
+    consultas = 0
+    errores = 0
+    
+    for semilla in range(30):
+        num_vertices = generador.randint(2, 120)
+        grafo = Grafo()
+        for i in range(num_vertices):
+            grafo.agregar_vertice(f"V{i}", coordenadas=(-62.8 + generador.uniform(0, 0.1),
+                                                        8.2 + generador.uniform(0, 0.1)))
+        for _ in range(num_vertices * 3):
+            origen = f"V{generador.randrange(num_vertices)}"
+            destino = f"V{generador.randrange(num_vertices)}"
+            # Calles algo más largas que la línea recta, a 20-60 km/h
+            distancia = distancia_haversine(grafo.coordenadas[origen],
+                                            grafo.coordenadas[destino]) * generador.uniform(1, 1.5)
+            grafo.agregar_arista(origen, destino, distancia,
+                                 distancia / generador.uniform(333, 1000))
+        if semilla % 3 == 0:
+            # Un vértice sin coordenadas: A* debe seguir siendo exacto
+            grafo.agregar_arista("V0", "SinCoordenadas", 50, 0.5)
+            grafo.agregar_arista("SinCoordenadas", f"V{num_vertices - 1}", 50, 0.5)
+        vertices = sorted(grafo.vertices)
+        for modo in ('listas', 'compacto'):
+            if modo == 'compacto':
+                grafo.compactar()
+            for _ in range(20):
+                origen, destino = generador.choice(vertices), generador.choice(vertices)
+                for criterio in ('distancia', 'tiempo'):
+                    _, coste = grafo.dijkstra(origen, destino, criterio)
+                    ruta, coste_a = grafo.a_estrella(origen, destino, criterio)
+                    consultas += 1
+                    if abs(coste - coste_a) > 1e-9 and coste != coste_a:
+                        errores += 1
+                    elif ruta and (ruta[0] != origen or ruta[-1] != destino):
+                        errores += 1
+    
+    # En una malla la heurística debe ahorrar vértices asentados
+    lado = 30
+    malla = Grafo()
+    for fila in range(lado):
+        for columna in range(lado):
+            malla.agregar_vertice(f"N{fila}_{columna}",
+                                  coordenadas=(-62.8 + columna * 0.0009, 8.2 + fila * 0.0009))
+    for fila in range(lado):
+        for columna in range(lado):
+            for vecino in (f"N{fila}_{columna + 1}" if columna + 1 < lado else None,
+                           f"N{fila + 1}_{columna}" if fila + 1 < lado else None):
+                if vecino is None:
+                    continue
+                actual = f"N{fila}_{columna}"
+                distancia = distancia_haversine(malla.coordenadas[actual], malla.coordenadas[vecino])
+                malla.agregar_arista(actual, vecino, distancia, distancia / 500)
+                malla.agregar_arista(vecino, actual, distancia, distancia / 500)
+    malla.cache_rutas.configurar(max_entradas=0)  # Contar vértices asentados reales
+    origen, destino = f"N{lado // 2}_0", f"N{lado // 2}_{lado - 1}"
+    _, coste = malla.dijkstra(origen, destino, 'distancia')
+    asentados_dijkstra = malla.nodos_asentados
+    _, coste_a = malla.a_estrella(origen, destino, 'distancia')
+    asentados_a = malla.nodos_asentados
+    if abs(coste - coste_a) > 1e-9 or asentados_a >= asentados_dijkstra:
+        errores += 1
+    
+    if errores == 0:
+        print(f"✅ Costes idénticos en {consultas} consultas (listas y compacto)")
+    else:
+        print(f"❌ {errores} de {consultas} consultas difieren o la heurística no poda")
+    print(f"   - Malla {lado}x{lado}, vértices asentados: A* {asentados_a}, Dijkstra {asentados_dijkstra}")
+    print()
+
+
+def probar_jerarquia_contraccion():
+    """Compara las consultas con jerarquías de contracción con Dijkstra."""
+    print("=" * 60)
+    print("PRUEBA 9: Jerarquías de Contracción")
+    print("=" * 60)
+    
+    generador = random.Random(4)
+    consultas = 0
+    errores = 0
+    
+    for semilla in range(20):
+        num_vertices = generador.randint(2, 80)
+        grafo = crear_grafo_aleatorio(num_vertices, num_vertices * 3, semilla)
+        for criterio in ('distancia', 'tiempo'):
+            grafo.construir_jerarquia(criterio)
+        for _ in range(20):
+            origen = f"V{generador.randrange(num_vertices)}"
+            destino = f"V{generador.randrange(num_vertices)}"
+            for criterio in ('distancia', 'tiempo'):
+                _, coste = grafo.dijkstra(origen, destino, criterio)
+                _, coste_ch = grafo.ruta_jerarquica(origen, destino, criterio)
+                consultas += 1
+                if abs(coste - coste_ch) > 1e-9 and coste != coste_ch:
+                    errores += 1
+        
+        # Un vértice agregado después de construir la jerarquía la invalida
+        grafo.agregar_vertice("Nuevo")
+        consultas += 1
+        if grafo.jerarquias or grafo.ruta_jerarquica("Nuevo", "Nuevo") != (["Nuevo"], 0.0):
+            errores += 1
+    
+    if errores == 0:
+        print(f"✅ Costes idénticos en {consultas} consultas")
+    else:
+        print(f"❌ {errores} de {consultas} consultas difieren")
+    print()
+
+
+def probar_rutas_pareto():
+    """Verifica que el frente de Pareto contiene los óptimos de cada criterio."""
+    print("=" * 60)
+    print("PRUEBA 10: Rutas Óptimas de Pareto")
+    print("=" * 60)
+    
+    generador = random.Random(5)
+    consultas = 0
+    errores = 0
+    
+    for semilla in range(20):
+        num_vertices = generador.randint(2, 60)
+        grafo = crear_grafo_aleatorio(num_vertices, num_vertices * 3, semilla)
+        for _ in range(10):
+            origen = f"V{generador.randrange(num_vertices)}"
+            destino = f"V{generador.randrange(num_vertices)}"
+            rutas = grafo.rutas_pareto(origen, destino)
+            _, distancia_minima = grafo.dijkstra(origen, destino, 'distancia')
+            _, tiempo_minimo = grafo.dijkstra(origen, destino, 'tiempo')
+            consultas += 1
+            
+            if not rutas:
+                if distancia_minima != float('inf'):
+                    errores += 1
+                continue
+            # La primera ruta es la más corta y la última la más rápida
+            if (abs(rutas[0][1] - distancia_minima) > 1e-9
+                    or abs(rutas[-1][2] - tiempo_minimo) > 1e-9):
+                errores += 1
+            # Ninguna ruta del frente puede dominar a otra
+            for _, d1, t1 in rutas:
+                if any(d2 <= d1 and t2 <= t1 and (d2, t2) != (d1, t1) for _, d2, t2 in rutas):
+                    errores += 1
+    
+    if errores == 0:
+        print(f"✅ Frentes correctos en {consultas} consultas")
+    else:
+        print(f"❌ {errores} errores en {consultas} consultas")
+    print()
+
+
+def probar_tiempo_dependiente(grafo):
+    """Compara la ruta por hora de salida con el Dijkstra por tiempo fijo."""
+    print("=" * 60)
+    print("PRUEBA 11: Tiempos Dependientes de la Hora")
+    print("=" * 60)
+    
+    origen = 'Guayana-Bolivia'
+    destino = 'Guayana-Venezuela'
+    _, tiempo_fijo = grafo.dijkstra(origen, destino, 'tiempo')
+    
+    for hora in (180, 480, 1080):
+        ruta, duracion = grafo.dijkstra_dependiente(origen, destino, hora)
+        print(f"\n🕐 Salida {int(hora) // 60:02d}:{int(hora) % 60:02d} → {duracion:.1f} min")
+        print(f"   - Camino: {' → '.join(ruta)}")
+    
+    # Fuera de hora pico todos los factores valen 1: igual que dijkstra()
+    errores = 0
+    for o in grafo.obtener_todos_vertices():
+        for d in grafo.obtener_todos_vertices():
+            _, fijo = grafo.dijkstra(o, d, 'tiempo')
+            _, madrugada = grafo.dijkstra_dependiente(o, d, 180)
+            if abs(fijo - madrugada) > 1e-9 and fijo != madrugada:
+                errores += 1
+    
+    # Una arista paralela nueva en un par con perfil también debe cumplir FIFO
+    pares = Grafo()
+    pares.agregar_arista('a', 'b', 100, 1.0)
+    perfil = pares.agregar_perfil_tiempo([(0, 1), (60, 1), (120, 2), (1439, 2)])
+    pares.asignar_perfil_tiempo('a', 'b', perfil)
+    try:
+        pares.agregar_arista('a', 'b', 100, 120.0)
+        errores += 1
+    except ValueError:
+        if len(pares.obtener_vecinos('a')) != 1:
+            errores += 1
+    
+    _, pico = grafo.dijkstra_dependiente(origen, destino, 480)
+    if errores == 0 and pico >= tiempo_fijo:
+        print(f"\n✅ Sin hora pico coincide con Dijkstra; en hora pico tarda {pico:.1f} min "
+              f"(fijo: {tiempo_fijo:.1f} min)")
+    else:
+        print(f"\n❌ {errores} rutas difieren de Dijkstra fuera de hora pico o violan FIFO")
+    print()
+
+
+def probar_actualizacion_pesos():
+    """Compara los árboles reparados tras cambios de peso con Dijkstra desde cero."""
+    print("=" * 60)
+    print("PRUEBA 12: Actualización de Pesos y Orígenes Vigilados")
+    print("=" * 60)
+    
+    generador = random.Random(6)
+    consultas = 0
+    errores = 0
+    
+    for semilla in range(10):
+        num_vertices = generador.randint(2, 60)
+        grafo = crear_grafo_aleatorio(num_vertices, num_vertices * 3, semilla)
+        referencia = crear_grafo_aleatorio(num_vertices, num_vertices * 3, semilla)
+        referencia.cache_rutas.configurar(max_entradas=0)
+        grafo.vigilar_origen('V0', 'tiempo')
+        
+        for _ in range(30):
+            origen = f"V{generador.randrange(num_vertices)}"
+            vecinos = grafo.obtener_vecinos(origen)
+            if not vecinos:
+                continue
+            destino, distancia, tiempo = generador.choice(vecinos)
+            nueva_distancia = distancia * generador.uniform(0.5, 2.0)
+            nuevo_tiempo = tiempo * generador.uniform(0.5, 2.0)
+            grafo.actualizar_peso(origen, destino, nueva_distancia, nuevo_tiempo)
+            referencia.actualizar_peso(origen, destino, nueva_distancia, nuevo_tiempo)
+            
+            destino = f"V{generador.randrange(num_vertices)}"
+            for o, criterio in (('V0', 'tiempo'), (origen, 'distancia')):
+                _, coste = grafo.dijkstra(o, destino, criterio)
+                _, esperado = referencia.dijkstra(o, destino, criterio)
+                consultas += 1
+                if abs(coste - esperado) > 1e-9 and coste != esperado:
+                    errores += 1
+    
+    if errores == 0:
+        print(f"✅ Costes idénticos en {consultas} consultas tras actualizar pesos")
+    else:
+        print(f"❌ {errores} de {consultas} consultas difieren")
+    print()
+
+
+def probar_k_rutas():
+    """Verifica que las k rutas son distintas, sin ciclos y de coste creciente."""
+    print("=" * 60)
+    print("PRUEBA 13: K Rutas Más Cortas (Yen)")
+    print("=" * 60)
+    
+    generador = random.Random(7)
+    consultas = 0
+    errores = 0
+    
+    for semilla in range(20):
+        num_vertices = generador.randint(2, 60)
+        grafo = crear_grafo_aleatorio(num_vertices, num_vertices * 3, semilla)
+        for _ in range(10):
+            origen = f"V{generador.randrange(num_vertices)}"
+            destino = f"V{generador.randrange(num_vertices)}"
+            _, optimo = grafo.dijkstra(origen, destino, 'tiempo')
+            rutas = list(grafo.k_rutas(origen, destino, 5, 'tiempo'))
+            consultas += 1
+            
+            if not rutas:
+                if optimo != float('inf'):
+                    errores += 1
+                continue
+            costes = [coste for _, coste in rutas]
+            caminos = {tuple(camino) for camino, _ in rutas}
+            if (abs(costes[0] - optimo) > 1e-9
+                    or any(b < a - 1e-9 for a, b in zip(costes, costes[1:]))
+                    or len(caminos) != len(rutas)
+                    or any(len(set(camino)) != len(camino) for camino in caminos)):
+                errores += 1
+    
+    if errores == 0:
+        print(f"✅ Rutas alternativas correctas en {consultas} consultas")
+    else:
+        print(f"❌ {errores} de {consultas} consultas con rutas incorrectas")
+    print()
+
+
+def probar_rutas_lote(grafo):
+    """Compara el cálculo en lote con varios procesos con dijkstra()."""
+    print("=" * 60)
+    print("PRUEBA 14: Rutas en Lote (varios procesos)")
+    print("=" * 60)
+    
+    vertices = grafo.obtener_todos_vertices()
+    consultas = [(origen, destino, criterio) for origen in vertices for destino in vertices
+                 for criterio in ('distancia', 'tiempo')]
+    
+    errores = 0
+    for ordenado in (True, False):
+        recibidos = 0
+        for indice, camino, coste in resolver_lote(consultas, procesos=2, tamano_bloque=32,
+                                                   ordenado=ordenado):
+            origen, destino, criterio = consultas[indice]
+            _, esperado = grafo.dijkstra(origen, destino, criterio)
+            if (ordenado and indice != recibidos) or abs(coste - esperado) > 1e-9:
+                errores += 1
+            recibidos += 1
+        if recibidos != len(consultas):
+            errores += 1
+    
+    if errores == 0:
+        print(f"✅ {len(consultas)} consultas resueltas en 2 procesos (en orden y según llegan)")
+    else:
+        print(f"❌ {errores} resultados incorrectos")
+    print()
+
+
+def probar_indice_espacial(grafo):
+    """Compara el índice espacial con una búsqueda lineal y prueba el ajuste a la red."""
+    print("=" * 60)
+    print("PRUEBA 15: Índice Espacial")
+    print("=" * 60)
+    
+    errores = 0
+    for i in range(50):
+        punto = (-62.85 + 0.005 * i, 8.2 + 0.004 * i)
+        lineal = min((math.hypot(x - punto[0], y - punto[1]), vertice)
+                     for vertice, (x, y) in grafo.coordenadas.items())
+        if grafo.vertices_cercanos(punto)[0] != lineal:
+            errores += 1
+    
+    ajuste = grafo.ajustar_a_red((-62.7455, 8.2855))
+    print(f"Punto ajustado a {ajuste['origen']} → {ajuste['destino']} "
+          f"({ajuste['fraccion']:.0%}, a {ajuste['distancia_metros']:.0f} m)")
+    
+    if errores == 0:
+        print("✅ Vértice más cercano coincide con la búsqueda lineal")
+    else:
+        print(f"❌ {errores} búsquedas incorrectas")
+    print()
+
+
+def probar_isocronas(grafo):
+    """Prueba las isocronas por bandas desde Terminal y hacia CentroCívico."""
+    print("=" * 60)
+    print("PRUEBA 16: Isocronas (5/10/15 min)")
+    print("=" * 60)
+    
+    errores = 0
+    for isocrona, inversa in ((grafo.isocrona('Terminal', [5, 10, 15]), False),
+                              (grafo.isocrona_inversa('CentroCívico', [5, 10, 15]), True)):
+        sentido = "hacia" if inversa else "desde"
+        print(f"{sentido.capitalize()} {isocrona.centro}: "
+              + ", ".join(f"≤{p:g} min: {len(isocrona.vertices_banda(b))}"
+                          for b, p in enumerate(isocrona.presupuestos))
+              + f" | {len(isocrona.aristas)} calles cortadas")
+        for vertice, coste in zip(isocrona.vertices, isocrona.costes):
+            origen, destino = (vertice, isocrona.centro) if inversa else (isocrona.centro, vertice)
+            _, esperado = grafo.dijkstra(origen, destino, 'tiempo')
+            if abs(coste - esperado) > 1e-9:
+                errores += 1
+    
+    if errores == 0:
+        print("✅ Costes de las isocronas coinciden con Dijkstra")
+    else:
+        print(f"❌ {errores} costes incorrectos")
+    print()
+
+
+def probar_componentes():
+    """Prueba las componentes fuertes y el descarte de pares sin ruta."""
+    print("=" * 60)
+    print("PRUEBA 17: Componentes Fuertemente Conexas")
+    print("=" * 60)
+    
+    grafo = crear_grafo_puerto_ordaz()
+    grafo.preparar_componentes()
+    # Calle de un solo sentido hacia un callejón sin salida
+    grafo.agregar_arista('Terminal', 'Callejón', 200, 1.0)
+    estadisticas = grafo.obtener_estadisticas()
+    print(f"Componentes: {estadisticas['num_componentes']} "
+          f"(mayor: {estadisticas['componente_mayor']} vértices)")
+    
+    _, coste = grafo.dijkstra('Callejón', 'CentroCívico')
+    asentados = grafo.nodos_asentados
+    alcanzable, _ = grafo.bfs('Callejón', 'CentroCívico')
+    print(f"Callejón → CentroCívico: coste {coste}, asentados {asentados}")
+    
+    # Cerrar el ciclo fusiona el callejón con el resto de la red
+    grafo.agregar_arista('Callejón', 'Terminal', 200, 1.0)
+    _, coste_cerrado = grafo.dijkstra('Callejón', 'CentroCívico')
+    
+    if (coste == float('inf') and not alcanzable and asentados == 0
+            and grafo.componentes.num_componentes() == 1 and coste_cerrado < float('inf')):
+        print("✅ Par sin ruta descartado sin buscar; componentes fusionadas al cerrar el ciclo")
+    else:
+        print("❌ Componentes incorrectas")
+    print()
+
+
+def probar_instantanea(grafo):
+    """Guarda el grafo en una instantánea binaria, la abre con mmap y compara rutas."""
+    print("=" * 60)
+    print("PRUEBA 18: Instantánea Binaria (mmap)")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'grafo.bin')
+        guardar_instantanea(grafo, ruta, b'huella')
+        abierto = abrir_instantanea(ruta, b'huella')
+        rechazado = abrir_instantanea(ruta, b'otra huella')
+        print(f"Instantánea de {os.path.getsize(ruta)} bytes")
+        
+        errores = 0
+        vertices = grafo.obtener_todos_vertices()
+        for origen in vertices:
+            for destino in vertices:
+                for criterio in ('distancia', 'tiempo'):
+                    if grafo.dijkstra(origen, destino, criterio)[1] != \
+                            abierto.dijkstra(origen, destino, criterio)[1]:
+                        errores += 1
+            if grafo.dijkstra_dependiente(origen, 'CentroCívico', 480)[1] != \
+                    abierto.dijkstra_dependiente(origen, 'CentroCívico', 480)[1]:
+                errores += 1
+        del abierto  # Libera el mapeo antes de borrar el directorio
+    
+    if errores == 0 and rechazado is None:
+        print("✅ Grafo abierto igual al original; huella distinta rechazada")
+    else:
+        print(f"❌ {errores} rutas distintas")
+    print()
+
+
+EXTRACTO_OSM = """<?xml version="1.0" encoding="UTF-8"?>
+<osm version="0.6">
+ <node id="1" lat="8.2850" lon="-62.7450"/>
+ <node id="2" lat="8.2850" lon="-62.7440"/>
+ <node id="3" lat="8.2850" lon="-62.7430"/>
+ <node id="4" lat="8.2860" lon="-62.7440"/>
+ <node id="5" lat="8.2840" lon="-62.7440"/>
+ <node id="6" lat="8.2870" lon="-62.7440"><tag k="amenity" v="bench"/></node>
+ <way id="10"><nd ref="1"/><nd ref="2"/><nd ref="3"/>
+  <tag k="highway" v="primary"/><tag k="name" v="Av. Guayana"/><tag k="maxspeed" v="60"/></way>
+ <way id="11"><nd ref="4"/><nd ref="2"/><nd ref="5"/>
+  <tag k="highway" v="residential"/><tag k="name" v="Calle Chile"/><tag k="oneway" v="yes"/></way>
+ <way id="12"><nd ref="4"/><nd ref="6"/><tag k="highway" v="footway"/></way>
+ <relation id="20"><member type="way" ref="10" role=""/></relation>
+</osm>
+"""
+
+
+def probar_importador_osm():
+    """Importa un extracto OSM pequeño: intersecciones, sentido único y pesos."""
+    print("=" * 60)
+    print("PRUEBA 19: Importador de OpenStreetMap")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'extracto.osm')
+        with open(ruta, 'w', encoding='utf-8') as f:
+            f.write(EXTRACTO_OSM)
+        grafo, resumen = importar_osm(ruta, progreso=None)
+    
+    print(f"{resumen['nodos']} nodos, {resumen['vias']} vías -> "
+          f"{resumen['vertices']} vértices, {resumen['aristas']} aristas")
+    
+    # La avenida (doble sentido) se parte en el nodo 2; la calle de sentido
+    # único solo va de 4 a 5; la acera no es rutable
+    tramo = [arista for arista in grafo.obtener_vecinos('1') if arista[0] == '2']
+    esperado = 110.0  # 0.001° de longitud a 8.285° de latitud
+    correcto = (
+        sorted(grafo.obtener_todos_vertices()) == ['1', '2', '3', '4', '5']
+        and resumen['aristas'] == 6
+        and grafo.dijkstra('5', '4')[0] == []
+        and grafo.dijkstra('4', '5')[0] == ['4', '2', '5']
+        and len(tramo) == 1 and abs(tramo[0][1] - esperado) < 0.5
+        and abs(tramo[0][2] - tramo[0][1] / 1000) < 1e-9  # 60 km/h = 1 km/min
+        and grafo.nombres_vertices['2'] == 'Av. Guayana con Calle Chile'
+    )
+    if correcto:
+        print("✅ Vías partidas en la intersección, sentido único respetado")
+    else:
+        print("❌ El grafo importado no es el esperado")
+    print()
+
+
+def probar_diario_persistencia():
+    """Cambios en el diario de operaciones, reaplicados al recargar y compactados."""
+    print("=" * 60)
+    print("PRUEBA 20: Diario de Datos Personalizados")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'datos.json')
+        gestor = GestorPersistencia(ruta)
+        for i in range(300):
+            gestor.agregar_nodo(f"N{i}", f"Nodo {i}", (-62.7 + i * 1e-4, 8.28))
+            if i:
+                gestor.agregar_conexion(f"N{i - 1}", f"N{i}", 100.0, 1.0)
+        gestor.editar_conexion("N0", "N1", nuevo_tiempo=2.5)
+        gestor.eliminar_nodo("N299")
+        gestor.cerrar()
+        
+        recargado = GestorPersistencia(ruta)
+        print(f"Operaciones en el diario: {gestor.almacen.operaciones_diario}")
+        with open(ruta, encoding='utf-8') as f:
+            instantanea = json.load(f)
+        correcto = (
+            recargado.datos == gestor.datos
+            and len(recargado.obtener_nodos()) == 299
+            and len(recargado.obtener_conexiones()) == 298
+            and instantanea != gestor.datos  # Lo último solo está en el diario
+        )
+        recargado.guardar_datos()
+        with open(ruta, encoding='utf-8') as f:
+            correcto = correcto and json.load(f) == gestor.datos
+        correcto = correcto and not os.path.exists(recargado.almacen.archivo_diario)
+    
+    if correcto:
+        print("✅ Diario reaplicado al recargar; compactado en el JSON")
+    else:
+        print("❌ Los datos recargados no coinciden")
+    print()
+
+
+def probar_almacen_sqlite():
+    """Migra datos personalizados a SQLite y carga solo los de una zona."""
+    print("=" * 60)
+    print("PRUEBA 21: Almacén SQLite")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_json = os.path.join(directorio, 'datos.json')
+        ruta_db = os.path.join(directorio, 'datos.db')
+        gestor = GestorPersistencia(ruta_json)
+        for i in range(100):
+            gestor.agregar_nodo(f"N{i}", f"Nodo {i}", (-62.80 + i * 0.001, 8.28))
+            if i:
+                gestor.agregar_conexion(f"N{i - 1}", f"N{i}", 100.0, 1.0)
+        gestor.cerrar()
+        
+        nodos, conexiones = migrar_json_a_sqlite(ruta_json, ruta_db)
+        print(f"Migrados {nodos} nodos y {conexiones} conexiones")
+        
+        completo = GestorPersistencia(ruta_db)
+        iguales = completo.datos == gestor.datos
+        completo.eliminar_nodo("N50")
+        completo.editar_conexion("N0", "N1", nuevo_tiempo=3.0)
+        completo.cerrar()
+        
+        # Nodos N10..N19 y las conexiones que los tocan (N9-N10 ... N19-N20)
+        zona = GestorPersistencia(ruta_db, caja=(-62.7905, 8.0, -62.7805, 8.5))
+        parcial = (len(zona.obtener_nodos()) == 10
+                   and len(zona.obtener_conexiones()) == 11)
+        zona.cerrar()
+        
+        recargado = GestorPersistencia(ruta_db)
+        persistido = (len(recargado.obtener_nodos()) == 99
+                      and len(recargado.obtener_conexiones()) == 97
+                      and recargado.obtener_conexiones()[0]["tiempo"] == 3.0)
+        
+        # Reemplazar los datos y guardarlos elimina de la base los registros que faltan
+        recargado.datos = {"nodos": recargado.obtener_nodos()[:2],
+                           "conexiones": recargado.obtener_conexiones()[:1]}
+        recargado.guardar_datos()
+        recargado.cerrar()
+        reemplazado = GestorPersistencia(ruta_db)
+        persistido = persistido and reemplazado.datos == recargado.datos
+        reemplazado.cerrar()
+        
+        # Guardar tras una carga por zona no borra los registros de fuera
+        zona = GestorPersistencia(ruta_db, caja=(-62.8005, 8.0, -62.7995, 8.5))
+        zona.guardar_datos()
+        zona.cerrar()
+        reemplazado = GestorPersistencia(ruta_db)
+        persistido = persistido and len(reemplazado.obtener_nodos()) == 2
+        reemplazado.cerrar()
+    
+    if iguales and parcial and persistido:
+        print("✅ Migración completa, carga por zona y cambios persistidos")
+    else:
+        print(f"❌ Migración: {iguales}, zona: {parcial}, cambios: {persistido}")
+    print()
+
+
+def probar_alt():
+    """Compara ALT con Dijkstra, también después de aumentar pesos."""
+    print("=" * 60)
+    print("PRUEBA 22: ALT (A* con Landmarks)")
+    print("=" * 60)
+    
+    generador = random.Random(5)
+    consultas = 0
+    errores = 0
+    
+    for semilla in range(20):
+        num_vertices = generador.randint(2, 120)
+        grafo = crear_grafo_aleatorio(num_vertices, num_vertices * 3, semilla)
+        grafo.preparar_landmarks(4)
+        for ronda in range(2):
+            for _ in range(20):
+                origen = f"V{generador.randrange(num_vertices)}"
+                destino = f"V{generador.randrange(num_vertices)}"
+                for criterio in ('distancia', 'tiempo'):
+                    _, coste = grafo.dijkstra(origen, destino, criterio)
+                    ruta, coste_alt = grafo.ruta_alt(origen, destino, criterio)
+                    consultas += 1
+                    if abs(coste - coste_alt) > 1e-9 and coste != coste_alt:
+                        errores += 1
+                    elif ruta and (ruta[0] != origen or ruta[-1] != destino):
+                        errores += 1
+            
+            # Aumentar pesos conserva los landmarks: las cotas siguen siendo válidas.
+            # actualizar_peso() iguala las aristas paralelas, así que se parte de la mayor
+            for vertice in sorted(grafo.vertices)[:num_vertices // 3]:
+                aristas = {}
+                for vecino, distancia, tiempo in grafo.obtener_vecinos(vertice):
+                    anterior = aristas.get(vecino, (0, 0))
+                    aristas[vecino] = (max(anterior[0], distancia), max(anterior[1], tiempo))
+                for vecino, (distancia, tiempo) in aristas.items():
+                    grafo.actualizar_peso(vertice, vecino, distancia * generador.uniform(1, 3),
+                                          tiempo * generador.uniform(1, 3))
+            if grafo.landmarks is None:
+                errores += 1
+    
+    if errores == 0:
+        print(f"✅ Costes idénticos en {consultas} consultas (antes y después de aumentar pesos)")
+    else:
+        print(f"❌ {errores} de {consultas} consultas difieren")
+    print()
+
+
+def probar_matriz_distancias():
+    """Compara la matriz de distancias con dijkstra() par a par."""
+    print("=" * 60)
+    print("PRUEBA 23: Matriz de Distancias")
+    print("=" * 60)
+    
+    generador = random.Random(6)
+    celdas = 0
+    errores = 0
+    sin_ruta = 0
+    
+    for semilla in range(15):
+        num_vertices = generador.randint(2, 60)
+        # Pocas aristas y un vértice aislado: quedan pares sin ruta
+        grafo = crear_grafo_aleatorio(num_vertices, num_vertices * 2, semilla)
+        grafo.agregar_vertice("Aislado")
+        vertices = sorted(grafo.vertices)
+        origenes = generador.sample(vertices, min(8, len(vertices))) + ["Aislado", "Inexistente"]
+        destinos = generador.sample(vertices, min(8, len(vertices))) + origenes[:2]
+        for criterio in ('distancia', 'tiempo'):
+            matriz, predecesores = grafo.matriz_distancias(origenes, destinos, criterio,
+                                                           con_predecesores=True)
+            for i, origen in enumerate(origenes):
+                for j, destino in enumerate(destinos):
+                    camino, coste = grafo.dijkstra(origen, destino, criterio)
+                    celdas += 1
+                    if origen == destino and matriz[i][j] != 0:
+                        errores += 1
+                    if coste == float('inf'):
+                        sin_ruta += 1
+                        if matriz[i][j] != float('inf'):
+                            errores += 1
+                    elif abs(coste - matriz[i][j]) > 1e-9:
+                        errores += 1
+                    elif camino and Grafo.reconstruir_camino(predecesores[i], destino)[0] != origen:
+                        errores += 1
+    
+    if errores == 0:
+        print(f"✅ {celdas} celdas iguales a dijkstra() ({sin_ruta} sin ruta)")
+    else:
+        print(f"❌ {errores} de {celdas} celdas difieren")
+    print()
+
+
+def probar_cache_rutas():
+    """Prueba aciertos, invalidación por versión, LRU y límite de memoria de la caché."""
+    print("=" * 60)
+    print("PRUEBA 24: Caché de Rutas")
+    print("=" * 60)
+    
+    errores = []
+    grafo = Grafo()
+    grafo.agregar_arista("A", "B", 100, 1)
+    grafo.agregar_arista("B", "C", 100, 1)
+    grafo.agregar_arista("A", "C", 500, 5)
+    
+    # Acierto: la segunda consulta sale de la caché con el mismo resultado
+    primera = grafo.dijkstra("A", "C", 'tiempo')
+    aciertos = grafo.cache_rutas.aciertos
+    segunda = grafo.dijkstra("A", "C", 'tiempo')
+    if grafo.cache_rutas.aciertos != aciertos + 1 or segunda != primera:
+        errores.append("la consulta repetida no fue un acierto")
+    
+    # agregar_arista() cambia la versión: la ruta guardada no debe reutilizarse
+    grafo.agregar_arista("A", "C", 50, 0.5)
+    if grafo.dijkstra("A", "C", 'tiempo') != (["A", "C"], 0.5):
+        errores.append("ruta obsoleta tras agregar_arista()")
+    
+    # Aumentar una arista del camino guardado invalida esa ruta
+    grafo.dijkstra("A", "B", 'tiempo')
+    grafo.actualizar_peso("A", "B", 100, 10)
+    if grafo.dijkstra("A", "B", 'tiempo') != (["A", "B"], 10):
+        errores.append("ruta obsoleta tras actualizar_peso()")
+    
+    # LRU: al superar max_entradas sale la menos usada
+    cache = CacheRutas(max_entradas=2)
+    cache.guardar("a", 0, ["A"], 1.0)
+    cache.guardar("b", 0, ["B"], 2.0)
+    cache.obtener("a", 0)
+    cache.guardar("c", 0, ["C"], 3.0)
+    if cache.obtener("b", 0) is not None or cache.obtener("a", 0) != (["A"], 1.0) or cache.desalojos != 1:
+        errores.append("el desalojo no siguió el orden LRU")
+    
+    # Límite de memoria: nunca se supera y una ruta más grande que el límite no se guarda
+    cache = CacheRutas(max_bytes=2000)
+    for i in range(50):
+        cache.guardar(i, 0, [f"V{k}" for k in range(i % 10)], float(i))
+        if cache.bytes_usados > cache.max_bytes:
+            errores.append("bytes_usados supera max_bytes")
+            break
+    if cache.desalojos == 0 or cache.obtener(49, 0) is None:
+        errores.append("el límite de memoria no desalojó las entradas antiguas")
+    cache.guardar("enorme", 0, ["V"] * 1000, 0.0)
+    if cache.obtener("enorme", 0) is not None:
+        errores.append("se guardó una ruta mayor que max_bytes")
+    
+    # Desactivada: ni guarda ni cuenta fallos
+    cache = CacheRutas(max_entradas=0)
+    cache.guardar("a", 0, ["A"], 1.0)
+    if cache.obtener("a", 0) is not None or cache.fallos != 0:
+        errores.append("la caché desactivada cuenta fallos")
+    
+    if errores:
+        for error in errores:
+            print(f"❌ {error}")
+    else:
+        print("✅ Aciertos, invalidación por versión, LRU y límite de memoria correctos")
+    print()
+
+
+def probar_arboles_caminos():
+    """Compara las consultas servidas desde árboles reutilizables con búsquedas nuevas."""
+    print("=" * 60)
+    print("PRUEBA 25: Árboles de Caminos Reutilizables")
+    print("=" * 60)
+    
+    generador = random.Random(8)
+    consultas = 0
+    errores = 0
+    
+    for semilla in range(10):
+        num_vertices = generador.randint(5, 80)
+        grafo = crear_grafo_aleatorio(num_vertices, num_vertices * 3, semilla)
+        referencia = crear_grafo_aleatorio(num_vertices, num_vertices * 3, semilla)
+        grafo.arboles_caminos.configurar(4)
+        # Sin caché, cada consulta pasa por el árbol del origen
+        grafo.cache_rutas.configurar(max_entradas=0)
+        referencia.cache_rutas.configurar(max_entradas=0)
+        origenes = [f"V{generador.randrange(num_vertices)}" for _ in range(3)]
+        
+        for ronda in range(3):
+            for origen in origenes:
+                for destino in generador.sample(sorted(grafo.vertices), min(15, num_vertices)):
+                    for criterio in ('distancia', 'tiempo'):
+                        camino, coste = grafo.dijkstra(origen, destino, criterio)
+                        _, coste_nuevo = referencia.dijkstra(origen, destino, criterio)
+                        consultas += 1
+                        if abs(coste - coste_nuevo) > 1e-9 and coste != coste_nuevo:
+                            errores += 1
+                        elif camino and (camino[0] != origen or camino[-1] != destino):
+                            errores += 1
+            
+            # Cambios en ambos grafos: los árboles anteriores quedan obsoletos
+            desalojados = grafo.arboles_caminos.desalojados
+            origen, destino = f"V{generador.randrange(num_vertices)}", origenes[0]
+            for g in (grafo, referencia):
+                g.agregar_arista(origenes[1], origen, 10, 0.1)
+            for vertice in (origenes[0], origen):
+                for vecino, distancia, tiempo in list(grafo.obtener_vecinos(vertice))[:2]:
+                    factor = generador.choice((0.2, 4.0))
+                    for g in (grafo, referencia):
+                        g.actualizar_peso(vertice, vecino, distancia * factor, tiempo * factor)
+            grafo.dijkstra(origenes[0], destino, 'tiempo')
+            if grafo.arboles_caminos.desalojados == desalojados:
+                errores += 1
+    
+    estadisticas = grafo.arboles_caminos.estadisticas()
+    if errores == 0 and estadisticas['reutilizados'] > 0:
+        print(f"✅ Costes idénticos en {consultas} consultas, con agregar_arista() y actualizar_peso() intercalados")
+    else:
+        print(f"❌ {errores} de {consultas} consultas difieren")
+    print()
+
+
+def probar_recorridos():
+    """Compara BFS y DFS con las versiones recursivas originales y prueba un corredor largo."""
+    print("=" * 60)
+    print("PRUEBA 26: Recorridos BFS/DFS sin Recursión")
+    print("=" * 60)
+    
+    def dfs_recursivo(grafo, origen, destino):
+        # Implementación recursiva anterior de Grafo.dfs()
+        visitados = set()
+        camino = []
+        
+        def visitar(vertice_actual):
+            if vertice_actual == destino:
+                camino.append(vertice_actual)
+                return True
+            visitados.add(vertice_actual)
+            camino.append(vertice_actual)
+            for vecino, _, _ in grafo.obtener_vecinos(vertice_actual):
+                if vecino not in visitados and visitar(vecino):
+                    return True
+            camino.pop()
+            return False
+        
+        encontrado = visitar(origen)
+        return encontrado, camino if encontrado else []
+    
+    def preorden_recursivo(grafo, origen):
+        orden = []
+        visitados = set()
+        
+        def visitar(vertice_actual):
+            visitados.add(vertice_actual)
+            orden.append(vertice_actual)
+            for vecino, _, _ in grafo.obtener_vecinos(vertice_actual):
+                if vecino not in visitados:
+                    visitar(vecino)
+        
+        visitar(origen)
+        return orden
+    
+    def bfs_caminos(grafo, origen, destino):
+        # Implementación anterior de Grafo.bfs(), con una copia del camino por entrada
+        if origen == destino:
+            return True, [origen]
+        visitados = {origen}
+        cola = deque([(origen, [origen])])
+        while cola:
+            vertice_actual, camino = cola.popleft()
+            for vecino, _, _ in grafo.obtener_vecinos(vertice_actual):
+                if vecino not in visitados:
+                    if vecino == destino:
+                        return True, camino + [vecino]
+                    visitados.add(vecino)
+                    cola.append((vecino, camino + [vecino]))
+        return False, []
+    
+    def orden_bfs(grafo, origen):
+        orden = [origen]
+        visitados = {origen}
+        cola = deque([origen])
+        while cola:
+            for vecino, _, _ in grafo.obtener_vecinos(cola.popleft()):
+                if vecino not in visitados:
+                    visitados.add(vecino)
+                    orden.append(vecino)
+                    cola.append(vecino)
+        return orden
+    
+    generador = random.Random(9)
+    consultas = 0
+    errores = 0
+    
+    for semilla in range(20):
+        num_vertices = generador.randint(2, 60)
+        grafo = crear_grafo_aleatorio(num_vertices, generador.randint(num_vertices, num_vertices * 3), semilla)
+        for _ in range(20):
+            origen = f"V{generador.randrange(num_vertices)}"
+            destino = f"V{generador.randrange(num_vertices)}"
+            consultas += 1
+            if grafo.dfs(origen, destino) != dfs_recursivo(grafo, origen, destino):
+                errores += 1
+            if grafo.bfs(origen, destino) != bfs_caminos(grafo, origen, destino):
+                errores += 1
+            if list(grafo.recorrer_dfs(origen)) != preorden_recursivo(grafo, origen):
+                errores += 1
+            if list(grafo.recorrer_bfs(origen)) != orden_bfs(grafo, origen):
+                errores += 1
+    
+    if errores == 0:
+        print(f"✅ Mismo orden y caminos que las versiones recursivas en {consultas} consultas")
+    else:
+        print(f"❌ {errores} diferencias en {consultas} consultas")
+    
+    # Un corredor más largo que el límite de recursión
+    longitud = sys.getrecursionlimit() + 500
+    corredor = Grafo()
+    for i in range(longitud - 1):
+        corredor.agregar_arista(f"C{i}", f"C{i + 1}", 10, 0.1)
+    final = f"C{longitud - 1}"
+    alcanzable_dfs, camino_dfs = corredor.dfs("C0", final)
+    alcanzable_bfs, camino_bfs = corredor.bfs("C0", final)
+    recorrido = list(corredor.recorrer_dfs("C0"))
+    if (alcanzable_dfs and alcanzable_bfs and len(camino_dfs) == longitud
+            and camino_bfs == camino_dfs and len(recorrido) == longitud
+            and list(corredor.recorrer_bfs("C0")) == recorrido):
+        print(f"✅ Corredor de {longitud} vértices recorrido sin RecursionError")
+    else:
+        print(f"❌ Corredor de {longitud} vértices recorrido de forma incompleta")
+    print()
+
+
+def probar_servicio_rutas():
+    """Prueba la coalescencia, el rechazo por saturación, los errores y /salud del servicio."""
+    print("=" * 60)
+    print("PRUEBA 27: Servicio de Rutas")
+    print("=" * 60)
+    
+    async def escenario():
+        errores = []
+        grafo = crear_grafo_aleatorio(30, 90, 7)
+        servicio = ServicioRutas(grafo, puerto=0, max_pendientes=1)
+        
+        # Un dijkstra() que espera a que la prueba lo libere
+        liberar = threading.Event()
+        dijkstra_original = grafo.dijkstra
+        llamadas = []
+        
+        def dijkstra_lento(origen, destino, criterio='distancia'):
+            llamadas.append((origen, destino, criterio))
+            liberar.wait(5)
+            return dijkstra_original(origen, destino, criterio)
+        
+        grafo.dijkstra = dijkstra_lento
+        peticion = {'tipo': 'ruta', 'origen': 'V0', 'destino': 'V5', 'criterio': 'tiempo'}
+        tareas = [asyncio.ensure_future(servicio.despachar(dict(peticion))) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        
+        # Saturado: un cálculo distinto se rechaza con 503 en lugar de encolarse
+        try:
+            await servicio.despachar(dict(peticion, destino='V6'))
+            errores.append("no se rechazó una petición con el servicio saturado")
+        except ErrorPeticion as e:
+            if e.estado != 503 or servicio.rechazadas != 1:
+                errores.append(f"rechazo con estado {e.estado}")
+        
+        liberar.set()
+        respuestas = await asyncio.gather(*tareas)
+        if len(llamadas) != 1 or servicio.coalescidas != 2:
+            errores.append(f"{len(llamadas)} cálculos para 3 peticiones iguales")
+        camino, coste = dijkstra_original('V0', 'V5', 'tiempo')
+        if any(r['camino'] != camino or r['coste'] != (coste if math.isfinite(coste) else None)
+               for r in respuestas):
+            errores.append("las peticiones coalescidas no recibieron el mismo resultado")
+        
+        # Parámetros que no son texto y fallos del cálculo
+        for invalida in ({'tipo': ['ruta']}, dict(peticion, criterio=['tiempo']),
+                         dict(peticion, algoritmo={'a': 1}), dict(peticion, origen=3)):
+            try:
+                await servicio.despachar(invalida)
+                errores.append(f"se aceptó {invalida}")
+            except ErrorPeticion as e:
+                if e.estado != 400:
+                    errores.append(f"{invalida} respondió {e.estado}")
+        
+        def dijkstra_roto(origen, destino, criterio='distancia'):
+            raise RuntimeError("fallo interno")
+        
+        grafo.dijkstra = dijkstra_roto
+        
+        async def enviar(puerto, datos):
+            lector, escritor = await asyncio.open_connection('127.0.0.1', puerto)
+            escritor.write(datos)
+            escritor.write_eof()  # Fin de las peticiones (y cuerpo truncado si falta algo)
+            respuesta = await asyncio.wait_for(lector.read(), 5)
+            escritor.close()
+            return respuesta
+        
+        def respuesta_http(datos):
+            cabeceras, _, cuerpo = datos.partition(b'\r\n\r\n')
+            return int(cabeceras.split()[1]), json.loads(cuerpo)
+        
+        # Las excepciones que escapan de una conexión llegan al manejador del bucle
+        no_atrapadas = []
+        asyncio.get_running_loop().set_exception_handler(
+            lambda bucle, contexto: no_atrapadas.append(contexto.get('exception')))
+        
+        await servicio.iniciar()
+        try:
+            estado, salud = respuesta_http(await enviar(
+                servicio.puerto, b"GET /salud HTTP/1.1\r\nHost: localhost\r\n\r\n"))
+            if estado != 200 or salud.get('estado') != 'ok' or salud.get('vertices') != 30:
+                errores.append(f"/salud respondió {estado} {salud}")
+            estado, cuerpo = respuesta_http(await enviar(
+                servicio.puerto, b"GET /ruta?origen=V0&destino=V5 HTTP/1.1\r\n\r\n"))
+            if estado != 500 or 'error' not in cuerpo:
+                errores.append(f"un fallo del cálculo respondió {estado} {cuerpo}")
+            
+            # Una línea JSON que no es UTF-8 recibe el mismo error que un JSON mal formado
+            linea = json.loads(await enviar(servicio.puerto, b'{"tipo": "\xff"}\n'))
+            if linea.get('estado') != 400:
+                errores.append(f"una línea con UTF-8 inválido respondió {linea}")
+            
+            # Cuerpo más corto que su Content-Length: se cierra sin excepción sin atrapar
+            await enviar(servicio.puerto, b"POST /ruta HTTP/1.1\r\nContent-Length: 50\r\n\r\n{}\r\n")
+            await asyncio.sleep(0.05)
+            if no_atrapadas:
+                errores.append(f"excepción sin atrapar: {no_atrapadas[0]!r}")
+        finally:
+            await servicio.cerrar()
+        
+        # Con el límite de conexiones alcanzado se responde 503 en el formato de la conexión
+        limitado = ServicioRutas(crear_grafo_aleatorio(5, 5, 1), puerto=0, max_conexiones=1)
+        await limitado.iniciar()
+        try:
+            _, ocupada = await asyncio.open_connection('127.0.0.1', limitado.puerto)
+            await asyncio.sleep(0.05)
+            estado, _ = respuesta_http(await enviar(limitado.puerto, b"GET /salud HTTP/1.1\r\n\r\n"))
+            linea = json.loads(await enviar(limitado.puerto, b'{"tipo": "salud"}\n'))
+            ocupada.close()
+            if estado != 503 or linea.get('estado') != 503 or limitado.rechazadas != 2:
+                errores.append(f"con el límite de conexiones se respondió {estado} y {linea}")
+        finally:
+            await limitado.cerrar()
+        return errores
+    
+    errores = asyncio.run(escenario())
+    if errores:
+        for error in errores:
+            print(f"❌ {error}")
+    else:
+        print("✅ Coalescencia, 503 por saturación y por conexiones, 400/500 y /salud correctos")
+    print()
+
+
+def probar_estadisticas_incrementales():
+    """Compara los contadores incrementales con un recuento completo tras cada cambio."""
+    print("=" * 60)
+    print("PRUEBA 28: Estadísticas Incrementales")
+    print("=" * 60)
+    
+    def recontar(grafo):
+        grados_entrada = {v: 0 for v in grafo.vertices}
+        histograma_salida = Counter()
+        pesos = {'distancia': [], 'tiempo': []}
+        for vertice in grafo.vertices:
+            aristas = grafo.obtener_vecinos(vertice)
+            histograma_salida[len(aristas)] += 1
+            for vecino, distancia, tiempo in aristas:
+                grados_entrada[vecino] += 1
+                pesos['distancia'].append(distancia)
+                pesos['tiempo'].append(tiempo)
+        resumen = {criterio: {'min': min(valores, default=None), 'max': max(valores, default=None),
+                              'media': sum(valores) / len(valores) if valores else None}
+                   for criterio, valores in pesos.items()}
+        xs = [x for x, _ in grafo.coordenadas.values()]
+        ys = [y for _, y in grafo.coordenadas.values()]
+        caja = ({'min_x': min(xs), 'min_y': min(ys), 'max_x': max(xs), 'max_y': max(ys)}
+                if xs else None)
+        return (len(grafo.vertices), len(pesos['distancia']), dict(histograma_salida),
+                dict(Counter(grados_entrada.values())), resumen, caja)
+    
+    def iguales(a, b):
+        if isinstance(a, dict) and isinstance(b, dict):
+            return a.keys() == b.keys() and all(iguales(a[k], b[k]) for k in a)
+        if isinstance(a, (tuple, list)) and isinstance(b, (tuple, list)):
+            return len(a) == len(b) and all(iguales(x, y) for x, y in zip(a, b))
+        if isinstance(a, float) and isinstance(b, float):
+            return abs(a - b) <= 1e-9 * max(1.0, abs(a), abs(b))
+        return a == b
+    
+    generador = random.Random(11)
+    comprobaciones = 0
+    errores = []
+    
+    for semilla in range(6):
+        num_vertices = generador.randint(2, 40)
+        grafo = crear_grafo_aleatorio(num_vertices, num_vertices * 2, semilla)
+        if semilla % 2:
+            grafo.compactar()
+        for _ in range(60):
+            operacion = generador.random()
+            vertices = sorted(grafo.vertices)
+            if operacion < 0.2:
+                # Vértice nuevo o movido: la caja puede perder su extremo
+                grafo.agregar_vertice(generador.choice(vertices + [f"N{generador.randrange(5)}"]),
+                                      coordenadas=(generador.uniform(-63, -62), generador.uniform(8, 9)))
+            elif operacion < 0.5:
+                grafo.agregar_arista(generador.choice(vertices), generador.choice(vertices),
+                                     generador.uniform(50, 500), generador.uniform(0.5, 5.0))
+            else:
+                # Sobrescribir la arista con el peso extremo (mínimo o máximo)
+                aristas = [(v, w, d) for v in vertices for w, d, _ in grafo.obtener_vecinos(v)]
+                if not aristas:
+                    continue
+                origen, destino, _ = (min if operacion < 0.75 else max)(aristas, key=lambda a: a[2])
+                grafo.actualizar_peso(origen, destino, generador.uniform(50, 500),
+                                      generador.uniform(0.5, 5.0))
+            estadisticas = grafo.obtener_estadisticas()
+            obtenido = (estadisticas['num_vertices'], estadisticas['num_aristas'],
+                        estadisticas['histograma_grado_salida'], estadisticas['histograma_grado_entrada'],
+                        {'distancia': estadisticas['distancia'], 'tiempo': estadisticas['tiempo']},
+                        estadisticas['caja_coordenadas'])
+            comprobaciones += 1
+            if not iguales(obtenido, recontar(grafo)):
+                errores.append(f"semilla {semilla}: los contadores no coinciden con el recuento")
+                break
+        
+        # Leer las estadísticas no prepara las componentes (su mantenimiento encarece agregar_arista)
+        if grafo.componentes is not None or 'num_componentes' in grafo.obtener_estadisticas():
+            errores.append("obtener_estadisticas() preparó las componentes")
+        if 'num_componentes' not in grafo.obtener_estadisticas(incluir_componentes=True):
+            errores.append("incluir_componentes no agregó las componentes")
+    
+    if errores:
+        for error in errores:
+            print(f"❌ {error}")
+    else:
+        print(f"✅ Contadores iguales al recuento completo en {comprobaciones} comprobaciones")
+    print()
+
+
+def probar_indices_persistencia():
+    """Eliminación en cascada, actualización en su sitio y reemplazo de los datos del gestor."""
+    print("=" * 60)
+    print("PRUEBA 29: Índices de Datos Personalizados")
+    print("=" * 60)
+    
+    errores = []
+    with tempfile.TemporaryDirectory() as directorio:
+        for nombre_archivo in ('datos.json', 'datos.db'):
+            ruta = os.path.join(directorio, nombre_archivo)
+            gestor = GestorPersistencia(ruta)
+            for id_nodo in "ABCD":
+                gestor.agregar_nodo(id_nodo, f"Nodo {id_nodo}", (-62.7, 8.28))
+            # B tiene conexiones de entrada, de salida y un lazo
+            for origen, destino in (("A", "B"), ("B", "A"), ("A", "C"), ("C", "B"),
+                                    ("B", "B"), ("B", "C"), ("C", "D")):
+                gestor.agregar_conexion(origen, destino, 100.0, 1.0)
+            
+            # Actualizar un registro existente no lo mueve al final
+            gestor.agregar_nodo("A", "Nodo A renombrado", (-62.6, 8.3))
+            gestor.agregar_conexion("A", "B", 150.0, 1.5)
+            nodos = [(n["id"], n["nombre"]) for n in gestor.obtener_nodos()]
+            conexiones = [(c["origen"], c["destino"], c["distancia"]) for c in gestor.obtener_conexiones()]
+            if nodos[0] != ("A", "Nodo A renombrado") or conexiones[0] != ("A", "B", 150.0):
+                errores.append(f"{nombre_archivo}: la actualización cambió el orden")
+            
+            gestor.eliminar_nodo("B")
+            restantes = [(c["origen"], c["destino"]) for c in gestor.obtener_conexiones()]
+            if restantes != [("A", "C"), ("C", "D")] or "B" in gestor._incidentes:
+                errores.append(f"{nombre_archivo}: la cascada dejó {restantes}")
+            gestor.cerrar()
+            
+            recargado = GestorPersistencia(ruta)
+            if recargado.datos != gestor.datos:
+                errores.append(f"{nombre_archivo}: la cascada no se persistió igual")
+            recargado.cerrar()
+        
+        # Asignar datos reemplaza los registros y reconstruye los índices
+        ruta = os.path.join(directorio, 'reemplazo.json')
+        gestor = GestorPersistencia(ruta)
+        gestor.agregar_nodo("Viejo", "Viejo", (-62.7, 8.28))
+        gestor.datos = {
+            "nodos": [{"id": "X", "nombre": "X", "coordenadas": [-62.7, 8.28]},
+                      {"id": "Y", "nombre": "Y", "coordenadas": [-62.6, 8.28]}],
+            "conexiones": [{"origen": "X", "destino": "Y", "distancia": 10.0, "tiempo": 0.1},
+                           {"origen": "Y", "destino": "X", "distancia": 10.0, "tiempo": 0.1}],
+        }
+        gestor.guardar_datos()
+        gestor.eliminar_nodo("Y")
+        gestor.cerrar()
+        recargado = GestorPersistencia(ruta)
+        if ([n["id"] for n in recargado.obtener_nodos()] != ["X"]
+                or recargado.obtener_conexiones() or recargado.datos != gestor.datos):
+            errores.append(f"el reemplazo de datos dejó {recargado.datos}")
+        recargado.cerrar()
+    
+    if errores:
+        for error in errores:
+            print(f"❌ {error}")
+    else:
+        print("✅ Cascada con lazo, orden de alta conservado y reemplazo de datos correctos (JSON y SQLite)")
+    print()
+
+
 def main():
     """Función principal de prueba."""
     print("\n" + "=" * 60)
@@ -194,6 +1481,30 @@ def main():
         probar_dfs(grafo)
         probar_puntos_interes()
         comparar_algoritmos(grafo)
+        probar_modo_compacto()
+        probar_dijkstra_bidireccional()
+        probar_a_estrella()
+        probar_jerarquia_contraccion()
+        probar_rutas_pareto()
+        probar_tiempo_dependiente(grafo)
+        probar_actualizacion_pesos()
+        probar_k_rutas()
+        probar_rutas_lote(grafo)
+        probar_indice_espacial(grafo)
+        probar_isocronas(grafo)
+        probar_componentes()
+        probar_instantanea(grafo)
+        probar_importador_osm()
+        probar_diario_persistencia()
+        probar_almacen_sqlite()
+        probar_alt()
+        probar_matriz_distancias()
+        probar_cache_rutas()
+        probar_arboles_caminos()
+        probar_recorridos()
+        probar_servicio_rutas()
+        probar_estadisticas_incrementales()
+        probar_indices_persistencia()
         
         print("=" * 60)
         print("✅ TODAS LAS PRUEBAS COMPLETADAS EXITOSAMENTE")
@@ -0,0 +1,177 @@
+"""
+Módulo: rutas_lote.py
+Descripción: Cálculo masivo de rutas repartido entre varios procesos, para
+             aprovechar todos los núcleos a pesar del GIL.
+Autor: CityNavigator
+Fecha: Enero 2026
+"""
+
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import os
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from datos_puerto_ordaz import cargar_grafo_puerto_ordaz
+from grafo import Grafo
+
+# Consultas por tarea enviada a un proceso
+TAMANO_BLOQUE = 256
+
+# Tareas en vuelo por proceso (limita la memoria con lotes muy grandes)
+TAREAS_POR_PROCESO = 4
+
+Consulta = Tuple[str, str, str]
+Resultado = Tuple[int, List[str], float]
+Bloque = List[Tuple[str, str, List[Tuple[int, str]]]]
+
+# Grafo de cada proceso trabajador (ver _inicializar_trabajador())
+_grafo_trabajador: Optional[Grafo] = None
+
+
+def _inicializar_trabajador(cargador: Callable[..., Grafo], argumentos: tuple):
+    """Carga el grafo una sola vez al arrancar cada proceso trabajador."""
+    global _grafo_trabajador
+    _grafo_trabajador = cargador(*argumentos)
+
+
+def _resolver_bloque(bloque: Bloque, con_caminos: bool = True,
+                     grafo: Optional[Grafo] = None) -> List[Resultado]:
+    """
+    Resuelve un bloque de consultas agrupadas por origen.
+
+    Args:
+        bloque: Lista de (origen, criterio, [(indice, destino), ...])
+        con_caminos: Si es False solo se calculan los costes
+        grafo: Grafo a usar (por defecto, el del proceso trabajador)
+
+    Returns:
+        List[Resultado]: (indice, camino, coste) de cada consulta
+    """
+    grafo = grafo if grafo is not None else _grafo_trabajador
+    resultados = []
+    for origen, criterio, consultas in bloque:
+        destinos = [destino for _, destino in consultas]
+        # Una sola búsqueda por origen para todos sus destinos
+        matriz, predecesores = grafo.matriz_distancias([origen], destinos, criterio,
+                                                       con_predecesores=True)
+        for (indice, destino), coste in zip(consultas, matriz[0]):
+            camino = []
+            if con_caminos and coste != float('inf'):
+                camino = Grafo.reconstruir_camino(predecesores[0], destino)
+            resultados.append((indice, camino, coste))
+    return resultados
+
+
+def agrupar_consultas(consultas: Iterable[Consulta],
+                      tamano_bloque: int = TAMANO_BLOQUE) -> List[Bloque]:
+    """
+    Agrupa las consultas por (origen, criterio) y las reparte en bloques.
+
+    Los grupos pequeños se empaquetan juntos hasta llenar un bloque; los que
+    superan el tamaño de bloque se dividen.
+
+    Args:
+        consultas: Secuencia de (origen, destino, criterio)
+        tamano_bloque: Consultas máximas por bloque
+
+    Returns:
+        List[Bloque]: Bloques listos para _resolver_bloque()
+    """
+    grupos = OrderedDict()
+    for indice, (origen, destino, criterio) in enumerate(consultas):
+        grupos.setdefault((origen, criterio), []).append((indice, destino))
+
+    bloques = []
+    bloque: Bloque = []
+    tamano = 0
+    for (origen, criterio), destinos in grupos.items():
+        for inicio in range(0, len(destinos), tamano_bloque):
+            parte = destinos[inicio:inicio + tamano_bloque]
+            if tamano + len(parte) > tamano_bloque and bloque:
+                bloques.append(bloque)
+                bloque, tamano = [], 0
+            bloque.append((origen, criterio, parte))
+            tamano += len(parte)
+    if bloque:
+        bloques.append(bloque)
+    return bloques
+
+
+def resolver_lote(consultas: Iterable[Consulta],
+                  cargador: Callable[..., Grafo] = cargar_grafo_puerto_ordaz,
+                  argumentos: tuple = (),
+                  procesos: Optional[int] = None,
+                  tamano_bloque: int = TAMANO_BLOQUE,
+                  ordenado: bool = True,
+                  con_caminos: bool = True) -> Iterator[Resultado]:
+    """
+    Calcula muchas rutas en paralelo y entrega los resultados a medida que llegan.
+
+    Cada proceso construye su propio grafo llamando a `cargador(*argumentos)`
+    una sola vez al arrancar, así que el grafo nunca se envía con las tareas;
+    el cargador debe ser una función de nivel de módulo (p. ej.
+    cargar_grafo_puerto_ordaz, que además abre la instantánea con mmap y
+    comparte sus páginas entre procesos). Las consultas de un mismo origen y criterio se
+    resuelven con una sola búsqueda.
+
+    Args:
+        consultas: Secuencia de (origen, destino, criterio)
+        cargador: Función que construye el grafo en cada proceso
+        argumentos: Argumentos para el cargador
+        procesos: Número de procesos (por defecto, uno por núcleo); con 1 se
+                  resuelve todo en el proceso actual
+        tamano_bloque: Consultas por tarea; bloques más grandes reducen la
+                       comunicación, más pequeños equilibran mejor la carga
+        ordenado: Si es True los resultados salen en el orden de las
+                  consultas; si es False, en cuanto se completa cada bloque
+        con_caminos: Si es False solo se calculan costes (camino vacío)
+
+    Yields:
+        Resultado: (indice_consulta, camino, coste); coste es float('inf')
+                   si no hay ruta
+    """
+    bloques = agrupar_consultas(consultas, tamano_bloque)
+    procesos = procesos or os.cpu_count() or 1
+
+    if procesos == 1:
+        grafo = cargador(*argumentos)
+        resultados = (resultado for bloque in bloques
+                      for resultado in _resolver_bloque(bloque, con_caminos, grafo))
+    else:
+        resultados = _resolver_en_procesos(bloques, cargador, argumentos, procesos, con_caminos)
+
+    if not ordenado:
+        yield from resultados
+        return
+
+    # Los bloques no siguen el orden de las consultas: se retienen los
+    # resultados hasta poder entregarlos en orden
+    pendientes = {}
+    siguiente = 0
+    for indice, camino, coste in resultados:
+        pendientes[indice] = (camino, coste)
+        while siguiente in pendientes:
+            camino, coste = pendientes.pop(siguiente)
+            yield siguiente, camino, coste
+            siguiente += 1
+
+
+def _resolver_en_procesos(bloques: List[Bloque], cargador: Callable[..., Grafo],
+                          argumentos: tuple, procesos: int,
+                          con_caminos: bool) -> Iterator[Resultado]:
+    """Envía los bloques al grupo de procesos con un límite de tareas en vuelo."""
+    limite = procesos * TAREAS_POR_PROCESO
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar_trabajador,
+                             initargs=(cargador, argumentos)) as ejecutor:
+        restantes = iter(bloques)
+        en_vuelo = set()
+        while True:
+            for bloque in restantes:
+                en_vuelo.add(ejecutor.submit(_resolver_bloque, bloque, con_caminos))
+                if len(en_vuelo) >= limite:
+                    break
+            if not en_vuelo:
+                return
+            completadas, en_vuelo = wait(en_vuelo, return_when=FIRST_COMPLETED)
+            for futuro in completadas:
+                yield from futuro.result()
@@ -0,0 +1,108 @@
+"""
+Módulo: rutas_pareto.py
+Descripción: Búsqueda multicriterio por etiquetas (label-setting) que obtiene
+             en una sola pasada el frente de Pareto de rutas según distancia
+             y tiempo.
+Autor: CityNavigator
+Fecha: Enero 2026
+"""
+
+import heapq
+from typing import List, Tuple
+
+from landmarks import distancias_desde
+
+INFINITO = float('inf')
+
+
+def frente_pareto(grafo, origen: str, destino: str,
+                  epsilon: float = 0.0) -> Tuple[List[Tuple[List[str], float, float]], int]:
+    """
+    Calcula las rutas no dominadas entre dos vértices.
+
+    Cada etiqueta es un camino parcial (distancia, tiempo) que termina en un
+    vértice. Las etiquetas se extraen en orden lexicográfico de
+    (distancia + cota, tiempo + cota), donde las cotas son las distancias
+    exactas hasta el destino de una búsqueda inversa por criterio. Con ese
+    orden, las etiquetas ya asentadas en un vértice tienen menor distancia,
+    así que una nueva etiqueta está dominada si y solo si su tiempo no
+    mejora el menor tiempo asentado allí: la prueba de dominancia es O(1).
+    Las etiquetas que no pueden mejorar el frente ya encontrado en el
+    destino se descartan antes de expandirlas.
+
+    Con epsilon > 0 una etiqueta se descarta también si una asentada tiene
+    un tiempo (en clave) a lo sumo (1 + epsilon) veces el suyo. El factor
+    solo se aplica al tiempo: por el orden de extracción la asentada ya
+    tiene igual o menor distancia, así que la relajación es en tiempo y la
+    dominancia en distancia sigue siendo exacta. Así los frentes se
+    mantienen pequeños a cambio de omitir rutas de tiempo casi equivalente.
+
+    Args:
+        grafo: Instancia de la clase Grafo
+        origen (str): Vértice de inicio
+        destino (str): Vértice de destino
+        epsilon (float): Relajación de la dominancia (0 = frente exacto)
+
+    Returns:
+        Tuple: (rutas, etiquetas_asentadas), donde rutas es una lista de
+               (camino, distancia, tiempo) ordenada por distancia creciente
+    """
+    if origen not in grafo.vertices or destino not in grafo.vertices:
+        return [], 0
+
+    # Cotas inferiores exactas hasta el destino para cada criterio
+    cota_distancia = distancias_desde(grafo, destino, 'distancia', inversa=True)
+    cota_tiempo = distancias_desde(grafo, destino, 'tiempo', inversa=True)
+    if origen not in cota_distancia:
+        return [], 0
+
+    factor = 1.0 + epsilon
+    # Menor tiempo (en clave) entre las etiquetas asentadas de cada vértice
+    mejor_tiempo = {}
+    # Etiquetas: (vertice, indice_padre, distancia, tiempo)
+    etiquetas = [(origen, -1, 0.0, 0.0)]
+    cola = [(cota_distancia[origen], cota_tiempo[origen], 0)]
+    frente = []
+    asentadas = 0
+
+    while cola:
+        clave_distancia, clave_tiempo, indice = heapq.heappop(cola)
+        vertice, _, distancia, tiempo = etiquetas[indice]
+
+        # Dominada por una etiqueta asentada en el mismo vértice o, a través
+        # de las cotas, por una ruta ya encontrada en el destino
+        if mejor_tiempo.get(vertice, INFINITO) <= factor * clave_tiempo:
+            continue
+        if mejor_tiempo.get(destino, INFINITO) <= factor * clave_tiempo:
+            continue
+        mejor_tiempo[vertice] = clave_tiempo
+        asentadas += 1
+
+        if vertice == destino:
+            frente.append(indice)
+            continue
+
+        for vecino, dist, tiemp in grafo.obtener_vecinos(vertice):
+            cota_d = cota_distancia.get(vecino)
+            if cota_d is None:
+                continue  # Desde el vecino no se llega al destino
+            nuevo_tiempo = tiempo + tiemp
+            nueva_clave_tiempo = nuevo_tiempo + cota_tiempo[vecino]
+            if mejor_tiempo.get(vecino, INFINITO) <= factor * nueva_clave_tiempo:
+                continue
+            nueva_distancia = distancia + dist
+            etiquetas.append((vecino, indice, nueva_distancia, nuevo_tiempo))
+            heapq.heappush(cola, (nueva_distancia + cota_d, nueva_clave_tiempo,
+                                  len(etiquetas) - 1))
+
+    rutas = []
+    for indice in frente:
+        _, _, distancia, tiempo = etiquetas[indice]
+        camino = []
+        while indice != -1:
+            camino.append(etiquetas[indice][0])
+            indice = etiquetas[indice][1]
+        camino.reverse()
+        rutas.append((camino, distancia, tiempo))
+
+    return rutas, asentadas
@@ -0,0 +1,365 @@
+"""
+Módulo: servicio_rutas.py
+Descripción: Servicio local (asyncio) que responde consultas de rutas por
+             HTTP o por líneas JSON, sin dependencias externas.
+Autor: CityNavigator
+Fecha: Enero 2026
+"""
+
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import json
+import math
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from grafo import Grafo
+
+PUERTO_POR_DEFECTO = 8765
+
+# Solo se aceptan direcciones locales
+HOSTS_LOCALES = ('127.0.0.1', '::1', 'localhost')
+
+# Límites de carga
+MAX_PENDIENTES = 64  # Cálculos distintos en curso
+MAX_CONEXIONES = 128  # Conexiones abiertas a la vez
+MAX_TAMANO_PETICION = 64 * 1024  # Bytes por línea o cuerpo
+TIEMPO_ESPERA = 30.0  # Segundos de inactividad antes de cerrar una conexión
+ESPERA_RECHAZO = 1.0  # Segundos para leer la primera línea de una conexión rechazada
+
+# Algoritmos de ruta disponibles: nombre -> método de Grafo
+ALGORITMOS = {
+    'dijkstra': 'dijkstra',
+    'a_estrella': 'a_estrella',
+    'bidireccional': 'dijkstra_bidireccional',
+    'alt': 'ruta_alt',
+    'jerarquica': 'ruta_jerarquica',
+}
+
+# Fallos de la conexión con el cliente: se cierra sin responder.
+# IncompleteReadError: el cuerpo es más corto que su Content-Length
+ERRORES_CONEXION = (asyncio.TimeoutError, asyncio.LimitOverrunError, asyncio.IncompleteReadError,
+                    ValueError, ConnectionError)
+
+ESTADOS_HTTP = {200: 'OK', 400: 'Bad Request', 404: 'Not Found',
+                413: 'Payload Too Large', 500: 'Internal Server Error',
+                503: 'Service Unavailable'}
+
+
+class ErrorPeticion(Exception):
+    """Petición que no se puede atender; lleva el código de estado HTTP."""
+
+    def __init__(self, estado: int, mensaje: str):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+class ServicioRutas:
+    """
+    Servicio de consultas sobre un Grafo.
+
+    Admite dos formatos en el mismo puerto:
+    - HTTP: GET /ruta?origen=A&destino=B&criterio=tiempo&algoritmo=a_estrella,
+      GET /bfs, /dfs, /estadisticas y /salud (o POST con el cuerpo en JSON).
+    - Líneas JSON: si la primera línea de la conexión empieza por '{', cada
+      línea es una petición {"tipo": "ruta", "origen": ..., ...} y cada
+      respuesta es una línea JSON.
+
+    Las búsquedas se ejecutan en un hilo aparte para que el bucle de eventos
+    siga atendiendo conexiones; al ser un único hilo, el grafo nunca se usa
+    desde dos hilos a la vez. Las peticiones idénticas que llegan mientras
+    otra igual se calcula esperan ese mismo resultado. Si hay demasiados
+    cálculos en curso se responde 503 en lugar de encolar sin límite.
+
+    Atributos:
+        grafo (Grafo): Grafo consultado
+        host (str): Dirección local en la que se escucha
+        puerto (int): Puerto TCP
+        peticiones (int): Peticiones atendidas
+        coalescidas (int): Peticiones resueltas con un cálculo ya en curso
+        rechazadas (int): Peticiones rechazadas por exceso de carga
+    """
+
+    def __init__(self, grafo: Grafo, host: str = '127.0.0.1', puerto: int = PUERTO_POR_DEFECTO,
+                 max_pendientes: int = MAX_PENDIENTES, max_conexiones: int = MAX_CONEXIONES):
+        """
+        Prepara el servicio (no empieza a escuchar hasta iniciar()).
+
+        Raises:
+            ValueError: Si el host no es una dirección local
+        """
+        if host not in HOSTS_LOCALES:
+            raise ValueError(f"El servicio solo puede escuchar en localhost, no en {host}")
+        self.grafo = grafo
+        self.host = host
+        self.puerto = puerto
+        self.max_pendientes = max_pendientes
+        self.max_conexiones = max_conexiones
+        self.peticiones = 0
+        self.coalescidas = 0
+        self.rechazadas = 0
+        self._conexiones = 0
+        self._en_curso: Dict[Tuple, asyncio.Future] = {}
+        self._ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='grafo')
+        self._servidor: Optional[asyncio.AbstractServer] = None
+
+    async def iniciar(self) -> asyncio.AbstractServer:
+        """Empieza a escuchar; retorna el servidor de asyncio."""
+        self._servidor = await asyncio.start_server(self._atender_conexion, self.host,
+                                                    self.puerto, limit=MAX_TAMANO_PETICION)
+        # Con puerto 0 el sistema elige uno libre
+        self.puerto = self._servidor.sockets[0].getsockname()[1]
+        return self._servidor
+
+    async def cerrar(self):
+        """Deja de aceptar conexiones y libera el hilo de cálculo."""
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+        self._ejecutor.shutdown(wait=False)
+
+    # ------------------------------------------------------------------
+    # Lógica de las consultas
+    # ------------------------------------------------------------------
+
+    async def despachar(self, peticion: Dict) -> Dict:
+        """
+        Atiende una petición ya decodificada.
+
+        Args:
+            peticion: Diccionario con 'tipo' y los parámetros de la consulta
+
+        Returns:
+            Dict: Respuesta serializable a JSON
+
+        Raises:
+            ErrorPeticion: Si la petición es inválida, el servicio está
+                           saturado o el cálculo falla
+        """
+        self.peticiones += 1
+        tipo = peticion.get('tipo')
+        if not isinstance(tipo, str):
+            raise ErrorPeticion(400, "Falta 'tipo'")
+
+        if tipo == 'salud':
+            return {'estado': 'ok', 'vertices': len(self.grafo.vertices),
+                    'pendientes': len(self._en_curso)}
+
+        if tipo == 'estadisticas':
+            estadisticas = await self._calcular(('estadisticas', self.grafo.version),
+                                                self.grafo.obtener_estadisticas)
+            return dict(estadisticas, cache_rutas=self.grafo.cache_rutas.estadisticas(),
+                        servicio={'peticiones': self.peticiones,
+                                  'coalescidas': self.coalescidas,
+                                  'rechazadas': self.rechazadas,
+                                  'conexiones': self._conexiones})
+
+        if tipo not in ('ruta', 'bfs', 'dfs'):
+            raise ErrorPeticion(404, f"Tipo de petición desconocido: {tipo}")
+
+        origen = peticion.get('origen')
+        destino = peticion.get('destino')
+        if not isinstance(origen, str) or not isinstance(destino, str):
+            raise ErrorPeticion(400, "Faltan 'origen' y 'destino'")
+
+        if tipo in ('bfs', 'dfs'):
+            funcion = self.grafo.bfs if tipo == 'bfs' else self.grafo.dfs
+            encontrado, camino = await self._calcular((tipo, origen, destino, self.grafo.version),
+                                                      funcion, origen, destino)
+            return {'encontrado': encontrado, 'camino': camino}
+
+        criterio = peticion.get('criterio', 'distancia')
+        algoritmo = peticion.get('algoritmo', 'dijkstra')
+        if not isinstance(criterio, str) or not isinstance(algoritmo, str):
+            raise ErrorPeticion(400, "'criterio' y 'algoritmo' deben ser texto")
+        if criterio not in ('distancia', 'tiempo'):
+            raise ErrorPeticion(400, f"Criterio desconocido: {criterio}")
+        if algoritmo not in ALGORITMOS:
+            raise ErrorPeticion(400, f"Algoritmo desconocido: {algoritmo}")
+        funcion = getattr(self.grafo, ALGORITMOS[algoritmo])
+        clave = ('ruta', origen, destino, criterio, algoritmo, self.grafo.version)
+        camino, coste = await self._calcular(clave, funcion, origen, destino, criterio)
+        return {'encontrada': bool(camino), 'camino': camino,
+                'coste': coste if math.isfinite(coste) else None,
+                'criterio': criterio, 'algoritmo': algoritmo}
+
+    async def _calcular(self, clave: Tuple, funcion, *argumentos):
+        """
+        Ejecuta una función del grafo en el hilo de cálculo, con coalescencia.
+
+        Si ya hay un cálculo con la misma clave en curso, se espera su
+        resultado en lugar de repetirlo.
+
+        Raises:
+            ErrorPeticion: 503 si hay demasiados cálculos en curso, 500 si
+                           la función lanza una excepción
+        """
+        futuro = self._en_curso.get(clave)
+        if futuro is not None:
+            self.coalescidas += 1
+        else:
+            if len(self._en_curso) >= self.max_pendientes:
+                self.rechazadas += 1
+                raise ErrorPeticion(503, "Servicio saturado, reintente más tarde")
+            bucle = asyncio.get_running_loop()
+            futuro = bucle.run_in_executor(self._ejecutor, funcion, *argumentos)
+            self._en_curso[clave] = futuro
+            futuro.add_done_callback(lambda _: self._en_curso.pop(clave, None))
+        try:
+            # shield: si un cliente se desconecta, los demás siguen esperando el resultado
+            return await asyncio.shield(futuro)
+        except Exception as e:
+            # Un fallo del cálculo no debe cerrar la conexión sin respuesta
+            raise ErrorPeticion(500, f"Error interno: {type(e).__name__}") from e
+
+    # ------------------------------------------------------------------
+    # Protocolos
+    # ------------------------------------------------------------------
+
+    async def _atender_conexion(self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter):
+        """Atiende una conexión en formato HTTP o de líneas JSON."""
+        if self._conexiones >= self.max_conexiones:
+            self.rechazadas += 1
+            await self._rechazar_conexion(lector, escritor)
+            return
+        self._conexiones += 1
+        try:
+            primera = await asyncio.wait_for(lector.readline(), TIEMPO_ESPERA)
+            if primera.lstrip().startswith(b'{'):
+                await self._atender_lineas_json(primera, lector, escritor)
+            elif primera:
+                await self._atender_http(primera, lector, escritor)
+        except ERRORES_CONEXION:
+            pass
+        finally:
+            self._conexiones -= 1
+            escritor.close()
+
+    async def _rechazar_conexion(self, lector: asyncio.StreamReader,
+                                 escritor: asyncio.StreamWriter):
+        """Responde 503 en el formato de la conexión (según su primera línea) y la cierra."""
+        try:
+            primera = await asyncio.wait_for(lector.readline(), ESPERA_RECHAZO)
+            error = {'error': "Demasiadas conexiones, reintente más tarde", 'estado': 503}
+            if primera.lstrip().startswith(b'{'):
+                escritor.write(json.dumps(error, ensure_ascii=False).encode('utf-8') + b'\n')
+                await escritor.drain()
+            elif primera:
+                await self._escribir_http(escritor, 503, {'error': error['error']})
+        except ERRORES_CONEXION:
+            pass
+        finally:
+            escritor.close()
+
+    async def _atender_lineas_json(self, primera: bytes, lector: asyncio.StreamReader,
+                                   escritor: asyncio.StreamWriter):
+        """Responde una línea JSON por cada petición hasta que se cierre la conexión."""
+        linea = primera
+        while linea:
+            if linea.strip():
+                peticion = None
+                try:
+                    peticion = json.loads(linea)
+                    if not isinstance(peticion, dict):
+                        raise ErrorPeticion(400, "Cada línea debe ser un objeto JSON")
+                    respuesta = await self.despachar(peticion)
+                except ValueError:
+                    # JSON mal formado o bytes que no son UTF-8
+                    respuesta = {'error': 'JSON inválido', 'estado': 400}
+                except ErrorPeticion as e:
+                    respuesta = {'error': str(e), 'estado': e.estado}
+                # El cliente puede poner un 'id' para emparejar respuestas
+                if isinstance(peticion, dict) and 'id' in peticion:
+                    respuesta['id'] = peticion['id']
+                escritor.write(json.dumps(respuesta, ensure_ascii=False).encode('utf-8') + b'\n')
+                # Si el cliente no lee, se deja de leer peticiones suyas
+                await escritor.drain()
+            linea = await asyncio.wait_for(lector.readline(), TIEMPO_ESPERA)
+
+    async def _atender_http(self, primera: bytes, lector: asyncio.StreamReader,
+                            escritor: asyncio.StreamWriter):
+        """Responde una petición HTTP/1.1 y cierra la conexión."""
+        estado = 200
+        try:
+            partes = primera.decode('latin-1').split()
+            if len(partes) != 3 or not partes[2].startswith('HTTP/'):
+                raise ErrorPeticion(400, "Línea de petición inválida")
+            metodo, destino_url, _ = partes
+
+            longitud = 0
+            while True:
+                cabecera = await asyncio.wait_for(lector.readline(), TIEMPO_ESPERA)
+                if cabecera in (b'\r\n', b'\n', b''):
+                    break
+                nombre, _, valor = cabecera.decode('latin-1').partition(':')
+                if nombre.strip().lower() == 'content-length':
+                    if not valor.strip().isdigit():
+                        raise ErrorPeticion(400, "Content-Length inválido")
+                    longitud = int(valor.strip())
+            if longitud > MAX_TAMANO_PETICION:
+                raise ErrorPeticion(413, "Cuerpo demasiado grande")
+
+            url = urlsplit(destino_url)
+            peticion = dict(parse_qsl(url.query))
+            if metodo == 'POST' and longitud:
+                cuerpo = await asyncio.wait_for(lector.readexactly(longitud), TIEMPO_ESPERA)
+                try:
+                    datos = json.loads(cuerpo)
+                except ValueError:
+                    raise ErrorPeticion(400, "JSON inválido")
+                if not isinstance(datos, dict):
+                    raise ErrorPeticion(400, "El cuerpo debe ser un objeto JSON")
+                peticion.update(datos)
+            elif metodo not in ('GET', 'POST'):
+                raise ErrorPeticion(400, f"Método no admitido: {metodo}")
+            peticion['tipo'] = url.path.strip('/')
+
+            respuesta = await self.despachar(peticion)
+        except ErrorPeticion as e:
+            estado = e.estado
+            respuesta = {'error': str(e)}
+
+        await self._escribir_http(escritor, estado, respuesta)
+
+    @staticmethod
+    async def _escribir_http(escritor: asyncio.StreamWriter, estado: int, respuesta: Dict):
+        """Escribe una respuesta HTTP/1.1 con cuerpo JSON."""
+        cuerpo = json.dumps(respuesta, ensure_ascii=False).encode('utf-8')
+        escritor.write(
+            f"HTTP/1.1 {estado} {ESTADOS_HTTP[estado]}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(cuerpo)}\r\n"
+            f"Connection: close\r\n\r\n".encode('latin-1') + cuerpo)
+        await escritor.drain()
+
+
+async def _servir(grafo: Grafo, host: str, puerto: int):
+    """Ejecuta el servicio hasta que se interrumpa."""
+    servicio = ServicioRutas(grafo, host, puerto)
+    servidor = await servicio.iniciar()
+    print(f"Servicio de rutas escuchando en http://{host}:{servicio.puerto}")
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        await servicio.cerrar()
+
+
+def main():
+    """Inicia el servicio con el grafo de Puerto Ordaz."""
+    from datos_puerto_ordaz import cargar_grafo_puerto_ordaz
+
+    parser = argparse.ArgumentParser(description="Servicio local de rutas de CityNavigator")
+    parser.add_argument('--host', default='127.0.0.1', choices=HOSTS_LOCALES)
+    parser.add_argument('--puerto', type=int, default=PUERTO_POR_DEFECTO)
+    argumentos = parser.parse_args()
+
+    try:
+        asyncio.run(_servir(cargar_grafo_puerto_ordaz(), argumentos.host, argumentos.puerto))
+    except KeyboardInterrupt:
+        print("\nServicio detenido")
+
+
+if __name__ == "__main__":
+    main()
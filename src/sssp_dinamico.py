@@ -0,0 +1,185 @@
+"""
+Módulo: sssp_dinamico.py
+Descripción: Árboles de caminos mínimos completos para orígenes vigilados,
+             reparados de forma incremental cuando cambia el peso de una
+             arista (al estilo de Ramalingam y Reps).
+Autor: CityNavigator
+Fecha: Enero 2026
+"""
+
+import heapq
+from typing import Callable, Dict, List, Optional, Tuple
+
+Aristas = Callable[[str], List[Tuple[str, float, float]]]
+
+INFINITO = float('inf')
+
+
+class ArbolDinamico:
+    """
+    Árbol de caminos mínimos desde un origen hacia todos los vértices.
+
+    En lugar de recalcularse tras cada cambio de peso, solo se repara la
+    parte afectada:
+    - Si una arista se abarata, se propaga la mejora con un Dijkstra que
+      empieza en su destino y solo visita los vértices que mejoran.
+    - Si una arista del árbol se encarece, solo cambia el subárbol que
+      cuelga de ella: sus vértices toman la mejor entrada desde fuera del
+      subárbol y un Dijkstra restringido al subárbol fija sus nuevos costes.
+      Encarecer una arista que no está en el árbol no cuesta nada.
+
+    Atributos:
+        origen (str): Raíz del árbol
+        criterio (str): 'distancia' o 'tiempo'
+        costes (dict): Coste mínimo de cada vértice alcanzable
+        predecesores (dict): Predecesor de cada vértice (None en la raíz)
+        version (int): Versión del grafo que refleja el árbol
+        reparados (int): Vértices recalculados en todas las reparaciones
+    """
+
+    def __init__(self, origen: str, criterio: str):
+        """Inicializa el árbol sin calcular (ver construir())."""
+        self.origen = origen
+        self.criterio = criterio
+        self.indice_peso = 1 if criterio == 'distancia' else 2
+        self.costes: Dict[str, float] = {}
+        self.predecesores: Dict[str, Optional[str]] = {}
+        self.version = -1
+        self.reparados = 0
+
+    def construir(self, obtener_vecinos: Aristas, version: int):
+        """Calcula el árbol completo con Dijkstra."""
+        self.costes = {self.origen: 0}
+        self.predecesores = {self.origen: None}
+        self._propagar([(0, self.origen)], obtener_vecinos)
+        self.version = version
+
+    def _propagar(self, cola: List[Tuple[float, str]], obtener_vecinos: Aristas,
+                  permitidos: Optional[set] = None) -> int:
+        """
+        Dijkstra desde una frontera inicial sobre los costes actuales.
+
+        Args:
+            cola: Entradas (coste, vertice) ya reflejadas en self.costes
+            obtener_vecinos: Función vertice -> aristas salientes
+            permitidos: Si se indica, solo se actualizan esos vértices
+
+        Returns:
+            int: Vértices asentados
+        """
+        costes = self.costes
+        predecesores = self.predecesores
+        indice_peso = self.indice_peso
+        heapq.heapify(cola)
+        asentados = 0
+
+        while cola:
+            coste, vertice = heapq.heappop(cola)
+            if coste > costes.get(vertice, INFINITO):
+                continue
+            asentados += 1
+            for arista in obtener_vecinos(vertice):
+                vecino = arista[0]
+                if permitidos is not None and vecino not in permitidos:
+                    continue
+                nuevo_coste = coste + arista[indice_peso]
+                if nuevo_coste < costes.get(vecino, INFINITO):
+                    costes[vecino] = nuevo_coste
+                    predecesores[vecino] = vertice
+                    heapq.heappush(cola, (nuevo_coste, vecino))
+
+        return asentados
+
+    def reparar_disminucion(self, origen: str, destino: str, peso: float,
+                            obtener_vecinos: Aristas) -> int:
+        """
+        Repara el árbol tras abaratar (o agregar) la arista origen -> destino.
+
+        Args:
+            origen (str): Vértice de origen de la arista
+            destino (str): Vértice de destino de la arista
+            peso (float): Nuevo peso de la arista en el criterio del árbol
+            obtener_vecinos: Función vertice -> aristas salientes (ya actualizadas)
+
+        Returns:
+            int: Vértices cuyo coste cambió
+        """
+        coste_origen = self.costes.get(origen)
+        if coste_origen is None or coste_origen + peso >= self.costes.get(destino, INFINITO):
+            return 0
+        self.costes[destino] = coste_origen + peso
+        self.predecesores[destino] = origen
+        reparados = self._propagar([(coste_origen + peso, destino)], obtener_vecinos)
+        self.reparados += reparados
+        return reparados
+
+    def reparar_aumento(self, origen: str, destino: str, obtener_vecinos: Aristas,
+                        obtener_entrantes: Aristas) -> int:
+        """
+        Repara el árbol tras encarecer la arista origen -> destino.
+
+        Args:
+            origen (str): Vértice de origen de la arista
+            destino (str): Vértice de destino de la arista
+            obtener_vecinos: Función vertice -> aristas salientes (ya actualizadas)
+            obtener_entrantes: Función vertice -> aristas entrantes (ya actualizadas)
+
+        Returns:
+            int: Vértices del subárbol afectado
+        """
+        if self.predecesores.get(destino, None) != origen or destino == self.origen:
+            return 0
+
+        costes = self.costes
+        predecesores = self.predecesores
+
+        # Subárbol que cuelga de la arista encarecida
+        subarbol = {destino}
+        pila = [destino]
+        while pila:
+            vertice = pila.pop()
+            for arista in obtener_vecinos(vertice):
+                vecino = arista[0]
+                if vecino not in subarbol and predecesores.get(vecino, None) == vertice:
+                    subarbol.add(vecino)
+                    pila.append(vecino)
+
+        # Cada vértice del subárbol toma su mejor entrada desde fuera de él
+        for vertice in subarbol:
+            del costes[vertice]
+            del predecesores[vertice]
+        cola = []
+        for vertice in subarbol:
+            mejor, padre = INFINITO, None
+            for arista in obtener_entrantes(vertice):
+                anterior = arista[0]
+                if anterior in subarbol:
+                    continue
+                coste = costes.get(anterior, INFINITO) + arista[self.indice_peso]
+                if coste < mejor:
+                    mejor, padre = coste, anterior
+            if padre is not None:
+                costes[vertice] = mejor
+                predecesores[vertice] = padre
+                cola.append((mejor, vertice))
+
+        self._propagar(cola, obtener_vecinos, subarbol)
+        self.reparados += len(subarbol)
+        return len(subarbol)
+
+    def camino(self, destino: str) -> Tuple[List[str], float]:
+        """
+        Reconstruye el camino hasta un vértice en O(longitud del camino).
+
+        Returns:
+            Tuple[List[str], float]: (camino, coste) o ([], inf) si no es alcanzable
+        """
+        if destino not in self.costes:
+            return [], INFINITO
+        camino = []
+        vertice_actual = destino
+        while vertice_actual is not None:
+            camino.append(vertice_actual)
+            vertice_actual = self.predecesores[vertice_actual]
+        camino.reverse()
+        return camino, self.costes[destino]
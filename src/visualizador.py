@@ -8,11 +8,15 @@ Fecha: Enero 2026
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.collections import LineCollection
 from typing import List, Tuple
 import networkx as nx
 
+# Colores de las bandas de una isocrona (de la más cercana a la más lejana)
+COLORES_BANDAS = ['#1A9850', '#91CF60', '#FEE08B', '#FC8D59', '#D73027']
 
-def dibujar_grafo(grafo, ax, ruta_resaltada: List[str] = None):
+
+def dibujar_grafo(grafo, ax, ruta_resaltada: List[str] = None, isocrona=None):
     """
     Dibuja el grafo en un eje de matplotlib con estilo de mapa.
     
@@ -20,6 +24,8 @@ def dibujar_grafo(grafo, ax, ruta_resaltada: List[str] = None):
         grafo: Instancia de la clase Grafo
         ax: Eje de matplotlib donde dibujar
         ruta_resaltada: Lista de vértices que forman la ruta a resaltar
+        isocrona: Resultado de Grafo.isocrona() o isocrona_inversa() a colorear
+                  por bandas (opcional)
     """
     ax.clear()
     
@@ -60,6 +66,9 @@ def dibujar_grafo(grafo, ax, ruta_resaltada: List[str] = None):
                 ax.plot([x1, x2], [y1, y2], color='#696969', linewidth=2, 
                        alpha=0.3, zorder=1, solid_capstyle='round')
     
+    if isocrona is not None:
+        dibujar_isocrona(isocrona, ax)
+    
     # Dibujar vértices (intersecciones) con estilo de mapa
     for vertice in grafo.vertices:
         x, y = grafo.coordenadas.get(vertice, (0, 0))
@@ -117,6 +126,13 @@ def dibujar_grafo(grafo, ax, ruta_resaltada: List[str] = None):
         mpatches.Patch(color='#696969', label='Calles', alpha=0.3),
     ]
     
+    if isocrona is not None:
+        unidad = 'min' if isocrona.criterio == 'tiempo' else 'm'
+        for banda, presupuesto in enumerate(isocrona.presupuestos):
+            leyenda_elementos.append(
+                mpatches.Patch(color=COLORES_BANDAS[banda % len(COLORES_BANDAS)],
+                               label=f'≤ {presupuesto:g} {unidad}'))
+    
     if ruta_resaltada:
         leyenda_elementos.extend([
             mpatches.Patch(color='#00AA00', label='⬤ Origen'),
@@ -145,6 +161,29 @@ def dibujar_grafo(grafo, ax, ruta_resaltada: List[str] = None):
     ax.set_aspect('equal', adjustable='box')
 
 
+def dibujar_isocrona(isocrona, ax):
+    """
+    Colorea por bandas los vértices y las calles cortadas de una isocrona.
+    
+    Todo se dibuja con una sola llamada para los vértices y otra para los
+    segmentos, usando directamente los arreglos del resultado.
+    
+    Args:
+        isocrona: Resultado de Grafo.isocrona() o isocrona_inversa()
+        ax: Eje de matplotlib donde dibujar
+    """
+    colores = [COLORES_BANDAS[banda % len(COLORES_BANDAS)] for banda in range(len(isocrona.presupuestos))]
+    
+    if isocrona.segmentos:
+        ax.add_collection(LineCollection(
+            isocrona.segmentos, colors=[colores[b] for b in isocrona.bandas_aristas],
+            linewidths=5, alpha=0.8, zorder=3, capstyle='round'))
+    
+    if isocrona.vertices:
+        ax.scatter(isocrona.xs, isocrona.ys, c=[colores[b] for b in isocrona.bandas],
+                  s=700, alpha=0.5, edgecolors='none', zorder=4)
+
+
 def crear_grafo_networkx(grafo):
     """
     Convierte el grafo personalizado a un grafo de NetworkX para análisis adicional.